@@ -1,30 +1,46 @@
 import pygame
 
-def run(screen):
-    """Заглушка для экрана 'Об игре'."""
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("Times New Roman", 28)
-    running = True
-    lines = [
-        "Пошаговая RPG - альфа-версия",
-        "Разработчик: Вы",
-        "Нажмите ESC, чтобы вернуться в меню"
-    ]
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                return
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
+import fonts
+import scenes
+
+lines = [
+    "Пошаговая RPG - альфа-версия",
+    "Разработчик: Вы",
+    "Нажмите ESC, чтобы вернуться в меню"
+]
+
+
+def preload(size):
+    """Создать шрифт экрана «Об игре» заранее (см. startup.warm_up)."""
+    fonts.get_font("Times New Roman", 28)
+
+
+class AboutScene(scenes.Scene):
+    """Заглушка для экрана 'Об игре'.
 
+    Экран статичный: в режиме dirty он рисуется один раз (и при смене размера).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.font = fonts.get_font("Times New Roman", 28)
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            self.app.pop()
+
+    def draw(self, screen, full):
+        if not full:
+            return None
         screen.fill((10, 10, 30))
         y = screen.get_height()//2 - 40
         for line in lines:
-            text = font.render(line, True, (200,200,255))
+            text = self.font.render(line, True, (200,200,255))
             screen.blit(text, ((screen.get_width() - text.get_width())//2, y))
             y += text.get_height() + 8
+        return None
 
-        pygame.display.flip()
-        clock.tick(60)
+
+def run(screen):
+    """Показать экран 'Об игре' в отдельном цикле (см. AboutScene)."""
+    scenes.run_scene(screen, AboutScene())
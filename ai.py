@@ -0,0 +1,264 @@
+"""Решения врагов в бою: поиск expectimax с ограничением по времени (без pygame).
+
+Позиция — копия combat.Battle. Узлы поиска:
+- ход стороны ИИ — максимум по действиям (атака или готовый особый приём
+  по каждой из MAX_TARGETS самых раненых целей);
+- ход противника — его обычное поведение (combat.default_policy: отряд
+  игрока в BattleScene ходит именно так);
+- исход действия — математическое ожидание по OUTCOMES (промах, удар,
+  крит со средним разбросом) вместо броска генератора.
+Лист — оценка (evaluate): разница сил сторон с учётом здоровья, победа
+и поражение — ±WIN.
+
+Поиск — итеративное углубление, пока не кончится время (бюджет зависит от
+сложности, DIFFICULTIES). Оценённые позиции хранятся в таблице
+транспозиций, ключ — (Battle.state_key(), глубина, сторона). Размер таблицы
+ограничен, при переполнении вытесняются самые давние записи. Таблица одна
+на процесс поиска и бой (shared_table) и переживает ход: следующий ход
+врага находит в ней позиции, оценённые в прошлых поисках.
+
+Окно не должно замирать, пока враг «думает»: Thinker отдаёт поиск
+отдельному процессу (concurrent.futures), а сцена опрашивает Future
+каждый кадр. Без процессов (например, во встроенном интерпретаторе)
+можно передать Thinker(executor=ThreadPoolExecutor(1)).
+
+`python ai.py` — замер узлов в секунду по сложностям.
+"""
+import argparse
+import concurrent.futures
+import sys
+import time
+from collections import OrderedDict, namedtuple
+
+import combat
+
+WIN = 1000.0
+MAX_TARGETS = 4
+TT_SIZE = 200000
+
+# исходы действия: (вероятность, (промах, крит, разброс))
+OUTCOMES = (
+    (combat.MISS / 100.0, (True, False, 100)),
+    ((combat.CRIT - combat.MISS) / 100.0, (False, False, 100)),
+    ((100 - combat.CRIT) / 100.0, (False, True, 100)),
+)
+
+Difficulty = namedtuple("Difficulty", "budget_ms max_depth")
+
+DIFFICULTIES = {
+    "easy": Difficulty(15, 1),
+    "normal": Difficulty(80, 4),
+    "hard": Difficulty(250, 12),
+}
+
+
+class _Timeout(Exception):
+    pass
+
+
+class TranspositionTable:
+    """Ограниченный кэш оценок позиций: ключ -> значение, вытеснение самых давних."""
+
+    def __init__(self, size=TT_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        entries = self.entries
+        entries[key] = value
+        if len(entries) > self.size:
+            entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def evaluate(battle, side):
+    """Оценка позиции для стороны side.
+
+    Живой боец стоит своей «угрозы» (атака × скорость), умноженной на
+    1 + доля здоровья: добить бойца выгоднее, чем ранить нескольких.
+    """
+    if battle.winner is not None:
+        if battle.winner == combat.DRAW:
+            return 0.0
+        return WIN if battle.winner == side else -WIN
+    own = other = 0.0
+    for f in battle.fighters:
+        if f.hp > 0:
+            value = f.atk * f.speed * (1.0 + f.hp / f.max_hp)
+            if f.side == side:
+                own += value
+            else:
+                other += value
+    return (own - other) / 100.0
+
+
+def actions(battle, actor):
+    """Действия бойца: атака и (если готов) особый приём по самым раненым целям."""
+    targets = sorted((f.hp, f.index) for f in battle.fighters if f.side != actor.side and f.hp > 0)
+    kinds = (combat.SKILL, combat.ATTACK) if actor.cooldown == 0 else (combat.ATTACK,)
+    return [(kind, index) for _, index in targets[:MAX_TARGETS] for kind in kinds]
+
+
+class Search:
+    """Один поиск с ограничением по времени; таблицу можно делить между поисками."""
+
+    def __init__(self, side, table=None):
+        self.side = side
+        self.table = table if table is not None else TranspositionTable()
+        self.nodes = 0
+        self.deadline = None
+
+    def value(self, battle, depth):
+        self.nodes += 1
+        if depth == 0 or battle.winner is not None:
+            return evaluate(battle, self.side)
+        key = (battle.state_key(), depth, self.side)
+        cached = self.table.get(key)
+        if cached is not None:
+            return cached
+        actor = battle.peek()
+        if actor.side == self.side:
+            value = max(self.expect(battle, action, depth) for action in actions(battle, actor))
+        else:
+            value = self.expect(battle, combat.default_policy(battle, actor), depth)
+        self.table.put(key, value)
+        return value
+
+    def expect(self, battle, action, depth):
+        total = 0.0
+        for p, roll in OUTCOMES:
+            # время проверяется перед каждой копией: в больших боях одна копия
+            # стоит около миллисекунды, и проверка раз в N узлов пропускает бюджет
+            if time.perf_counter() > self.deadline:
+                raise _Timeout()
+            child = battle.copy()
+            child.step(action, roll)
+            total += p * self.value(child, depth - 1)
+        return total
+
+    def run(self, battle, budget_ms, max_depth):
+        """Лучшее действие бойца, который ходит следующим (он должен быть на стороне side).
+
+        Возвращает (действие, достигнутая глубина).
+        """
+        self.deadline = time.perf_counter() + budget_ms / 1000.0
+        actor = battle.peek()
+        candidates = actions(battle, actor)
+        best = combat.default_policy(battle, actor)
+        reached = 0
+        for depth in range(1, max_depth + 1):
+            try:
+                scored = [(self.expect(battle, action, depth), -i, action)
+                          for i, action in enumerate(candidates)]
+            except _Timeout:
+                break
+            # при равной оценке — действие, стоящее раньше в списке
+            best = max(scored)[2]
+            reached = depth
+        return best, reached
+
+
+# таблица процесса и состав боя, для которого она заполнена
+_shared = (None, None)
+
+
+def shared_table(battle):
+    """Таблица транспозиций процесса для боя battle: общая для всех его ходов.
+
+    state_key не включает характеристики бойцов, поэтому для другого
+    состава (новый бой) таблица заводится заново.
+    """
+    global _shared
+    roster = tuple((f.name, f.side, f.max_hp, f.atk, f.defense, f.speed, f.affinity,
+                    f.skill_power, f.skill_cooldown) for f in battle.fighters)
+    if _shared[0] != roster:
+        _shared = (roster, TranspositionTable())
+    return _shared[1]
+
+
+def decide(battle, difficulty="normal", table=None):
+    """Решение для бойца, который ходит следующим: (ATTACK/SKILL, номер цели).
+
+    Выполняется в процессе или потоке Thinker; battle не меняется.
+    table=None — таблица процесса (shared_table), общая для ходов боя.
+    """
+    level = DIFFICULTIES[difficulty]
+    actor = battle.peek()
+    search = Search(actor.side, table if table is not None else shared_table(battle))
+    action, _ = search.run(battle, level.budget_ms, level.max_depth)
+    return action
+
+
+class Thinker:
+    """Поиск в фоне: think() сразу возвращает Future с решением decide()."""
+
+    def __init__(self, executor=None):
+        self._executor = executor
+        self._future = None
+
+    def think(self, battle, difficulty="normal"):
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+        # в процесс передаётся копия без policies (функции сцены не сериализуются)
+        self._future = self._executor.submit(decide, battle.copy(), difficulty)
+        return self._future
+
+    def close(self):
+        """Отменить ожидающий поиск и освободить процесс (не дожидаясь его)."""
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер поиска ИИ врагов (узлов в секунду)")
+    parser.add_argument("--enemies", default="warband", help="набор врагов (combat.ENCOUNTERS)")
+    parser.add_argument("--positions", type=int, default=10, help="позиций для замера")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    print("{:<8} {:>9} {:>7} {:>12} {:>12} {:>9}".format(
+        "уровень", "бюджет", "глуб.", "узлов", "узлов/с", "TT hit"))
+    for name, level in DIFFICULTIES.items():
+        nodes = depth = 0
+        elapsed = 0.0
+        table = TranspositionTable()
+        battle = combat.encounter(combat.AFFINITIES[0], args.enemies, seed=args.seed)
+        measured = 0
+        while measured < args.positions and not battle.finished:
+            actor = battle.peek()
+            if actor.side == combat.ENEMIES:
+                search = Search(actor.side, table)
+                t0 = time.perf_counter()
+                action, reached = search.run(battle, level.budget_ms, level.max_depth)
+                elapsed += time.perf_counter() - t0
+                nodes += search.nodes
+                depth += reached
+                measured += 1
+                battle.step(action)
+            else:
+                battle.step()
+        lookups = table.hits + table.misses
+        print("{:<8} {:>7}мс {:>7.1f} {:>12} {:>12.0f} {:>8.0%}".format(
+            name, level.budget_ms, depth / max(measured, 1), nodes, nodes / max(elapsed, 1e-9),
+            table.hits / lookups if lookups else 0.0))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
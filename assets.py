@@ -0,0 +1,215 @@
+"""Менеджер изображений с фоновой загрузкой и LRU-кэшем по объёму памяти.
+
+Декодирование файлов (pygame.image.load) выполняется в рабочем потоке.
+Главный поток забирает готовые изображения в poll(): приводит их к формату
+экрана (convert/convert_alpha) и кладёт в кэш. Масштабированные варианты
+хранятся отдельно для каждого целевого размера, поэтому повторная смена
+разрешения не требует повторного smoothscale. При превышении бюджета байт
+вытесняются давно не использованные элементы.
+
+Если исходник ещё не загружен, масштабированный вариант готовится в рабочем
+потоке: сначала он ищется в дисковом кэше (diskcache), при промахе файл
+декодируется, масштабируется и сохраняется на диск для следующих запусков.
+"""
+import queue
+import threading
+from collections import OrderedDict
+
+import pygame
+
+import config
+import diskcache
+
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+
+
+def surface_bytes(surf):
+    """Примерный объём пикселей поверхности в байтах."""
+    w, h = surf.get_size()
+    return w * h * surf.get_bytesize()
+
+
+class AssetManager:
+    """Кэш изображений: исходники (ключ (path, None)) и масштабированные варианты ((path, size))."""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, disk_cache=None):
+        self.budget_bytes = budget_bytes
+        self.disk_cache = disk_cache
+        self.used_bytes = 0
+        self._cache = OrderedDict()
+        self._pending = set()
+        self._failed = set()
+        self._requests = queue.Queue()
+        self._done = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        # True — загружать сразу в вызывающем потоке (детерминированные прогоны без окна)
+        self.synchronous = False
+
+    # --- фоновая загрузка -------------------------------------------------
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name="asset-loader", daemon=True)
+                self._worker.start()
+
+    def _work(self):
+        while True:
+            key, fmt = self._requests.get()
+            try:
+                surf, opaque = self._decode(key[0], key[1], fmt)
+            except Exception:
+                surf, opaque = None, False
+            self._done.put((key, surf, opaque))
+
+    def _decode(self, path, size, fmt):
+        """Подготовить изображение в рабочем потоке (без обращения к экрану).
+
+        size=None — исходник; иначе — вариант нужного размера (через дисковый кэш).
+        Возвращает (surface, непрозрачность).
+        """
+        if size is None:
+            src = pygame.image.load(path)
+            return src, not src.get_flags() & pygame.SRCALPHA
+        disk = self.disk_cache
+        if disk is not None:
+            cached = disk.load(path, size, fmt)
+            if cached is not None:
+                return cached
+        src = pygame.image.load(path)
+        opaque = not src.get_flags() & pygame.SRCALPHA
+        try:
+            surf = pygame.transform.smoothscale(src, size)
+        except Exception:
+            surf = pygame.transform.scale(src, size)
+        if disk is not None:
+            disk.store(path, surf, fmt, opaque)
+        return surf, opaque
+
+    def _request(self, key):
+        if key in self._cache or key in self._pending or key[0] in self._failed:
+            return
+        self._pending.add(key)
+        fmt = diskcache.preferred_format()
+        if self.synchronous:
+            try:
+                surf, opaque = self._decode(key[0], key[1], fmt)
+            except Exception:
+                surf, opaque = None, False
+            self._done.put((key, surf, opaque))
+            self.poll()
+            return
+        self._ensure_worker()
+        self._requests.put((key, fmt))
+
+    def request(self, path, size=None):
+        """Поставить файл (или его вариант размера size) в очередь на загрузку."""
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        self._request((path, size))
+
+    def poll(self):
+        """Забрать декодированные изображения (вызывать из главного потока).
+
+        Возвращает число обработанных изображений.
+        """
+        n = 0
+        while True:
+            try:
+                key, surf, opaque = self._done.get_nowait()
+            except queue.Empty:
+                return n
+            n += 1
+            self._pending.discard(key)
+            if surf is None:
+                self._failed.add(key[0])
+                continue
+            if pygame.display.get_surface() is not None:
+                try:
+                    if not opaque:
+                        surf = surf.convert_alpha()
+                    else:
+                        surf = surf.convert()
+                except Exception:
+                    pass
+            self._put(key, surf)
+
+    # --- кэш --------------------------------------------------------------
+
+    def _put(self, key, surf):
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self.used_bytes -= surface_bytes(old)
+        self._cache[key] = surf
+        self.used_bytes += surface_bytes(surf)
+        self._evict(keep=key)
+
+    def _evict(self, keep=None):
+        # вытесняем с начала (самые старые), не трогая только что добавленный элемент
+        for key in list(self._cache):
+            if self.used_bytes <= self.budget_bytes:
+                break
+            if key == keep:
+                continue
+            self.used_bytes -= surface_bytes(self._cache.pop(key))
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._evict()
+
+    def get(self, path):
+        """Исходное изображение или None, если оно ещё загружается (или не найдено)."""
+        key = (path, None)
+        surf = self._cache.get(key)
+        if surf is None:
+            self.request(path)
+            # в синхронном режиме изображение уже загружено
+            return self._cache.get(key)
+        self._cache.move_to_end(key)
+        return surf
+
+    def get_scaled(self, path, size):
+        """Изображение, масштабированное до size, или None, пока исходник не загружен."""
+        size = (int(size[0]), int(size[1]))
+        key = (path, size)
+        surf = self._cache.get(key)
+        if surf is not None:
+            self._cache.move_to_end(key)
+            return surf
+        src = self._cache.get((path, None))
+        if src is None:
+            # исходника в памяти нет — вариант готовится в фоне (или берётся с диска);
+            # в синхронном режиме он уже готов
+            self._request(key)
+            return self._cache.get(key)
+        self._cache.move_to_end((path, None))
+        if src.get_size() == size:
+            return src
+        try:
+            surf = pygame.transform.smoothscale(src, size)
+        except Exception:
+            # smoothscale требует 24/32 бит; для остальных форматов — обычный scale
+            surf = pygame.transform.scale(src, size)
+        self._put(key, surf)
+        return surf
+
+    def trim(self):
+        """Вытеснить давно не использованные изображения сверх бюджета памяти."""
+        self._evict()
+
+    def is_failed(self, path):
+        return path in self._failed
+
+    def clear(self):
+        self._cache.clear()
+        self.used_bytes = 0
+        self._failed.clear()
+
+
+# общий менеджер для всех экранов
+manager = AssetManager(disk_cache=diskcache.cache)
+# после смены разрешения варианты под прежний размер не выгружаются: при
+# возврате к нему (и для холста render_scale) они пригодятся; лишнее сверх
+# бюджета вытесняет LRU
+config.store.subscribe("resolution", lambda key, size: manager.trim())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Прогон баланса методом Монте-Карло на всех ядрах.
+
+Матрица конфигураций — стихии героя (по умолчанию все цвета вступления,
+см. combat.AFFINITIES) на наборы врагов (имена combat.ENCOUNTERS или
+списки типов через запятую, например "orc,goblin,goblin"). Каждая
+конфигурация делится на порции по --chunk боёв; порции выполняются в пуле
+процессов (по умолчанию по процессу на ядро) движком batchsim (NumPy) или
+скалярным combat (--engine scalar).
+
+Зерно порции выводится из --seed, конфигурации и номера порции, а не из
+номера процесса: какой бы процесс ни взял порцию и в каком бы запуске это
+ни случилось, её бои одинаковы.
+
+Итоги порций дописываются в файл результатов (JSON Lines) по мере
+готовности. Прерванный прогон (Ctrl+C, выключение) продолжается тем же
+вызовом: готовые порции из файла пропускаются, оборванная последняя строка
+отрезается перед дозаписью, и её порция считается заново. В конце
+печатается сводная таблица по всему файлу.
+
+    python balance.py --battles 1000000 --enemies wolves goblins warband
+    python balance.py --affinities Красный Синий --enemies "orc,goblin,goblin" --out orc.jsonl
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import time
+import zlib
+
+import combat
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUT = os.path.join(project_dir, "balance_results.jsonl")
+# параметры, которые должны совпадать при продолжении прогона
+RUN_KEYS = ("seed", "battles", "chunk", "engine", "max_turns")
+
+
+def parse_enemies(spec):
+    """Имя набора из combat.ENCOUNTERS или типы врагов через запятую."""
+    if spec in combat.ENCOUNTERS:
+        return combat.ENCOUNTERS[spec]
+    keys = tuple(k.strip() for k in spec.split(",") if k.strip())
+    unknown = [k for k in keys if k not in combat.ARCHETYPES]
+    if unknown or not keys:
+        raise ValueError("неизвестный набор врагов {!r} (типы: {})".format(
+            spec, ", ".join(combat.ARCHETYPES)))
+    return keys
+
+
+def chunk_seed(seed, affinity, enemies, chunk):
+    """Зерно порции: не зависит от процесса и порядка выполнения."""
+    key = zlib.crc32("{}|{}|{}".format(affinity, enemies, chunk).encode("utf-8"))
+    return combat.Rng((seed << 32) ^ key).next()
+
+
+def run_chunk(task):
+    """Выполнить порцию в процессе пула; возвращает запись для файла результатов."""
+    affinity, enemies, chunk, size, seed, engine, max_turns = task
+    keys = parse_enemies(enemies)
+    if engine == "batch":
+        import batchsim
+        result = batchsim.simulate(affinity, keys, n=size, seed=seed, max_turns=max_turns)
+        winners = result.winner.tolist()
+        turns = result.turns.tolist()
+    else:
+        winners, turns = [], []
+        for i in range(size):
+            r = combat.encounter(affinity, keys, seed=(seed + i) & combat.MASK64, max_turns=max_turns).run()
+            winners.append(r.winner)
+            turns.append(r.turns)
+    hist = {}
+    for t in turns:
+        hist[t] = hist.get(t, 0) + 1
+    return {
+        "affinity": affinity, "enemies": enemies, "chunk": chunk, "battles": size,
+        "wins": winners.count(combat.PARTY), "losses": winners.count(combat.ENEMIES),
+        "draws": winners.count(combat.DRAW),
+        # распределение длительности: [[ходов, боёв], ...]
+        "turns": sorted(hist.items()),
+    }
+
+
+def read_results(path):
+    """Заголовок прогона и готовые записи файла (оборванная строка пропускается)."""
+    header, records = None, []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if "run" in entry:
+                    header = entry["run"]
+                else:
+                    records.append(entry)
+    except FileNotFoundError:
+        pass
+    return header, records
+
+
+def drop_partial_line(path):
+    """Отрезать оборванную последнюю строку, чтобы новая запись не склеилась с ней."""
+    try:
+        with open(path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # конец последней целой строки: ищем \n с конца блоками
+            pos = size
+            while pos > 0:
+                start = max(0, pos - 65536)
+                f.seek(start)
+                cut = f.read(pos - start).rfind(b"\n")
+                if cut >= 0:
+                    f.truncate(start + cut + 1)
+                    return
+                pos = start
+            f.truncate(0)
+    except FileNotFoundError:
+        pass
+
+
+def plan(affinities, enemies, battles, chunk):
+    """Порции всех конфигураций: (стихия, враги, номер порции, боёв)."""
+    tasks = []
+    for affinity in affinities:
+        for spec in enemies:
+            for index, start in enumerate(range(0, battles, chunk)):
+                tasks.append((affinity, spec, index, min(chunk, battles - start)))
+    return tasks
+
+
+def run(tasks, out, run_params, workers):
+    """Выполнить порции в пуле, дописывая итоги в out по мере готовности."""
+    seed, engine, max_turns = run_params["seed"], run_params["engine"], run_params["max_turns"]
+    total = len(tasks)
+    done = 0
+    t0 = last = time.perf_counter()
+    battles = 0
+    with open(out, "a", encoding="utf-8") as f, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        queue = iter(tasks)
+        try:
+            while True:
+                # в работе не больше нескольких порций на процесс — план может быть огромным
+                while len(pending) < workers * 4:
+                    task = next(queue, None)
+                    if task is None:
+                        break
+                    affinity, spec, index, size = task
+                    pending.add(pool.submit(run_chunk, (affinity, spec, index, size,
+                                                        chunk_seed(seed, affinity, spec, index),
+                                                        engine, max_turns)))
+                if not pending:
+                    break
+                finished, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    record = future.result()
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    f.flush()
+                    done += 1
+                    battles += record["battles"]
+                now = time.perf_counter()
+                if now - last >= 0.5 or not pending:
+                    last = now
+                    print("\rпорций {}/{}, {:.0f} боёв/с".format(done, total, battles / max(now - t0, 1e-9)),
+                          end="", flush=True)
+        except KeyboardInterrupt:
+            for future in pending:
+                future.cancel()
+            print("\nпрервано: готовые порции сохранены в {}, повторите команду для продолжения".format(out))
+            raise
+    print()
+
+
+def summarize(records):
+    """Сводка по конфигурациям: [(стихия, враги, боёв, побед, поражений, ничьих, ср. ходов, p95), ...]."""
+    groups = {}
+    seen = set()
+    for r in records:
+        key = (r["affinity"], r["enemies"], r["chunk"])
+        if key in seen:
+            # порция, записанная дважды (например, при двух одновременных запусках)
+            continue
+        seen.add(key)
+        g = groups.setdefault((r["affinity"], r["enemies"]), {"battles": 0, "wins": 0, "losses": 0,
+                                                              "draws": 0, "turns": {}})
+        for key in ("battles", "wins", "losses", "draws"):
+            g[key] += r[key]
+        for t, count in r["turns"]:
+            g["turns"][t] = g["turns"].get(t, 0) + count
+    rows = []
+    for (affinity, enemies), g in groups.items():
+        n = g["battles"]
+        hist = sorted(g["turns"].items())
+        mean = sum(t * c for t, c in hist) / n if n else 0.0
+        p95, covered = 0, 0
+        for t, c in hist:
+            covered += c
+            if covered >= 0.95 * n:
+                p95 = t
+                break
+        rows.append((affinity, enemies, n, g["wins"] / n, g["losses"] / n, g["draws"] / n, mean, p95))
+    return rows
+
+
+def print_table(rows):
+    print("{:<10} {:<24} {:>10} {:>7} {:>7} {:>7} {:>7} {:>5}".format(
+        "стихия", "враги", "боёв", "победы", "пораж.", "ничьи", "ходов", "p95"))
+    for affinity, enemies, n, wins, losses, draws, mean, p95 in rows:
+        print("{:<10} {:<24} {:>10} {:>7.1%} {:>7.1%} {:>7.1%} {:>7.1f} {:>5}".format(
+            affinity, enemies, n, wins, losses, draws, mean, p95))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Прогон баланса боёв (Монте-Карло, пул процессов)")
+    parser.add_argument("--affinities", nargs="*", default=list(combat.AFFINITIES),
+                        help="стихии героя (по умолчанию все)")
+    parser.add_argument("--enemies", nargs="*", default=list(combat.ENCOUNTERS),
+                        help="наборы врагов: имена {} или типы через запятую".format(", ".join(combat.ENCOUNTERS)))
+    parser.add_argument("--battles", type=int, default=100000, help="боёв на конфигурацию")
+    parser.add_argument("--chunk", type=int, default=5000, help="боёв в порции")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=("batch", "scalar"), default="batch",
+                        help="batch — batchsim (NumPy), scalar — combat")
+    parser.add_argument("--max-turns", type=int, default=combat.MAX_TURNS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="процессов в пуле")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="файл результатов (JSON Lines)")
+    parser.add_argument("--fresh", action="store_true", help="начать заново, удалив прежние результаты")
+    args = parser.parse_args(argv)
+
+    for affinity in args.affinities:
+        if affinity not in combat.AFFINITIES:
+            parser.error("неизвестная стихия {!r} (есть: {})".format(affinity, ", ".join(combat.AFFINITIES)))
+    for spec in args.enemies:
+        try:
+            parse_enemies(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.chunk <= 0 or args.battles <= 0:
+        parser.error("--battles и --chunk должны быть положительными")
+
+    run_params = {"seed": args.seed, "battles": args.battles, "chunk": args.chunk, "engine": args.engine,
+                  "max_turns": args.max_turns}
+    if args.fresh and os.path.exists(args.out):
+        os.remove(args.out)
+    drop_partial_line(args.out)
+    header, records = read_results(args.out)
+    if header is not None and any(header.get(k) != run_params[k] for k in RUN_KEYS):
+        parser.error("{} записан с другими параметрами ({}); --fresh — начать заново".format(
+            args.out, ", ".join("{}={}".format(k, header.get(k)) for k in RUN_KEYS)))
+    if header is None:
+        with open(args.out, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"run": run_params}) + "\n")
+
+    done = {(r["affinity"], r["enemies"], r["chunk"]) for r in records}
+    tasks = [t for t in plan(args.affinities, args.enemies, args.battles, args.chunk) if t[:3] not in done]
+    if records:
+        print("продолжение: готово порций {}, осталось {}".format(len(done), len(tasks)))
+    if tasks:
+        try:
+            run(tasks, args.out, run_params, max(1, args.workers))
+        except KeyboardInterrupt:
+            return 130
+        _, records = read_results(args.out)
+
+    wanted = {(a, e) for a in args.affinities for e in args.enemies}
+    print_table([row for row in summarize(records) if row[:2] in wanted])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
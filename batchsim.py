@@ -0,0 +1,251 @@
+"""Пакетная симуляция боёв на NumPy — для баланса.
+
+Тысячи независимых боёв одного состава (отряд против набора врагов, см.
+combat) хранятся массивами: здоровье, перезарядка и время следующего хода
+— (боёв, бойцов), состояние генератора, число ходов, урон и победитель — по
+боям. Все бои продвигаются на один ход сразу векторными операциями:
+- ходит боец с наименьшим временем (argmin, при равенстве — меньший номер,
+  как в очереди combat.Battle);
+- цель — живой противник с наименьшим hp (так же, как combat.default_policy);
+- бросок — тот же SplitMix64 на массиве uint64, урон — та же
+  целочисленная формула.
+Поэтому для того же seed результат боя в точности совпадает со скалярным
+combat.Battle.run() (проверка — `python batchsim.py --check`). Закончившиеся
+бои сразу убираются из массивов.
+
+    result = batchsim.simulate("Красный", "warband", n=100000, seed=1)
+    result.win_rate, result.turn_histogram(), result.hit_damage
+
+`python batchsim.py` — сводка по всем стихиям и наборам врагов.
+Нужен NumPy (pip install numpy); игре он не нужен.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import combat
+
+NO_WINNER = -2
+# верхняя граница гистограммы урона за удар (больший урон попадает в последний столбец)
+MAX_HIT_DAMAGE = 1024
+
+_GOLDEN = np.uint64(combat.GOLDEN)
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+
+def _splitmix(state):
+    """Следующее число SplitMix64 для каждого элемента state (state меняется на месте)."""
+    state += _GOLDEN
+    z = state.copy()
+    z ^= z >> np.uint64(30)
+    z *= _M1
+    z ^= z >> np.uint64(27)
+    z *= _M2
+    z ^= z >> np.uint64(31)
+    return z
+
+
+class BatchResult:
+    """Итоги пакета: по боям winner, turns, damage (урон сторон) и seeds;
+    hit_damage — гистограмма урона за удар (индекс — урон, промахи не считаются).
+    """
+
+    def __init__(self, winner, turns, damage, seeds, hit_damage):
+        self.winner = winner
+        self.turns = turns
+        self.damage = damage
+        self.seeds = seeds
+        self.hit_damage = hit_damage
+
+    @property
+    def battles(self):
+        return len(self.winner)
+
+    @property
+    def win_rate(self):
+        return float(np.mean(self.winner == combat.PARTY)) if self.battles else 0.0
+
+    @property
+    def loss_rate(self):
+        return float(np.mean(self.winner == combat.ENEMIES)) if self.battles else 0.0
+
+    @property
+    def draw_rate(self):
+        return float(np.mean(self.winner == combat.DRAW)) if self.battles else 0.0
+
+    def turn_histogram(self):
+        """Число боёв по длительности: индекс — число ходов."""
+        return np.bincount(self.turns)
+
+    def result(self, i):
+        """Итог i-го боя в виде combat.Result (для сравнения со скалярным движком)."""
+        return combat.Result(int(self.winner[i]), int(self.turns[i]),
+                             (int(self.damage[i, 0]), int(self.damage[i, 1])), int(self.seeds[i]))
+
+
+def simulate_fighters(party, enemies, seeds, max_turns=combat.MAX_TURNS):
+    """Провести по бою party против enemies (списки combat.Combatant) для каждого seed."""
+    fighters = list(party) + list(enemies)
+    m = len(fighters)
+    seeds = np.asarray(seeds, dtype=np.uint64)
+    n = len(seeds)
+
+    # характеристики — по бойцу, общие для всех боёв
+    side = np.array([f.side for f in fighters], dtype=np.int64)
+    atk = np.array([f.atk for f in fighters], dtype=np.int64)
+    defense = np.array([f.defense for f in fighters], dtype=np.int64)
+    delay = np.array([combat.TIME_SCALE // f.speed for f in fighters], dtype=np.int64)
+    skill_power = np.array([f.skill_power for f in fighters], dtype=np.int64)
+    skill_cooldown = np.array([f.skill_cooldown for f in fighters], dtype=np.int64)
+    affinity = [f.affinity for f in fighters]
+    aff_pct = np.array([[combat.affinity_pct(a, t) for t in affinity] for a in affinity], dtype=np.int64)
+    big = np.iinfo(np.int64).max
+
+    # состояние — по бою
+    hp = np.tile(np.array([f.hp for f in fighters], dtype=np.int64), (n, 1))
+    cooldown = np.tile(np.array([f.cooldown for f in fighters], dtype=np.int64), (n, 1))
+    next_time = np.tile(delay, (n, 1))
+    rng = seeds.copy()
+    turns = np.zeros(n, dtype=np.int64)
+    damage = np.zeros((n, 2), dtype=np.int64)
+    alive = np.zeros((n, 2), dtype=np.int64)
+    alive[:, 0] = np.count_nonzero(side == combat.PARTY)
+    alive[:, 1] = m - alive[:, 0]
+    winner = np.full(n, NO_WINNER, dtype=np.int64)
+    ids = np.arange(n)
+
+    out_winner = np.empty(n, dtype=np.int64)
+    out_turns = np.empty(n, dtype=np.int64)
+    out_damage = np.empty((n, 2), dtype=np.int64)
+    hit_damage = np.zeros(MAX_HIT_DAMAGE + 1, dtype=np.int64)
+
+    # состав без одной из сторон — бой окончен до первого хода
+    empty = alive == 0
+    winner[empty[:, 1] & ~empty[:, 0]] = combat.PARTY
+    winner[empty[:, 0]] = combat.ENEMIES
+    winner[empty[:, 0] & empty[:, 1]] = combat.DRAW
+
+    with np.errstate(over="ignore"):
+        while True:
+            done = winner != NO_WINNER
+            if done.any():
+                out_winner[ids[done]] = winner[done]
+                out_turns[ids[done]] = turns[done]
+                out_damage[ids[done]] = damage[done]
+                keep = ~done
+                hp, cooldown, next_time = hp[keep], cooldown[keep], next_time[keep]
+                rng, turns, damage, alive = rng[keep], turns[keep], damage[keep], alive[keep]
+                winner, ids = winner[keep], ids[keep]
+            k = len(ids)
+            if k == 0:
+                break
+            rows = np.arange(k)
+            living = hp > 0
+
+            # очередь: погибшие не ходят
+            actor = np.argmin(np.where(living, next_time, big), axis=1)
+            actor_side = side[actor]
+            next_time[rows, actor] += delay[actor]
+
+            # выбор: цель — самый раненый живой противник
+            enemy = living & (side[None, :] != actor_side[:, None])
+            target = np.argmin(np.where(enemy, hp, big), axis=1)
+            cd = cooldown[rows, actor]
+            skill = cd == 0
+            cooldown[rows, actor] = np.where(skill, skill_cooldown[actor], np.maximum(cd - 1, 0))
+
+            # бросок
+            r = _splitmix(rng)
+            roll = (r % np.uint64(100)).astype(np.int64)
+            variance = (combat.VARIANCE_MIN + (r >> np.uint64(32)) % np.uint64(combat.VARIANCE_SPAN)).astype(np.int64)
+            miss = roll < combat.MISS
+            crit = roll >= combat.CRIT
+
+            # урон
+            power = np.where(skill, skill_power[actor], 100)
+            dmg = atk[actor] * power // 100
+            dmg = dmg * variance // 100
+            dmg = dmg * aff_pct[actor, target] // 100
+            dmg = np.where(crit, dmg * combat.CRIT_PCT // 100, dmg)
+            dmg = np.maximum(1, dmg - defense[target])
+
+            # применение
+            target_hp = hp[rows, target]
+            dmg = np.where(miss, 0, np.minimum(dmg, target_hp))
+            hp[rows, target] = target_hp - dmg
+            damage[rows, actor_side] += dmg
+            hits = dmg[~miss]
+            hit_damage += np.bincount(np.minimum(hits, MAX_HIT_DAMAGE), minlength=MAX_HIT_DAMAGE + 1)
+
+            killed = (target_hp > 0) & (target_hp == dmg)
+            target_side = 1 - actor_side
+            alive[rows[killed], target_side[killed]] -= 1
+            wiped = killed & (alive[rows, target_side] == 0)
+            winner[wiped] = actor_side[wiped]
+
+            turns += 1
+            winner[(winner == NO_WINNER) & (turns >= max_turns)] = combat.DRAW
+
+    return BatchResult(out_winner, out_turns, out_damage, seeds, hit_damage)
+
+
+def simulate(affinity, enemies, n=10000, seed=0, seeds=None, max_turns=combat.MAX_TURNS):
+    """Пакет боёв как combat.encounter(affinity, enemies, seed) для seed, seed+1, ... (n штук)."""
+    if seeds is None:
+        seeds = (np.arange(n, dtype=np.uint64) + np.uint64(seed & combat.MASK64))
+    return simulate_fighters(combat.make_party(affinity), combat.make_enemies(enemies), seeds, max_turns)
+
+
+def check(n=200, seed=0):
+    """Сравнить пакет со скалярным движком; возвращает число расхождений."""
+    mismatches = 0
+    for affinity in combat.AFFINITIES:
+        for enemies in combat.ENCOUNTERS:
+            batch = simulate(affinity, enemies, n, seed)
+            hist = np.zeros_like(batch.hit_damage)
+            for i in range(n):
+                battle = combat.encounter(affinity, enemies, seed=int(batch.seeds[i]))
+                while not battle.finished:
+                    action = battle.step()
+                    if not action.miss:
+                        hist[min(action.damage, MAX_HIT_DAMAGE)] += 1
+                if battle.result() != batch.result(i):
+                    mismatches += 1
+                    print("расхождение {} / {} seed={}: {} != {}".format(
+                        affinity, enemies, battle.seed, battle.result(), batch.result(i)))
+            if not np.array_equal(hist, batch.hit_damage):
+                mismatches += 1
+                print("гистограмма урона не совпала: {} / {}".format(affinity, enemies))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("-n", type=int, default=10000, help="боёв на пару стихия/набор врагов")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="сравнить со скалярным движком combat")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        mismatches = check(min(args.n, 200), args.seed)
+        print("расхождений: {}".format(mismatches))
+        return 1 if mismatches else 0
+
+    print("{:<10} {:<10} {:>7} {:>7} {:>7} {:>9} {:>12}".format(
+        "стихия", "враги", "победы", "пораж.", "ничьи", "ходов", "боёв/с"))
+    for affinity in combat.AFFINITIES:
+        for enemies in combat.ENCOUNTERS:
+            t0 = time.perf_counter()
+            result = simulate(affinity, enemies, args.n, args.seed)
+            elapsed = time.perf_counter() - t0
+            print("{:<10} {:<10} {:>7.1%} {:>7.1%} {:>7.1%} {:>9.1f} {:>12.0f}".format(
+                affinity, enemies, result.win_rate, result.loss_rate, result.draw_rate,
+                float(result.turns.mean()), result.battles / elapsed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Бенчмарк времени кадра по сценам и стадиям при всех разрешениях из настроек.
+
+Каждая сцена (меню, настройки с открытым списком, «Об игре», каждый шаг
+вступления) рисуется N кадров подряд без окна и без ограничения 60 FPS.
+Каждый кадр — полная перерисовка и вывод через общий цикл SceneStack.
+Печатает mean/p50/p95/p99 времени кадра и чистый прирост Python-блоков за
+кадр (net blocks: разность sys.getallocatedblocks() в начале и в конце
+прогона — растёт при утечках и накоплении кэшей, но не от числа временных
+выделений в кадре). Число выделений за кадр — созданные поверхности и
+рендеры текста (а также blit и заливки, см. counters) — считается
+отдельным прогоном каждой сцены со счётчиками, чтобы обёртки не искажали
+время кадра. Результаты пишутся в JSON и сравниваются с сохранённой базой:
+регрессия — рост p95 или выделений за кадр больше порога. --counters
+печатает все счётчики, а не только выделения.
+
+Примеры:
+  python bench_scenes.py --frames 300 --out bench_results.json
+  python bench_scenes.py --baseline bench_baseline.json --threshold 0.2
+  python bench_scenes.py --only menu settings_dropdown --resolutions 800x600
+  python bench_scenes.py --counters --frames 50
+  python bench_scenes.py --render-scale 0.5 --resolutions 1280x960
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import counters
+import headless
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+
+# выделения за кадр, которые сравниваются с базой
+ALLOC_KEYS = ("surfaces_per_frame", "renders_per_frame")
+# рост выделений меньше этого (в среднем за кадр) не считается регрессией
+ALLOC_MIN_DELTA = 0.5
+
+
+class BenchScheduler:
+    """Планировщик без ожидания и без событий: кадры идут подряд."""
+
+    def __init__(self):
+        self.animating = True
+
+    def events(self, animating=True):
+        self.animating = animating
+        return []
+
+    def tick(self):
+        return 0
+
+
+def percentile(sorted_values, p):
+    """Перцентиль p (0..100) по отсортированному списку (ближайший ранг)."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def make_cases():
+    """Сценарии бенчмарка: имя -> функция, создающая сцену и готовящая её к кадру i."""
+    import about
+    import main
+    import settings
+    import start
+
+    def menu():
+        return main.MenuScene(), None
+
+    def settings_dropdown():
+        scene = settings.SettingsScene()
+
+        def prepare(i):
+            scene.dropdown_open = True
+            scene.selected_index = i % len(settings.resolutions)
+        return scene, prepare
+
+    def about_screen():
+        return about.AboutScene(), None
+
+    cases = {
+        "menu": menu,
+        "settings_dropdown": settings_dropdown,
+        "about": about_screen,
+    }
+
+    cutscene = start.timeline.load(start.INTRO_CUTSCENE)
+    for index, step in enumerate(cutscene.steps):
+        def intro_step(index=index, step=step):
+            scene = start.IntroScene()
+
+            def prepare(i):
+                scene.timeline.index = index
+                if step.duration:
+                    # проходим по всей длительности шага кадрами по 1000/60 мс
+                    scene.timeline.time = (i * 1000.0 / 60) % step.duration
+                else:
+                    scene.timeline.time = 0
+            return scene, prepare
+        cases["intro_{}_{}".format(index, step.kind)] = intro_step
+
+    def intro_end():
+        scene = start.IntroScene()
+
+        def prepare(i):
+            scene.timeline.index = len(cutscene.steps)
+            scene.color_chosen = start.COLOR_OPTIONS[0][0]
+        return scene, prepare
+    cases["intro_end"] = intro_end
+    return cases
+
+
+def run_frames(app, prepare, first, count, times=None):
+    """Кадры first..first+count-1 с полной перерисовкой; times — куда добавлять время кадра (мс)."""
+    for i in range(first, first + count):
+        if prepare is not None:
+            prepare(i)
+        # каждый кадр — полная перерисовка (худший случай для сцены)
+        app.presenter.invalidate()
+        t0 = time.perf_counter()
+        app.frame()
+        if times is not None:
+            times.append((time.perf_counter() - t0) * 1000.0)
+
+
+def bench_case(app, factory, frames, warmup, count_frames):
+    """Прогнать один сценарий: вернуть словарь метрик.
+
+    Время кадра меряется без обёрток counters; выделения (поверхности,
+    рендеры текста и прочие счётчики) считаются отдельным прогоном той же
+    сцены на count_frames кадрах.
+    """
+    scene, prepare = factory()
+    app.push(scene)
+    app.running = True
+    run_frames(app, prepare, 0, warmup)
+    times = []
+    blocks_before = sys.getallocatedblocks()
+    run_frames(app, prepare, warmup, frames, times)
+    blocks_after = sys.getallocatedblocks()
+    app.scenes.clear()
+    times.sort()
+    result = {
+        "frames": frames,
+        "mean_ms": round(sum(times) / len(times), 4),
+        "p50_ms": round(percentile(times, 50), 4),
+        "p95_ms": round(percentile(times, 95), 4),
+        "p99_ms": round(percentile(times, 99), 4),
+        "net_blocks_per_frame": round((blocks_after - blocks_before) / float(frames), 3),
+    }
+
+    # сцена создаётся заново после enable(): шрифты и поверхности — уже считающих классов
+    counters.enable()
+    try:
+        scene, prepare = factory()
+        app.push(scene)
+        app.running = True
+        run_frames(app, prepare, 0, warmup)
+        ops_before = counters.snapshot()
+        run_frames(app, prepare, warmup, count_frames)
+        ops_after = counters.snapshot()
+        app.scenes.clear()
+    finally:
+        counters.disable()
+    for key in counters.KEYS:
+        result[key + "_per_frame"] = round((ops_after[key] - ops_before[key]) / float(count_frames), 3)
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Список регрессий: (ключ, метрика, было, стало, доля роста).
+
+    p95 времени кадра — рост больше чем на threshold; выделения за кадр
+    (ALLOC_KEYS) — рост больше чем на threshold и не меньше ALLOC_MIN_DELTA.
+    """
+    regressions = []
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if base.get("p95_ms"):
+            ratio = cur["p95_ms"] / base["p95_ms"] - 1.0
+            if ratio > threshold:
+                regressions.append((key, "p95_ms", base["p95_ms"], cur["p95_ms"], ratio))
+        for name in ALLOC_KEYS:
+            old, new = base.get(name), cur.get(name)
+            if old is None or new is None:
+                continue
+            if new - old >= ALLOC_MIN_DELTA and new > old * (1.0 + threshold):
+                ratio = new / old - 1.0 if old else float("inf")
+                regressions.append((key, name, old, new, ratio))
+    return regressions
+
+
+def parse_resolution(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк времени кадра по сценам")
+    parser.add_argument("--frames", type=int, default=200, help="кадров на сценарий")
+    parser.add_argument("--warmup", type=int, default=10, help="кадров прогрева (не учитываются)")
+    parser.add_argument("--resolutions", nargs="*", type=parse_resolution,
+                        help="разрешения WxH (по умолчанию — все из settings.resolutions)")
+    parser.add_argument("--only", nargs="*", help="имена сценариев (по умолчанию — все)")
+    parser.add_argument("--out", default=os.path.join(project_dir, "bench_results.json"),
+                        help="куда записать результаты (JSON)")
+    parser.add_argument("--baseline", help="файл базы для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="допустимый рост p95 и выделений за кадр относительно базы (доля, 0.15 = 15%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="записать результаты как базу")
+    parser.add_argument("--render-scale", type=float, default=1.0,
+                        help="доля размера окна для внутреннего разрешения (см. scenes)")
+    parser.add_argument("--count-frames", type=int, default=50,
+                        help="кадров в прогоне со счётчиками выделений (см. counters.py)")
+    parser.add_argument("--counters", action="store_true",
+                        help="печатать все счётчики за кадр (blit, заливки), а не только выделения")
+    args = parser.parse_args(argv)
+
+    os.chdir(project_dir)
+    headless.setup()
+    import pygame
+    import assets
+    import scenes
+    import settings
+
+    pygame.init()
+    resolutions = args.resolutions or settings.resolutions
+    screen = pygame.display.set_mode(resolutions[0])
+    assets.manager.synchronous = True
+    app = scenes.SceneStack(screen, frames=BenchScheduler(), render_scale=args.render_scale)
+    cases = make_cases()
+    names = args.only or list(cases)
+
+    results = {}
+    print("{:<28} {:>10} {:>9} {:>9} {:>9} {:>9} {:>8} {:>8} {:>10}".format(
+        "case", "resolution", "mean", "p50", "p95", "p99", "surf/fr", "rend/fr", "net blk/fr"))
+    for size in resolutions:
+        app.set_mode(size)
+        for name in names:
+            if name not in cases:
+                parser.error("неизвестный сценарий: {}".format(name))
+            r = bench_case(app, cases[name], args.frames, args.warmup, max(1, args.count_frames))
+            key = "{}@{}x{}".format(name, size[0], size[1])
+            if args.render_scale != 1.0:
+                key += "@s{:g}".format(args.render_scale)
+            results[key] = r
+            print("{:<28} {:>10} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.3f} {:>8.2f} {:>8.2f} {:>10.2f}".format(
+                name, "{}x{}".format(*size), r["mean_ms"], r["p50_ms"], r["p95_ms"], r["p99_ms"],
+                r["surfaces_per_frame"], r["renders_per_frame"], r["net_blocks_per_frame"]))
+            if args.counters:
+                print("    " + "  ".join("{} {:.1f}".format(k, r[k + "_per_frame"]) for k in counters.KEYS))
+    pygame.quit()
+
+    out = args.baseline if args.save_baseline and args.baseline else args.out
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print("Результаты записаны в {}".format(out))
+
+    if args.baseline and not args.save_baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print("Не удалось прочитать базу {}: {}".format(args.baseline, e), file=sys.stderr)
+            return 2
+        regressions = compare(results, baseline, args.threshold)
+        for key, metric, old, new, ratio in regressions:
+            print("РЕГРЕССИЯ {}: {} {:.3f} -> {:.3f} (+{:.0%})".format(key, metric, old, new, ratio))
+        if regressions:
+            return 1
+        print("Регрессий нет (порог {:.0%})".format(args.threshold))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Микро-бенчмарк переноса строк: прежний start.wrap_text против textlayout.wrap_text.
+
+Проверяет, что переносы совпадают, и печатает время на один перенос
+для текстов разной длины. Новый перенос замеряется с пустым кэшем ширин
+слов (как первый перенос текста). --check сравнивает переносы с прежними
+на сетке текстов, ширин и начертаний (обычное, bold, italic, bold italic).
+Окно не создаётся — нужен только pygame.font.
+Примеры:
+  python bench_wrap.py
+  python bench_wrap.py --words 5000 --width 600 --repeat 20
+  python bench_wrap.py --check
+"""
+import argparse
+import random
+import time
+
+import pygame
+
+import fonts
+import textlayout
+
+
+def wrap_text_legacy(text, font, max_width):
+    """Исходная реализация start.wrap_text (квадратичная по длине абзаца)."""
+    words = text.split()
+    lines = []
+    if not words:
+        return lines
+    cur = words[0]
+    for w in words[1:]:
+        test = cur + ' ' + w
+        if font.size(test)[0] <= max_width:
+            cur = test
+        else:
+            lines.append(cur)
+            cur = w
+    lines.append(cur)
+    return lines
+
+
+SAMPLE_WORDS = (
+    "Мир полон оттенков и выборов. Ваш путь начнёт меняться в зависимости "
+    "от одного простого выбора. Какой цвет ты выберешь? Приготовьтесь окунуться "
+    "в мир и стать участником событий, на которые иногда вы не сможете повлиять. "
+    "Меч героя +3, щит стража, зелье лечения (50 HP), свиток огня."
+).split()
+
+
+def make_text(n_words, seed=0):
+    rnd = random.Random(seed)
+    return ' '.join(rnd.choice(SAMPLE_WORDS) for _ in range(n_words))
+
+
+def measure(func, text, font, width, repeat):
+    best = None
+    for _ in range(repeat):
+        # замер без накопленных ширин слов — иначе ускорение завышено
+        textlayout._word_widths.clear()
+        t0 = time.perf_counter()
+        func(text, font, width)
+        dt = time.perf_counter() - t0
+        best = dt if best is None or dt < best else best
+    return best
+
+
+STYLES = ((False, False), (True, False), (False, True), (True, True))
+
+
+def check(families=("Arial", "Times New Roman"), sizes=(16, 22, 32), texts=40,
+          widths=range(80, 800, 24)):
+    """Сравнить переносы с прежними по всем начертаниям; возвращает (случаев, расхождений)."""
+    cases = mismatches = 0
+    for family in families:
+        for size in sizes:
+            for bold, italic in STYLES:
+                font = fonts.get_font(family, size, bold, italic)
+                for seed in range(texts):
+                    text = make_text(5 + seed * 3, seed=seed)
+                    for width in widths:
+                        cases += 1
+                        if wrap_text_legacy(text, font, width) != textlayout.wrap_text(text, font, width):
+                            mismatches += 1
+                            if mismatches <= 5:
+                                print("расхождение: {} {} bold={} italic={} ширина {}".format(
+                                    family, size, bold, italic, width))
+    return cases, mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк переноса строк")
+    parser.add_argument("--words", type=int, nargs="*", default=[20, 200, 2000],
+                        help="количество слов в тестовых текстах")
+    parser.add_argument("--width", type=int, default=680, help="ширина переноса в пикселях")
+    parser.add_argument("--size", type=int, default=22, help="размер шрифта")
+    parser.add_argument("--repeat", type=int, default=10, help="число повторов (берётся лучшее время)")
+    parser.add_argument("--check", action="store_true",
+                        help="только сравнить переносы с прежними на всех начертаниях")
+    args = parser.parse_args(argv)
+
+    pygame.font.init()
+    if args.check:
+        cases, mismatches = check()
+        print("случаев: {}, расхождений: {}".format(cases, mismatches))
+        return 1 if mismatches else 0
+    font = fonts.get_font("Times New Roman", args.size)
+
+    print("{:>7} {:>12} {:>12} {:>8}  {}".format("words", "legacy, ms", "new, ms", "speedup", "same"))
+    for n in args.words:
+        text = make_text(n, seed=n)
+        same = wrap_text_legacy(text, font, args.width) == textlayout.wrap_text(text, font, args.width)
+        t_old = measure(wrap_text_legacy, text, font, args.width, args.repeat)
+        t_new = measure(textlayout.wrap_text, text, font, args.width, args.repeat)
+        print("{:>7} {:>12.3f} {:>12.3f} {:>7.1f}x  {}".format(
+            n, t_old * 1000, t_new * 1000, t_old / t_new if t_new else float('inf'), same))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,413 @@
+"""Пошаговый бой: отряд игрока против группы врагов (без pygame).
+
+Ход — действие одного бойца. Очередь ходов — куча (heapq) по времени
+следующего действия: боец со скоростью speed ходит каждые
+TIME_SCALE // speed единиц времени, при равенстве раньше ходит боец с
+меньшим номером (сначала отряд, затем враги). Погибшие бойцы из очереди
+не удаляются — их записи пропускаются при извлечении.
+
+Действие проходит конвейер:
+1. выбор (policy): приём и цель. По умолчанию — особый приём, как только
+   он перезарядился, иначе обычная атака; цель — живой противник с
+   наименьшим запасом здоровья (для этого у каждой стороны своя куча
+   (hp, номер) с ленивым удалением устаревших записей);
+2. бросок: одно число генератора Rng даёт промах (roll < MISS), крит
+   (roll >= CRIT) и разброс урона VARIANCE;
+3. урон: целочисленная формула (сила приёма, разброс, стихия, крит, минус
+   защита цели, не меньше 1);
+4. применение: здоровье цели, счётчики урона, конец боя.
+
+Стихии — цвета выбора во вступлении (cutscenes/intro.json, те же, что
+start.COLOR_OPTIONS): каждая сильнее следующей по кругу
+(Красный > Зелёный > Синий > Красный), AFFINITY_STRONG/AFFINITY_WEAK — урон
+в процентах. None — без стихии.
+
+Генератор — SplitMix64 с явным состоянием: одинаковый seed даёт
+одинаковый бой, а вся арифметика целочисленная, поэтому её можно повторить
+массивами NumPy. Ход большого боя (сотни бойцов) занимает микросекунды:
+выбор цели и очередь — O(log n).
+
+    battle = combat.encounter("Красный", "wolves", seed=1)
+    result = battle.run()
+
+`python combat.py` — пример боя и замер времени хода.
+"""
+import heapq
+import os
+import sys
+import time
+from collections import namedtuple
+
+import timeline
+
+INTRO_CUTSCENE = os.path.join(timeline.CUTSCENES_DIR, "intro.json")
+# стихии: имена вариантов выбора цвета во вступлении, по порядку
+AFFINITIES = tuple(name for name, _ in timeline.load(INTRO_CUTSCENE).find("choice").options)
+
+PARTY, ENEMIES, DRAW = 0, 1, -1
+
+TIME_SCALE = 10000
+MAX_TURNS = 10000
+
+# бросок: roll = число генератора % 100
+MISS = 5
+CRIT = 90
+CRIT_PCT = 150
+# разброс урона: VARIANCE_MIN + (число >> 32) % VARIANCE_SPAN процентов
+VARIANCE_MIN = 90
+VARIANCE_SPAN = 21
+AFFINITY_STRONG = 150
+AFFINITY_WEAK = 75
+
+ATTACK, SKILL = 0, 1
+
+MASK64 = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+
+
+class Rng:
+    """SplitMix64: детерминированный генератор 64-битных чисел."""
+
+    __slots__ = ("state",)
+
+    def __init__(self, seed):
+        self.state = seed & MASK64
+
+    def next(self):
+        self.state = z = (self.state + GOLDEN) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+
+# описание типа бойца; skill_power — сила особого приёма в процентах атаки,
+# skill_cooldown — сколько своих ходов он перезаряжается
+Template = namedtuple("Template", "name hp atk defense speed affinity skill_power skill_cooldown")
+
+ARCHETYPES = {
+    "hero": Template("Герой", 140, 24, 6, 12, None, 200, 3),
+    "knight": Template("Рыцарь", 180, 18, 10, 9, None, 160, 4),
+    "archer": Template("Лучница", 100, 22, 4, 15, None, 180, 3),
+    "slime": Template("Слизень", 70, 16, 3, 8, "Зелёный", 130, 4),
+    "wolf": Template("Волк", 85, 21, 4, 14, None, 150, 3),
+    "goblin": Template("Гоблин", 65, 19, 5, 11, "Красный", 140, 4),
+    "wisp": Template("Огонёк", 55, 24, 2, 16, "Синий", 160, 3),
+    "orc": Template("Орк", 200, 28, 9, 7, "Красный", 180, 4),
+}
+
+# отряд игрока: герой получает выбранную стихию, спутники — без стихии
+PARTY_MEMBERS = ("hero", "knight", "archer")
+
+ENCOUNTERS = {
+    "slimes": ("slime",) * 4,
+    "wolves": ("wolf",) * 3,
+    "goblins": ("goblin",) * 5,
+    "wisps": ("wisp",) * 4,
+    "warband": ("orc", "goblin", "goblin", "wolf"),
+    "horde": ("goblin", "slime", "wolf", "wisp") * 125,
+}
+
+
+def affinity_index(affinity):
+    """Номер стихии по имени (или номеру); None — без стихии (-1)."""
+    if affinity is None:
+        return -1
+    if isinstance(affinity, int):
+        return affinity
+    return AFFINITIES.index(affinity)
+
+
+def affinity_pct(attacker, target):
+    """Множитель урона стихии attacker по target (в процентах)."""
+    if attacker < 0 or target < 0:
+        return 100
+    n = len(AFFINITIES)
+    if (attacker + 1) % n == target:
+        return AFFINITY_STRONG
+    if (target + 1) % n == attacker:
+        return AFFINITY_WEAK
+    return 100
+
+
+class Combatant:
+    __slots__ = ("index", "side", "name", "hp", "max_hp", "atk", "defense", "speed",
+                 "affinity", "skill_power", "skill_cooldown", "cooldown")
+
+    def __init__(self, template, side, affinity=None):
+        self.index = -1
+        self.side = side
+        self.name = template.name
+        self.hp = self.max_hp = template.hp
+        self.atk = template.atk
+        self.defense = template.defense
+        self.speed = template.speed
+        self.affinity = affinity_index(template.affinity if affinity is None else affinity)
+        self.skill_power = template.skill_power
+        self.skill_cooldown = template.skill_cooldown
+        # особый приём готов после skill_cooldown своих ходов
+        self.cooldown = template.skill_cooldown
+
+    @property
+    def alive(self):
+        return self.hp > 0
+
+    def __repr__(self):
+        return "<{} {}/{}>".format(self.name, self.hp, self.max_hp)
+
+
+class Action:
+    """Результат одного хода."""
+
+    __slots__ = ("turn", "actor", "target", "kind", "damage", "miss", "crit")
+
+    def __init__(self, turn, actor, target, kind, damage, miss, crit):
+        self.turn = turn
+        self.actor = actor
+        self.target = target
+        self.kind = kind
+        self.damage = damage
+        self.miss = miss
+        self.crit = crit
+
+    def describe(self, battle):
+        actor = battle.fighters[self.actor]
+        target = battle.fighters[self.target]
+        what = "особый приём" if self.kind == SKILL else "атака"
+        if self.miss:
+            return "{}: {} по {} — промах".format(actor.name, what, target.name)
+        return "{}: {} по {} — {}{}".format(actor.name, what, target.name, self.damage,
+                                            " (крит)" if self.crit else "")
+
+
+Result = namedtuple("Result", "winner turns damage seed")
+
+
+def default_policy(battle, actor):
+    """Особый приём, как только готов; цель — самый раненый противник."""
+    kind = SKILL if actor.cooldown == 0 else ATTACK
+    return kind, battle.weakest(1 - actor.side)
+
+
+class Battle:
+    """Бой: fighters — все бойцы (сначала отряд), очередь ходов и генератор.
+
+    policies — выбор действия по сторонам {PARTY: f, ENEMIES: f},
+    f(battle, actor) -> (ATTACK/SKILL, номер цели); по умолчанию
+    default_policy.
+    """
+
+    def __init__(self, party, enemies, seed=0, max_turns=MAX_TURNS, policies=None):
+        self.fighters = list(party) + list(enemies)
+        for i, fighter in enumerate(self.fighters):
+            fighter.index = i
+        self.seed = seed
+        self.rng = Rng(seed)
+        self.max_turns = max_turns
+        self.policies = policies or {}
+        self.turn = 0
+        self.winner = None
+        self.alive = [0, 0]
+        self.damage = [0, 0]
+        self.queue = []
+        # по стороне — куча (hp, номер) для выбора цели
+        self.targets = ([], [])
+        for fighter in self.fighters:
+            self.alive[fighter.side] += 1
+            self.queue.append((TIME_SCALE // fighter.speed, fighter.index))
+            self.targets[fighter.side].append((fighter.hp, fighter.index))
+        heapq.heapify(self.queue)
+        for heap in self.targets:
+            heapq.heapify(heap)
+        if not all(self.alive):
+            self.winner = ENEMIES if self.alive[ENEMIES] else PARTY if self.alive[PARTY] else DRAW
+
+    @property
+    def finished(self):
+        return self.winner is not None
+
+    def side(self, side):
+        return [f for f in self.fighters if f.side == side]
+
+    def weakest(self, side):
+        """Номер живого бойца стороны side с наименьшим hp (при равенстве — меньший номер)."""
+        heap = self.targets[side]
+        fighters = self.fighters
+        while heap:
+            hp, index = heap[0]
+            if fighters[index].hp == hp and hp > 0:
+                return index
+            heapq.heappop(heap)
+        return -1
+
+    # --- конвейер действия --------------------------------------------------
+
+    def roll(self):
+        """Промах, крит и разброс урона из одного числа генератора."""
+        r = self.rng.next()
+        roll = r % 100
+        return roll < MISS, roll >= CRIT, VARIANCE_MIN + (r >> 32) % VARIANCE_SPAN
+
+    @staticmethod
+    def compute_damage(actor, target, kind, crit, variance):
+        power = actor.skill_power if kind == SKILL else 100
+        dmg = actor.atk * power // 100
+        dmg = dmg * variance // 100
+        dmg = dmg * affinity_pct(actor.affinity, target.affinity) // 100
+        if crit:
+            dmg = dmg * CRIT_PCT // 100
+        return max(1, dmg - target.defense)
+
+    def apply(self, actor, target, damage):
+        damage = min(damage, target.hp)
+        target.hp -= damage
+        self.damage[actor.side] += damage
+        heap = self.targets[target.side]
+        if target.hp > 0:
+            heapq.heappush(heap, (target.hp, target.index))
+            # устаревших записей накопилось много — пересобрать кучу
+            if len(heap) > 4 * self.alive[target.side] + 16:
+                heap[:] = [(f.hp, f.index) for f in self.fighters if f.side == target.side and f.hp > 0]
+                heapq.heapify(heap)
+        else:
+            self.alive[target.side] -= 1
+            if self.alive[target.side] == 0:
+                self.winner = actor.side
+        return damage
+
+    def peek(self):
+        """Боец, который ходит следующим (None, если бой окончен)."""
+        if self.winner is not None:
+            return None
+        queue = self.queue
+        fighters = self.fighters
+        while fighters[queue[0][1]].hp <= 0:
+            heapq.heappop(queue)
+        return fighters[queue[0][1]]
+
+    def step(self, decision=None, roll=None):
+        """Один ход; возвращает Action или None, если бой окончен.
+
+        decision — (ATTACK/SKILL, номер цели) вместо policies (например,
+        решение ai), roll — (промах, крит, разброс) вместо броска генератора
+        (так поиск ai перебирает исходы, не трогая генератор).
+        """
+        if self.winner is not None:
+            return None
+        queue = self.queue
+        fighters = self.fighters
+        while True:
+            t, index = heapq.heappop(queue)
+            actor = fighters[index]
+            if actor.hp > 0:
+                break
+        heapq.heappush(queue, (t + TIME_SCALE // actor.speed, index))
+
+        if decision is None:
+            decision = self.policies.get(actor.side, default_policy)(self, actor)
+        kind, target_index = decision
+        target = fighters[target_index]
+        if kind == SKILL and actor.cooldown > 0:
+            # приём ещё перезаряжается — обычная атака
+            kind = ATTACK
+        if kind == SKILL:
+            actor.cooldown = actor.skill_cooldown
+        elif actor.cooldown > 0:
+            actor.cooldown -= 1
+
+        miss, crit, variance = self.roll() if roll is None else roll
+        damage = 0
+        if not miss:
+            damage = self.apply(actor, target, self.compute_damage(actor, target, kind, crit, variance))
+
+        self.turn += 1
+        action = Action(self.turn, index, target_index, kind, damage, miss, crit)
+        if self.winner is None and self.turn >= self.max_turns:
+            self.winner = DRAW
+        return action
+
+    def run(self):
+        """Провести бой до конца."""
+        step = self.step
+        while self.winner is None:
+            step()
+        return self.result()
+
+    def result(self):
+        return Result(self.winner, self.turn, tuple(self.damage), self.seed)
+
+    # --- копия и ключ состояния (для поиска, см. ai) ----------------------------
+
+    def copy(self):
+        """Независимая копия состояния боя (policies не копируются)."""
+        other = Battle.__new__(Battle)
+        other.fighters = fighters = []
+        for f in self.fighters:
+            c = Combatant.__new__(Combatant)
+            for name in Combatant.__slots__:
+                setattr(c, name, getattr(f, name))
+            fighters.append(c)
+        other.seed = self.seed
+        other.rng = Rng(self.rng.state)
+        other.max_turns = self.max_turns
+        other.policies = {}
+        other.turn = self.turn
+        other.winner = self.winner
+        other.alive = list(self.alive)
+        other.damage = list(self.damage)
+        other.queue = list(self.queue)
+        other.targets = (list(self.targets[0]), list(self.targets[1]))
+        return other
+
+    def state_key(self):
+        """Хэш позиции: здоровье, перезарядка и очередь живых бойцов (время — от ближайшего хода)."""
+        fighters = self.fighters
+        queue = [(t, i) for t, i in self.queue if fighters[i].hp > 0]
+        now = min(queue)[0] if queue else 0
+        return hash((tuple(f.hp for f in fighters), tuple(f.cooldown for f in fighters),
+                     tuple(sorted((t - now, i) for t, i in queue))))
+
+
+def make_party(affinity=None, members=PARTY_MEMBERS):
+    """Отряд игрока; первый боец (герой) получает стихию affinity."""
+    party = []
+    for i, key in enumerate(members):
+        party.append(Combatant(ARCHETYPES[key], PARTY, affinity if i == 0 else None))
+    return party
+
+
+def make_enemies(enemies):
+    """Враги по имени набора из ENCOUNTERS или по списку ключей ARCHETYPES."""
+    if isinstance(enemies, str):
+        enemies = ENCOUNTERS[enemies]
+    return [Combatant(ARCHETYPES[key], ENEMIES) for key in enemies]
+
+
+def encounter(affinity, enemies, seed=0, **kwargs):
+    """Бой стандартного отряда со стихией affinity против набора enemies."""
+    return Battle(make_party(affinity), make_enemies(enemies), seed, **kwargs)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    seed = int(argv[0]) if argv else 1
+    battle = encounter(AFFINITIES[0], "warband", seed=seed)
+    while not battle.finished:
+        print(battle.step().describe(battle))
+    print(battle.result())
+
+    # замер: ход в большом бою (войско из 300 бойцов против орды из 500)
+    turns = 0
+    elapsed = 0.0
+    for s in range(5):
+        party = make_party(AFFINITIES[s % len(AFFINITIES)], PARTY_MEMBERS * 100)
+        battle = Battle(party, make_enemies("horde"), seed=s)
+        t0 = time.perf_counter()
+        result = battle.run()
+        elapsed += time.perf_counter() - t0
+        turns += result.turns
+    print("horde: {} ходов, {:.2f} мкс на ход".format(turns, elapsed / turns * 1e6))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
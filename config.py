@@ -0,0 +1,234 @@
+"""Настройки игры (config.json): загружаются один раз и читаются из памяти.
+
+config.store.get(key) возвращает уже проверенное типизированное значение из
+памяти — его можно вызывать хоть каждый кадр. set(key, value) меняет значение,
+сразу уведомляет подписчиков (subscribe) и откладывает запись файла: серия
+изменений (например, перебор разрешений) записывается одним разом через
+DEBOUNCE_MS после последнего. При записи файл перечитывается и в него
+вливаются только изменённые ключи — чужие и неизвестные ключи сохраняются.
+Сама запись атомарна и идёт в потоке savewriter.writer; при выходе
+отложенная запись выполняется сразу.
+
+Ключи (SCHEMA): resolution [w, h], render_mode "dirty"/"flip", fps,
+render_scale (доля размера окна для внутреннего разрешения, 0.25..1, см.
+scenes), counters (путь файла счётчиков или null), difficulty (время на
+раздумья врагов в бою: easy/normal/hard, см. ai), trace_frames (сколько
+кадров пишет трасса по F4, см. profiler). Неверное значение в файле
+заменяется значением по умолчанию.
+"""
+import atexit
+import json
+import os
+import threading
+
+import savewriter
+
+DEBOUNCE_MS = 500
+FILENAME = "config.json"
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _resolution(value):
+    w, h = value
+    w, h = int(w), int(h)
+    if w <= 0 or h <= 0:
+        raise ValueError("размер окна должен быть положительным")
+    return (w, h)
+
+
+def _render_mode(value):
+    if value not in ("dirty", "flip"):
+        raise ValueError("render_mode: dirty или flip")
+    return value
+
+
+def _fps(value):
+    value = int(value)
+    if not 1 <= value <= 1000:
+        raise ValueError("fps вне диапазона 1..1000")
+    return value
+
+
+def _trace_frames(value):
+    value = int(value)
+    if not 1 <= value <= 100000:
+        raise ValueError("trace_frames вне диапазона 1..100000")
+    return value
+
+
+def _render_scale(value):
+    value = float(value)
+    if not 0.25 <= value <= 1.0:
+        raise ValueError("render_scale вне диапазона 0.25..1")
+    return value
+
+
+def _difficulty(value):
+    if value not in ("easy", "normal", "hard"):
+        raise ValueError("difficulty: easy, normal или hard")
+    return value
+
+
+def _optional_str(value):
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str):
+        raise ValueError("ожидается строка")
+    return value
+
+
+def _to_json(value):
+    return list(value) if isinstance(value, tuple) else value
+
+
+# ключ -> (значение по умолчанию, приведение к типу; ValueError/TypeError — неверное значение)
+SCHEMA = {
+    "resolution": ((800, 600), _resolution),
+    "render_mode": ("dirty", _render_mode),
+    "fps": (60, _fps),
+    "render_scale": (1.0, _render_scale),
+    "counters": (None, _optional_str),
+    "difficulty": ("normal", _difficulty),
+    "trace_frames": (300, _trace_frames),
+}
+
+
+class Config:
+    def __init__(self, path, schema=SCHEMA, writer=None, debounce_ms=DEBOUNCE_MS):
+        self.path = path
+        self.schema = schema
+        self.writer = writer or savewriter.writer
+        self.debounce_ms = debounce_ms
+        # exists — был ли файл при загрузке
+        self.exists = False
+        self._values = None
+        self._subscribers = {}
+        self._dirty = set()
+        # изменения, переданные потоку записи, но ещё не записанные
+        self._outgoing = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    # --- чтение -----------------------------------------------------------
+
+    def load(self):
+        """Прочитать файл (повторные вызовы ничего не делают)."""
+        if self._values is not None:
+            return
+        raw = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self.exists = True
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print("Не удалось прочитать {}: {}".format(self.path, e))
+        if not isinstance(raw, dict):
+            raw = {}
+        values = {}
+        for key, (default, convert) in self.schema.items():
+            value = default
+            if key in raw:
+                try:
+                    value = convert(raw[key])
+                except (TypeError, ValueError) as e:
+                    print("{}: неверное значение {!r} ({}), используется {!r}".format(
+                        key, raw[key], e, default))
+            values[key] = value
+        self._values = values
+
+    def get(self, key):
+        """Типизированное значение ключа из памяти."""
+        if self._values is None:
+            self.load()
+        return self._values[key]
+
+    # --- изменение --------------------------------------------------------
+
+    def set(self, key, value):
+        """Изменить значение: уведомить подписчиков и запланировать запись файла."""
+        if self._values is None:
+            self.load()
+        value = self.schema[key][1](value)
+        if self._values[key] == value:
+            return
+        self._values[key] = value
+        self.persist(key)
+        for callback in list(self._subscribers.get(key, ())) + list(self._subscribers.get(None, ())):
+            callback(key, value)
+
+    def persist(self, key):
+        """Записать текущее значение key в файл (отложенно), даже если оно не менялось."""
+        with self._lock:
+            self._dirty.add(key)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_ms / 1000.0, self._submit)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def subscribe(self, key, callback):
+        """callback(key, value) после каждого изменения key (None — любого ключа).
+
+        Вызывается в потоке, который вызвал set(). Возвращает функцию отписки.
+        """
+        self._subscribers.setdefault(key, []).append(callback)
+
+        def unsubscribe():
+            callbacks = self._subscribers.get(key, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+        return unsubscribe
+
+    # --- запись -----------------------------------------------------------
+
+    def _submit(self):
+        """Передать изменённые ключи потоку записи (срабатывает по таймеру)."""
+        with self._lock:
+            self._timer = None
+            if not self._dirty:
+                return
+            for key in self._dirty:
+                self._outgoing[key] = _to_json(self._values[key])
+            self._dirty.clear()
+        self.writer.call(self.path, self._write)
+
+    def _write(self):
+        with self._lock:
+            changes, self._outgoing = self._outgoing, {}
+        if not changes:
+            return
+        # перечитать файл: ключи, которые игра не меняла, остаются как есть
+        data = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if not isinstance(data, dict):
+            data = {}
+        data.update(changes)
+        savewriter.write_atomic(self.path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        self.exists = True
+
+    def flush(self):
+        """Записать отложенные изменения сейчас и дождаться записи."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        self._submit()
+        self.writer.flush()
+
+    def reopen(self, path):
+        """Записать отложенное и перейти на другой файл (подписчики остаются)."""
+        self.flush()
+        with self._lock:
+            self.path = path
+            self.exists = False
+            self._values = None
+
+
+store = Config(os.path.join(project_dir, FILENAME))
+atexit.register(store.flush)
@@ -0,0 +1,299 @@
+"""Счётчики «горячих» операций отрисовки: поверхности, рендер текста, blit и заливки.
+
+Пока счётчики выключены (по умолчанию), pygame не изменяется и цикл не
+тратит на них ничего, кроме проверки флага enabled. После enable():
+- pygame.Surface, pygame.font.Font, pygame.transform.scale/smoothscale и
+  pygame.draw.rect подменяются считающими обёртками;
+- SceneStack рисует кадр на холст (pygame.Surface, то есть уже считающий)
+  и копирует его в окно перед выводом, поэтому учитываются и операции с
+  экраном; для своих проверок такой холст даёт wrap_display;
+- реестр шрифтов (fonts) очищается, чтобы шрифты создавались уже
+  считающим классом Font; disable() очищает его снова. Шрифты, полученные
+  до переключения и сохранённые у себя, остаются прежнего класса.
+
+Исходную (несчитающую) функцию pygame в любой момент даёт original() — её
+нужно искать при вызове, а не запоминать при импорте.
+
+Считается (только в главном потоке — фоновая загрузка ресурсов не смешивается
+с кадрами):
+- surfaces — созданные поверхности: pygame.Surface(...), Font.render,
+  transform.scale/smoothscale, convert/convert_alpha/copy считаемых поверхностей;
+- renders — вызовы Font.render;
+- blits — blit и элементы blits на считаемых поверхностях;
+- fills, fill_px — заливки (fill и сплошной draw.rect) и число залитых пикселей.
+
+Счётчики копятся по кадрам и по сценам (SceneStack вызывает begin_frame и
+end_frame); summary() и dump(path) отдают итог, при enable(dump_path) он
+записывается в файл при выходе. В config.json ключ "counters" задаёт путь
+файла и включает счётчики при запуске игры.
+
+Пример проверки:
+    counters.enable()
+    canvas = counters.wrap_display(screen)
+    with counters.counting() as c:
+        scene.draw(canvas, True)
+    assert c["renders"] == 0
+"""
+import atexit
+import contextlib
+import json
+import os
+import threading
+
+import pygame
+
+import config
+
+KEYS = ("surfaces", "renders", "blits", "fills", "fill_px")
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+
+enabled = False
+# счётчики текущего (ещё не законченного) кадра и последнего законченного
+frame = dict.fromkeys(KEYS, 0)
+last_frame = dict.fromkeys(KEYS, 0)
+# имя сцены -> {"frames": n, "total": {...}, "max": {...}}
+per_scene = {}
+
+_scene = None
+_main_ident = None
+_originals = {}
+_dump_registered = set()
+
+_Surface = pygame.Surface
+_Font = pygame.font.Font
+
+
+def _add(key, n=1):
+    if threading.get_ident() == _main_ident:
+        frame[key] += n
+
+
+def _add_fill(rect):
+    if threading.get_ident() == _main_ident:
+        frame["fills"] += 1
+        frame["fill_px"] += rect.w * rect.h
+
+
+class CountingSurface(_Surface):
+    """pygame.Surface, считающий своё создание, blit и заливки."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _add("surfaces")
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        _add("blits")
+        return _Surface.blit(self, source, dest, area, special_flags)
+
+    def blits(self, blit_sequence, doreturn=1):
+        if not isinstance(blit_sequence, (list, tuple)):
+            blit_sequence = list(blit_sequence)
+        _add("blits", len(blit_sequence))
+        return _Surface.blits(self, blit_sequence, doreturn)
+
+    def fill(self, color, rect=None, special_flags=0):
+        rect = _Surface.fill(self, color, rect, special_flags)
+        _add_fill(rect)
+        return rect
+
+    def convert(self, *args):
+        _add("surfaces")
+        return _Surface.convert(self, *args)
+
+    def convert_alpha(self, *args):
+        _add("surfaces")
+        return _Surface.convert_alpha(self, *args)
+
+    def copy(self):
+        _add("surfaces")
+        return _Surface.copy(self)
+
+
+class CountingFont(_Font):
+    """pygame.font.Font, считающий вызовы render."""
+
+    def render(self, *args, **kwargs):
+        _add("renders")
+        _add("surfaces")
+        return _Font.render(self, *args, **kwargs)
+
+
+def _counting_transform(func):
+    def wrapper(*args, **kwargs):
+        _add("surfaces")
+        return func(*args, **kwargs)
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+def _counting_draw_rect(func):
+    def draw_rect(surface, color, rect, width=0, *args, **kwargs):
+        changed = func(surface, color, rect, width, *args, **kwargs)
+        if width == 0:
+            _add_fill(changed)
+        return changed
+    draw_rect.__doc__ = func.__doc__
+    return draw_rect
+
+
+# --- включение ---------------------------------------------------------------
+
+def original(module, name):
+    """Исходный атрибут pygame (до подмены счётчиками), например original(pygame.transform, "scale")."""
+    return _originals.get((module, name), getattr(module, name))
+
+
+def enable(dump_path=None):
+    """Включить счётчики; dump_path — записать summary() в этот файл при выходе.
+
+    Очищает реестр шрифтов (fonts.clear()), см. описание модуля.
+    """
+    global enabled, _main_ident
+    if not enabled:
+        _originals.update({
+            (pygame, "Surface"): pygame.Surface,
+            (pygame.font, "Font"): pygame.font.Font,
+            (pygame.transform, "scale"): pygame.transform.scale,
+            (pygame.transform, "smoothscale"): pygame.transform.smoothscale,
+            (pygame.draw, "rect"): pygame.draw.rect,
+        })
+        pygame.Surface = CountingSurface
+        pygame.font.Font = CountingFont
+        pygame.transform.scale = _counting_transform(_originals[(pygame.transform, "scale")])
+        pygame.transform.smoothscale = _counting_transform(_originals[(pygame.transform, "smoothscale")])
+        pygame.draw.rect = _counting_draw_rect(_originals[(pygame.draw, "rect")])
+        _main_ident = threading.get_ident()
+        enabled = True
+        _reset_fonts()
+    if dump_path and dump_path not in _dump_registered:
+        _dump_registered.add(dump_path)
+        atexit.register(dump, dump_path)
+
+
+def disable():
+    """Вернуть pygame исходные классы и функции (накопленные счётчики сохраняются).
+
+    Очищает реестр шрифтов (fonts.clear()), см. описание модуля.
+    """
+    global enabled
+    if not enabled:
+        return
+    for (module, name), value in _originals.items():
+        setattr(module, name, value)
+    _originals.clear()
+    enabled = False
+    _reset_fonts()
+
+
+def _reset_fonts():
+    # шрифты из реестра созданы прежним классом Font — пересоздать их при следующем запросе
+    import fonts
+    fonts.clear()
+
+
+def load_path():
+    """Путь файла счётчиков из ключа "counters" настроек (None — выключены)."""
+    path = config.store.get("counters")
+    if not path:
+        return None
+    return path if os.path.isabs(path) else os.path.join(project_dir, path)
+
+
+def wrap_display(display):
+    """Поверхность, на которой сцены рисуют кадр.
+
+    Без счётчиков — само окно. Со счётчиками — считающий холст того же
+    размера и формата (его нужно самому копировать в окно перед выводом).
+    """
+    if not enabled:
+        return display
+    return CountingSurface(display.get_size(), 0, display)
+
+
+# --- кадры и сцены -----------------------------------------------------------
+
+def begin_frame(scene_name):
+    """Начало кадра сцены scene_name (операции до первого кадра входят в него)."""
+    global _scene
+    _scene = scene_name
+
+
+def end_frame():
+    """Конец кадра: перенести счётчики кадра в итог сцены и обнулить их."""
+    stats = per_scene.get(_scene)
+    if stats is None:
+        stats = per_scene[_scene] = {
+            "frames": 0, "total": dict.fromkeys(KEYS, 0), "max": dict.fromkeys(KEYS, 0),
+        }
+    stats["frames"] += 1
+    total, peak = stats["total"], stats["max"]
+    for key in KEYS:
+        value = frame[key]
+        total[key] += value
+        if value > peak[key]:
+            peak[key] = value
+        last_frame[key] = value
+        frame[key] = 0
+
+
+def snapshot():
+    """Накопленные с начала (или reset) значения всех счётчиков, включая текущий кадр."""
+    out = dict(frame)
+    for stats in per_scene.values():
+        for key in KEYS:
+            out[key] += stats["total"][key]
+    return out
+
+
+def reset():
+    """Обнулить все счётчики."""
+    for key in KEYS:
+        frame[key] = 0
+        last_frame[key] = 0
+    per_scene.clear()
+
+
+def summary():
+    """Итог по сценам: кадры, суммы, среднее и максимум за кадр."""
+    out = {"frames": 0, "total": snapshot(), "scenes": {}}
+    for name, stats in per_scene.items():
+        n = stats["frames"]
+        out["frames"] += n
+        out["scenes"][str(name)] = {
+            "frames": n,
+            "total": dict(stats["total"]),
+            "per_frame": {k: round(v / float(n), 3) for k, v in stats["total"].items()},
+            "max": dict(stats["max"]),
+        }
+    return out
+
+
+def dump(path):
+    """Записать summary() в JSON-файл path."""
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary(), f, ensure_ascii=False, indent=2, sort_keys=True)
+    except OSError as e:
+        print("Не удалось записать счётчики {}: {}".format(path, e))
+
+
+@contextlib.contextmanager
+def counting():
+    """Посчитать операции внутри блока: with counting() as c: ... ; c["blits"].
+
+    Включает счётчики на время блока, если они были выключены.
+    """
+    was_enabled = enabled
+    enable()
+    result = dict.fromkeys(KEYS, 0)
+    before = snapshot()
+    try:
+        yield result
+    finally:
+        after = snapshot()
+        for key in KEYS:
+            result[key] = after[key] - before[key]
+        if not was_enabled:
+            disable()
@@ -0,0 +1,207 @@
+"""Дисковый кэш заранее масштабированных и сконвертированных изображений.
+
+Элемент кэша — «сырые» пиксели в заданном формате (как pygame.image.tobytes)
+с коротким заголовком. Ключ — (путь к исходнику, mtime, целевой размер,
+формат пикселей). Файл отображается в память (mmap) и превращается в
+Surface через pygame.image.frombuffer без декодирования JPEG/PNG.
+
+Индекс (index.json) хранит время последнего использования каждого элемента;
+cleanup() удаляет элементы устаревших исходников и самые старые элементы
+сверх лимита по объёму.
+"""
+import atexit
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+import pygame
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIR = os.path.join(project_dir, ".cache", "images")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# элементы, к которым не обращались дольше этого срока, удаляются при cleanup()
+DEFAULT_MAX_AGE_S = 30 * 24 * 3600
+
+MAGIC = b"PGRAW1\0\0"
+# magic, ширина, высота, длина строки формата, флаги (формат дополняется до 8 байт)
+_HEADER = struct.Struct("<8sIIII")
+INDEX_NAME = "index.json"
+# флаг заголовка: изображение непрозрачное, альфа-канал в файле можно игнорировать
+FLAG_OPAQUE = 1
+
+
+def preferred_format():
+    """Формат пикселей, который конвертируется в формат экрана простым копированием."""
+    display = pygame.display.get_surface()
+    if display is not None and display.get_bitsize() == 32:
+        masks = display.get_masks()[:3]
+        if masks == (0xFF0000, 0xFF00, 0xFF):
+            return "BGRA"
+        if masks == (0xFF, 0xFF00, 0xFF0000):
+            return "RGBA"
+    return "RGB"
+
+
+class DiskCache:
+    """Каталог с raw-файлами пикселей и индексом использования."""
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES, max_age_s=DEFAULT_MAX_AGE_S):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self._lock = threading.Lock()
+        self._index = None
+
+    # --- индекс -----------------------------------------------------------
+
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self._index_path(), "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except Exception:
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._index_path() + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._index, f)
+            os.replace(tmp, self._index_path())
+        except Exception:
+            pass
+
+    # --- ключи ------------------------------------------------------------
+
+    def _key(self, src_path, size, fmt):
+        """Имя файла элемента или None, если исходник не найден."""
+        try:
+            mtime = os.stat(src_path).st_mtime_ns
+        except OSError:
+            return None
+        raw = "{}|{}|{}x{}|{}".format(os.path.abspath(src_path), mtime, size[0], size[1], fmt)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest() + ".raw"
+
+    # --- чтение/запись ----------------------------------------------------
+
+    def load(self, src_path, size, fmt):
+        """(Surface поверх mmap, непрозрачность) из кэша или None при промахе."""
+        name = self._key(src_path, size, fmt)
+        if name is None:
+            return None
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, w, h, fmt_len, flags = _HEADER.unpack_from(mm, 0)
+            offset = _HEADER.size + 8
+            stored_fmt = bytes(mm[_HEADER.size:_HEADER.size + fmt_len]).decode("ascii")
+            if magic != MAGIC or (w, h) != tuple(size) or stored_fmt != fmt:
+                mm.close()
+                return None
+            # Surface ссылается на буфер mmap, копирования пикселей нет
+            surf = pygame.image.frombuffer(memoryview(mm)[offset:], (w, h), fmt)
+        except Exception:
+            mm.close()
+            return None
+        with self._lock:
+            entry = self._load_index().get(name)
+            if entry is not None:
+                entry["atime"] = time.time()
+        return surf, bool(flags & FLAG_OPAQUE)
+
+    def store(self, src_path, surf, fmt, opaque=False):
+        """Записать пиксели surf в кэш для исходника src_path."""
+        size = surf.get_size()
+        name = self._key(src_path, size, fmt)
+        if name is None:
+            return False
+        data = pygame.image.tobytes(surf, fmt)
+        fmt_bytes = fmt.encode("ascii")
+        header = _HEADER.pack(MAGIC, size[0], size[1], len(fmt_bytes),
+                              FLAG_OPAQUE if opaque else 0) + fmt_bytes.ljust(8, b"\0")
+        path = os.path.join(self.directory, name)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(header)
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return False
+        with self._lock:
+            self._load_index()[name] = {
+                "src": os.path.abspath(src_path),
+                "mtime": os.stat(src_path).st_mtime_ns,
+                "bytes": len(header) + len(data),
+                "atime": time.time(),
+            }
+            self._cleanup_locked()
+            self._save_index()
+        return True
+
+    # --- очистка ----------------------------------------------------------
+
+    def _remove(self, name):
+        self._index.pop(name, None)
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def _cleanup_locked(self):
+        index = self._load_index()
+        now = time.time()
+        for name, entry in list(index.items()):
+            try:
+                stale = os.stat(entry["src"]).st_mtime_ns != entry["mtime"]
+            except (OSError, KeyError):
+                stale = True
+            if stale or now - entry.get("atime", 0) > self.max_age_s:
+                self._remove(name)
+        total = sum(e.get("bytes", 0) for e in index.values())
+        for name in sorted(index, key=lambda n: index[n].get("atime", 0)):
+            if total <= self.max_bytes:
+                break
+            total -= index[name].get("bytes", 0)
+            self._remove(name)
+        # файлы, которых нет в индексе (например, после сбоя записи)
+        try:
+            for fn in os.listdir(self.directory):
+                if fn != INDEX_NAME and fn not in index:
+                    try:
+                        os.remove(os.path.join(self.directory, fn))
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+    def cleanup(self):
+        """Удалить устаревшие элементы и уложиться в лимит по объёму."""
+        with self._lock:
+            self._cleanup_locked()
+            self._save_index()
+
+    def flush(self):
+        """Сохранить индекс (время использования элементов)."""
+        with self._lock:
+            if self._index is not None:
+                self._save_index()
+
+
+# общий кэш для менеджера ресурсов
+cache = DiskCache()
+atexit.register(cache.flush)
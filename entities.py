@@ -0,0 +1,286 @@
+"""Хранилище сущностей и компонентов на массивах (NPC, предметы, снаряды, декорации).
+
+Сущность — просто номер. Компонент — набор полей, каждое поле хранится
+в отдельном массиве array.array, индекс в котором — номер сущности
+(World.column(компонент, поле)). Объектов на сущность нет: память растёт
+только удвоением ёмкости массивов, а не на каждую сущность.
+
+- create/destroy — O(1): номера удалённых сущностей идут в список
+  свободных и выдаются повторно (после destroy номер может достаться
+  новой сущности — храните номера только живых сущностей).
+- add/remove компонента — O(1): у каждой сущности битовая маска
+  компонентов, у каждого компонента — плотный список своих сущностей
+  (sparse set: удаление переставляет последний элемент на место
+  удалённого).
+- query(*компоненты) — номера сущностей, у которых есть все компоненты;
+  перебирается плотный список самого редкого из них.
+
+Системы — функции над столбцами: movement(world, dt), expire(world, dt),
+draw_shapes(world, surface). В цикле системы стоит связать столбцы с
+локальными переменными и идти по номерам из query — так тысячи сущностей
+укладываются в кадр.
+
+    world = entities.World(entities.STANDARD_COMPONENTS)
+    e = world.create(position=(10, 20), velocity=(60, 0), shape=(4, 4, 0xffcc00))
+    entities.movement(world, dt)
+
+`python entities.py` — замер систем на тысячах сущностей.
+"""
+import argparse
+import random
+import sys
+import time
+from array import array
+
+
+class Component:
+    """Тип компонента: имя и поля {поле: код типа array ('f', 'i', 'I', 'B', ...)}."""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = dict(fields)
+
+
+POSITION = Component("position", {"x": "f", "y": "f"})
+VELOCITY = Component("velocity", {"vx": "f", "vy": "f"})
+# оставшееся время жизни в мс (снаряды, эффекты); по истечении сущность удаляется
+LIFETIME = Component("lifetime", {"ms": "f"})
+# прямоугольник для отрисовки: размер и цвет 0xRRGGBB
+SHAPE = Component("shape", {"w": "H", "h": "H", "color": "I"})
+
+STANDARD_COMPONENTS = (POSITION, VELOCITY, LIFETIME, SHAPE)
+
+
+class World:
+    """Сущности и столбцы компонентов (не более 64 типов компонентов)."""
+
+    def __init__(self, components=STANDARD_COMPONENTS, capacity=256):
+        if len(components) > 64:
+            raise ValueError("не более 64 типов компонентов")
+        self.components = {c.name: c for c in components}
+        self.capacity = capacity
+        # номер компонента -> бит маски
+        self.bits = {c.name: 1 << i for i, c in enumerate(components)}
+        # маска компонентов по номеру сущности; 0 — номер свободен
+        self.masks = array("Q", bytes(8 * capacity))
+        self.alive = array("B", bytes(capacity))
+        self.free = array("i")
+        self.next_id = 0
+        self.count = 0
+        # столбцы: (компонент, поле) -> массив по номеру сущности
+        self.columns = {}
+        for c in components:
+            for field, code in c.fields.items():
+                self.columns[c.name, field] = array(code, bytes(array(code).itemsize * capacity))
+        # sparse set компонента: плотный список номеров и позиция номера в нём
+        self.dense = {c.name: array("i") for c in components}
+        self.sparse = {c.name: array("i", bytes(4 * capacity)) for c in components}
+
+    # --- сущности -------------------------------------------------------------
+
+    def _grow(self):
+        extra = self.capacity
+        self.capacity += extra
+        self.masks.frombytes(bytes(8 * extra))
+        self.alive.frombytes(bytes(extra))
+        for column in self.columns.values():
+            column.frombytes(bytes(column.itemsize * extra))
+        for sparse in self.sparse.values():
+            sparse.frombytes(bytes(4 * extra))
+
+    def create(self, **components):
+        """Новая сущность; components — {имя: значения полей (кортеж по порядку или dict)}."""
+        if self.free:
+            eid = self.free.pop()
+        else:
+            if self.next_id == self.capacity:
+                self._grow()
+            eid = self.next_id
+            self.next_id += 1
+        self.alive[eid] = 1
+        self.count += 1
+        for name, values in components.items():
+            self.add(eid, name, values)
+        return eid
+
+    def destroy(self, eid):
+        """Удалить сущность со всеми компонентами; номер уходит в список свободных."""
+        if not self.alive[eid]:
+            return
+        mask = self.masks[eid]
+        if mask:
+            for name, bit in self.bits.items():
+                if mask & bit:
+                    self.remove(eid, name)
+        self.alive[eid] = 0
+        self.count -= 1
+        self.free.append(eid)
+
+    def __len__(self):
+        return self.count
+
+    # --- компоненты -----------------------------------------------------------
+
+    def add(self, eid, name, values=()):
+        """Добавить (или перезаписать) компонент name сущности eid.
+
+        У нового компонента незаданные поля равны 0 (номер мог остаться от
+        удалённой сущности); у существующего перезаписываются только
+        переданные поля. Номер должен принадлежать живой сущности (KeyError):
+        иначе компонент достался бы будущему владельцу номера из free.
+        """
+        if not self.alive[eid]:
+            raise KeyError("сущность %d не существует" % eid)
+        fields = self.components[name].fields
+        bit = self.bits[name]
+        if not self.masks[eid] & bit:
+            for field in fields:
+                self.columns[name, field][eid] = 0
+            self.masks[eid] |= bit
+            dense = self.dense[name]
+            self.sparse[name][eid] = len(dense)
+            dense.append(eid)
+        if isinstance(values, dict):
+            for field, value in values.items():
+                self.columns[name, field][eid] = value
+        else:
+            for field, value in zip(fields, values):
+                self.columns[name, field][eid] = value
+
+    def remove(self, eid, name):
+        """Убрать компонент name у сущности eid (поля остаются в столбцах до следующего add)."""
+        bit = self.bits[name]
+        if not self.masks[eid] & bit:
+            return
+        self.masks[eid] &= ~bit
+        dense = self.dense[name]
+        sparse = self.sparse[name]
+        pos = sparse[eid]
+        last = dense.pop()
+        if last != eid:
+            dense[pos] = last
+            sparse[last] = pos
+
+    def has(self, eid, *names):
+        need = self.mask_of(names)
+        return self.masks[eid] & need == need
+
+    def mask_of(self, names):
+        mask = 0
+        for name in names:
+            mask |= self.bits[name]
+        return mask
+
+    def column(self, name, field):
+        """Массив поля field компонента name, индекс — номер сущности."""
+        return self.columns[name, field]
+
+    def get(self, eid, name):
+        """Значения полей компонента сущности (dict) — для отладки и редких обращений."""
+        return {field: self.columns[name, field][eid] for field in self.components[name].fields}
+
+    def query(self, *names):
+        """Номера сущностей, у которых есть все компоненты names (копия — можно удалять по ходу)."""
+        if len(names) == 1:
+            return array("i", self.dense[names[0]])
+        smallest = min(names, key=lambda n: len(self.dense[n]))
+        need = self.mask_of(names)
+        masks = self.masks
+        return array("i", [e for e in self.dense[smallest] if masks[e] & need == need])
+
+
+# --- системы -------------------------------------------------------------------
+
+def movement(world, dt):
+    """position += velocity * dt (dt — мс, скорость — пикселей в секунду)."""
+    x = world.column("position", "x")
+    y = world.column("position", "y")
+    vx = world.column("velocity", "vx")
+    vy = world.column("velocity", "vy")
+    k = dt / 1000.0
+    for e in world.query("position", "velocity"):
+        x[e] += vx[e] * k
+        y[e] += vy[e] * k
+
+
+def expire(world, dt):
+    """Уменьшить lifetime на dt и удалить сущности, чьё время вышло; возвращает их число."""
+    ms = world.column("lifetime", "ms")
+    expired = 0
+    for e in world.query("lifetime"):
+        left = ms[e] - dt
+        ms[e] = left
+        if left <= 0:
+            world.destroy(e)
+            expired += 1
+    return expired
+
+
+def draw_shapes(world, surface, offset=(0, 0)):
+    """Нарисовать прямоугольники SHAPE в точках POSITION заливкой (без создания поверхностей)."""
+    x = world.column("position", "x")
+    y = world.column("position", "y")
+    w = world.column("shape", "w")
+    h = world.column("shape", "h")
+    color = world.column("shape", "color")
+    ox, oy = offset
+    fill = surface.fill
+    # цвет 0xRRGGBB -> значение пикселя поверхности (цветов мало, сущностей много)
+    mapped = {}
+    for e in world.query("position", "shape"):
+        c = color[e]
+        pixel = mapped.get(c)
+        if pixel is None:
+            pixel = mapped[c] = surface.map_rgb((c >> 16) & 0xff, (c >> 8) & 0xff, c & 0xff)
+        # pygame 2 принимает дробные координаты прямоугольника — без int() на сущность
+        fill(pixel, (x[e] - ox, y[e] - oy, w[e], h[e]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер систем хранилища сущностей")
+    parser.add_argument("-n", type=int, default=5000, help="сущностей")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    import pygame
+    surface = pygame.Surface((800, 600))
+
+    rnd = random.Random(1)
+    world = World(capacity=64)
+
+    def spawn():
+        # снаряды с конечным временем жизни и неподвижные декорации вперемешку
+        if rnd.random() < 0.7:
+            world.create(position=(rnd.uniform(0, 800), rnd.uniform(0, 600)),
+                         velocity=(rnd.uniform(-120, 120), rnd.uniform(-120, 120)),
+                         lifetime=(rnd.uniform(500, 3000),), shape=(3, 3, 0xffcc00))
+        else:
+            world.create(position=(rnd.uniform(0, 800), rnd.uniform(0, 600)), shape=(6, 6, 0x406080))
+
+    for _ in range(args.n):
+        spawn()
+    times = {"movement": 0.0, "expire": 0.0, "draw": 0.0}
+    dt = 1000.0 / 60
+    for _ in range(args.frames):
+        t0 = time.perf_counter()
+        movement(world, dt)
+        t1 = time.perf_counter()
+        expired = expire(world, dt)
+        t2 = time.perf_counter()
+        surface.fill((0, 0, 0))
+        draw_shapes(world, surface)
+        t3 = time.perf_counter()
+        for _ in range(expired):
+            spawn()
+        times["movement"] += t1 - t0
+        times["expire"] += t2 - t1
+        times["draw"] += t3 - t2
+    print("сущностей: {}, ёмкость: {}".format(len(world), world.capacity))
+    for name, total in times.items():
+        print("{:<9} {:.3f} мс/кадр".format(name, total / args.frames * 1000.0))
+    print("всего     {:.3f} мс/кадр".format(sum(times.values()) / args.frames * 1000.0))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Общий реестр шрифтов для всех экранов.
+
+pygame.font.SysFont при каждом вызове ищет шрифт среди системных и заново
+загружает файл. Реестр один раз разрешает имя семейства в путь к файлу и
+хранит созданные объекты Font по ключу (семейство, размер, bold, italic),
+вытесняя давно не использованные (LRU).
+"""
+from collections import OrderedDict
+
+import pygame
+
+MAX_FONTS = 32
+
+_fonts = OrderedDict()
+# семейство/стиль -> путь к файлу шрифта (None — шрифт pygame по умолчанию)
+_paths = {}
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _resolve(family, bold, italic):
+    """Найти файл шрифта для семейства (результат кэшируется)."""
+    key = (family, bold, italic)
+    if key not in _paths:
+        path = None
+        if family:
+            try:
+                path = pygame.font.match_font(family, bold, italic)
+            except Exception:
+                path = None
+        _paths[key] = path
+    return _paths[key]
+
+
+def _create(family, size, bold, italic):
+    path = _resolve(family, bold, italic)
+    try:
+        font = pygame.font.Font(path, size)
+    except Exception:
+        # файл найден, но не загрузился — используем шрифт по умолчанию
+        path = None
+        font = pygame.font.Font(None, size)
+    if path is None:
+        # без отдельного файла начертания стиль имитируется, как в SysFont
+        font.set_bold(bold)
+        font.set_italic(italic)
+    else:
+        # match_font не нашёл жирного/курсивного файла и вернул тот же, что
+        # и без этого стиля — тогда стиль тоже имитируется
+        font.set_bold(bold and path == _resolve(family, False, italic))
+        font.set_italic(italic and path == _resolve(family, bold, False))
+    return font
+
+
+def get_font(family, size, bold=False, italic=False):
+    """Вернуть общий объект Font для (family, size, bold, italic).
+
+    family — имя семейства, как для SysFont ("Arial", "Times New Roman"),
+    или None для шрифта по умолчанию.
+    """
+    key = (family.lower() if family else None, int(size), bool(bold), bool(italic))
+    font = _fonts.get(key)
+    if font is not None:
+        _stats["hits"] += 1
+        _fonts.move_to_end(key)
+        return font
+    _stats["misses"] += 1
+    if not pygame.font.get_init():
+        pygame.font.init()
+    font = _create(family, key[1], key[2], key[3])
+    _fonts[key] = font
+    if len(_fonts) > MAX_FONTS:
+        _fonts.popitem(last=False)
+        _stats["evictions"] += 1
+    return font
+
+
+def stats():
+    """Счётчики реестра: hits, misses, evictions и текущее число шрифтов."""
+    result = dict(_stats)
+    result["size"] = len(_fonts)
+    return result
+
+
+def clear():
+    """Забыть все созданные шрифты (пути к файлам семейств сохраняются)."""
+    _fonts.clear()
@@ -1,11 +1,150 @@
 import random
 
-def play():
-    """Заглушка для функции play.
+import pygame
 
-    Временная реализация, чтобы main.py мог импортировать play() без ошибки.
-    Можно позже заменить реальной логикой мини-игры.
+import ai
+import combat
+import config
+import fonts
+import scenes
+from glyphatlas import draw_text, text_size
+
+# сколько последних ходов показывать в журнале
+LOG_LINES = 6
+
+
+class BattleScene(scenes.Scene):
+    """Пошаговый бой (правила — combat): SPACE — следующий ход, ESC — в меню.
+
+    Отряд игрока слева, враги справа, под ними журнал последних ходов.
+    Отряд ходит по combat.default_policy, враги — по решению ai: поиск идёт
+    в отдельном процессе (ai.Thinker) с бюджетом времени по сложности
+    (ключ "difficulty" в config.json), а сцена каждый кадр проверяет, готово
+    ли решение, — окно не замирает, пока враг «думает». В остальное время
+    экран меняется только от нажатий, и цикл ждёт событий.
+    """
+
+    def __init__(self, affinity=None, enemies="warband", seed=None, thinker=None):
+        super().__init__()
+        if seed is None:
+            seed = random.randrange(1 << 63)
+        self.battle = combat.encounter(affinity, enemies, seed=seed)
+        self.log = []
+        self.font = fonts.get_font("Arial", 20)
+        self.hint_font = fonts.get_font("Arial", 16)
+        self.changed = True
+        self.thinker = thinker or ai.Thinker()
+        self.difficulty = config.store.get("difficulty")
+        # решение врага, которое ещё считается (Future)
+        self.pending = None
+
+    @property
+    def animating(self):
+        return self.changed or self.pending is not None
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_ESCAPE:
+            self.app.pop()
+        elif event.key == pygame.K_SPACE and self.pending is None:
+            actor = self.battle.peek()
+            if actor is None:
+                return
+            if actor.side == combat.ENEMIES:
+                self.pending = self.thinker.think(self.battle, self.difficulty)
+                self.changed = True
+            else:
+                self.advance(None)
+
+    def exit(self):
+        # процесс поиска не переживает сцену — ни по ESC, ни при закрытии окна
+        self.thinker.close()
+        self.pending = None
+
+    def update(self, dt):
+        if self.pending is not None and self.pending.done():
+            future, self.pending = self.pending, None
+            try:
+                decision = future.result()
+            except Exception as e:
+                # поиск не удался — враг ходит по обычному правилу
+                print("ИИ врага: {}".format(e))
+                decision = None
+            self.advance(decision)
+
+    def advance(self, decision):
+        action = self.battle.step(decision)
+        if action is not None:
+            self.log.append(action.describe(self.battle))
+            del self.log[:-LOG_LINES]
+            self.changed = True
+
+    def draw_side(self, screen, fighters, x, y, width):
+        font = self.font
+        line_h = font.get_height() + 10
+        for fighter in fighters:
+            color = (220, 220, 220) if fighter.alive else (110, 110, 110)
+            draw_text(screen, font, fighter.name, color, (x, y))
+            # полоска здоровья
+            bar = pygame.Rect(x, y + font.get_height() + 2, width, 5)
+            pygame.draw.rect(screen, (60, 20, 20), bar)
+            bar.w = width * fighter.hp // fighter.max_hp
+            pygame.draw.rect(screen, (60, 170, 60), bar)
+            y += line_h
+        return y
+
+    def draw(self, screen, full):
+        if not (full or self.changed):
+            return None
+        self.changed = False
+        battle = self.battle
+        sw, sh = screen.get_size()
+        screen.fill((15, 15, 25))
+
+        margin = 40
+        col_w = (sw - 3 * margin) // 2
+        shown = max(1, (sh // 2 - margin) // (self.font.get_height() + 10))
+        y1 = self.draw_side(screen, battle.side(combat.PARTY)[:shown], margin, margin, col_w)
+        # большие группы врагов: показываются только живые, сколько поместится
+        enemies = [f for f in battle.side(combat.ENEMIES) if f.alive][:shown]
+        y2 = self.draw_side(screen, enemies, 2 * margin + col_w, margin, col_w)
+
+        y = max(y1, y2) + 20
+        for line in self.log:
+            draw_text(screen, self.hint_font, line, (180, 180, 200), (margin, y))
+            y += self.hint_font.get_height() + 4
+
+        if self.pending is not None:
+            status = "Противник думает..."
+        elif battle.finished:
+            status = {combat.PARTY: "Победа!", combat.ENEMIES: "Поражение...",
+                      combat.DRAW: "Ничья"}[battle.winner]
+        else:
+            status = "Ход {}".format(battle.turn + 1)
+        status_w = text_size(self.font, status)[0]
+        draw_text(screen, self.font, status, (255, 255, 255), ((sw - status_w) // 2, sh - 70))
+
+        hint = "SPACE — следующий ход, ESC — в меню"
+        hint_w = text_size(self.hint_font, hint)[0]
+        draw_text(screen, self.hint_font, hint, (150, 150, 150), ((sw - hint_w) // 2, sh - 35))
+        return [screen.get_rect()]
+
+
+def play(screen=None, affinity=None, enemies="warband", seed=None):
+    """Бой в отдельном цикле (см. BattleScene); без screen — в консоли, без pygame-окна.
+
+    affinity — стихия героя (имя цвета из вступления), seed — зерно
+    генератора (одинаковое зерно — одинаковый бой). Возвращает
+    combat.Result для консольного боя и screen для оконного.
     """
-    print("Запуск функции play() — заглушка. Продолжение запуска main().")
-    # ...можно реализовать консольную мини-игры или открыть отдельное окно...
-    return
\ No newline at end of file
+    if screen is not None:
+        return scenes.run_scene(screen, BattleScene(affinity, enemies, seed))
+    if seed is None:
+        seed = random.randrange(1 << 63)
+    battle = combat.encounter(affinity, enemies, seed=seed)
+    while not battle.finished:
+        print(battle.step().describe(battle))
+    result = battle.result()
+    print("Итог:", {combat.PARTY: "победа", combat.ENEMIES: "поражение", combat.DRAW: "ничья"}[result.winner])
+    return result
@@ -0,0 +1,220 @@
+"""Атлас глифов для отрисовки часто меняющихся строк.
+
+Каждый глиф (шрифт, символ, цвет) растеризуется через Font.render один раз
+и копируется на общую страницу атласа. Строка рисуется одним вызовом
+Surface.blits из кусков атласа — новых поверхностей на кадр не создаётся.
+
+Позиции глифов внутри слова берутся из ширин префиксов слова (font.size),
+слова сдвигаются друг относительно друга по ширине стыка (слово и первый
+символ следующего), поэтому кернинг и дробные сдвиги пера почти всегда
+совпадают с pygame.font, а раскладка строки линейна по её длине. Раскладки
+строк и слов кэшируются. Размер строки совпадает с font.size, межстрочный
+шаг — font.get_linesize().
+
+Результат близок к Font.render, но не всегда совпадает с ним попиксельно:
+глифы растеризуются по отдельности, и там, где их штрихи перекрываются
+(лигатуры вроде "fi", "ffl", выступающие за ширину символа глифы,
+синтетический bold), края отличаются по прозрачности; на стыке слов
+позиция изредка расходится с формированием всей строки на пиксель. Для
+статичного текста, где важна точность, по-прежнему стоит использовать
+Font.render.
+"""
+import re
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+PAGE_SIZE = 512
+# при переполнении атлас сбрасывается целиком и заполняется заново
+MAX_PAGES = 8
+# ограничение на число запомненных раскладок строк и слов для одного шрифта
+MAX_LAYOUTS = 1024
+MAX_WORDS = 4096
+
+# слово вместе с пробелами после него (или пробелы в начале строки)
+_WORD = re.compile(r"\S+\s*|\s+")
+
+
+class _FontData:
+    """Кэши, относящиеся к одному шрифту: глифы, ширины символов, раскладки слов и строк."""
+
+    def __init__(self, font):
+        self.glyphs = {}
+        self.widths = {}
+        self.words = OrderedDict()
+        self.layouts = OrderedDict()
+        self.height = font.get_height()
+        self.linesize = font.get_linesize()
+
+
+class GlyphAtlas:
+    """Набор страниц-поверхностей с упакованными по полкам глифами."""
+
+    def __init__(self, page_size=PAGE_SIZE):
+        self.page_size = page_size
+        self.pages = []
+        self._fonts = weakref.WeakKeyDictionary()
+        # текущая полка на последней странице
+        self._x = 0
+        self._y = 0
+        self._shelf_h = 0
+
+    # --- упаковка ---------------------------------------------------------
+
+    def _new_page(self):
+        if len(self.pages) >= MAX_PAGES:
+            self.clear()
+        page = pygame.Surface((self.page_size, self.page_size), pygame.SRCALPHA)
+        page.fill((0, 0, 0, 0))
+        self.pages.append(page)
+        self._x = self._y = self._shelf_h = 0
+        return page
+
+    def _alloc(self, w, h):
+        """Выделить место w x h; вернуть (страница, Rect)."""
+        if not self.pages:
+            self._new_page()
+        if self._x + w > self.page_size:
+            # следующая полка
+            self._x = 0
+            self._y += self._shelf_h + 1
+            self._shelf_h = 0
+        if self._y + h > self.page_size:
+            self._new_page()
+        page = self.pages[-1]
+        rect = pygame.Rect(self._x, self._y, w, h)
+        self._x += w + 1
+        self._shelf_h = max(self._shelf_h, h)
+        return page, rect
+
+    # --- глифы и метрики --------------------------------------------------
+
+    def _data(self, font):
+        data = self._fonts.get(font)
+        if data is None:
+            data = _FontData(font)
+            self._fonts[font] = data
+        return data
+
+    def _glyph(self, font, data, ch, color):
+        key = (ch, color)
+        glyph = data.glyphs.get(key)
+        if glyph is None:
+            surf = font.render(ch, True, color)
+            w, h = surf.get_size()
+            if w == 0 or h == 0 or w > self.page_size or h > self.page_size:
+                glyph = (None, None)
+            else:
+                page, rect = self._alloc(w, h)
+                # на прозрачной странице BLEND_RGBA_MAX копирует пиксели глифа как есть
+                page.blit(surf, rect.topleft, special_flags=pygame.BLEND_RGBA_MAX)
+                glyph = (page, rect)
+            data.glyphs[key] = glyph
+        return glyph
+
+    def _width(self, font, data, ch):
+        w = data.widths.get(ch)
+        if w is None:
+            w = font.size(ch)[0]
+            data.widths[ch] = w
+        return w
+
+    def _word(self, font, data, word):
+        """Позиции символов слова от его начала (результат кэшируется).
+
+        Позиция символа i — ширина префикса word[:i + 1] минус ширина
+        самого символа; так учитываются кернинг и дробные сдвиги пера.
+        """
+        xs = data.words.get(word)
+        if xs is not None:
+            data.words.move_to_end(word)
+            return xs
+        xs = [font.size(word[:i + 1])[0] - self._width(font, data, ch) for i, ch in enumerate(word)]
+        data.words[word] = xs
+        if len(data.words) > MAX_WORDS:
+            data.words.popitem(last=False)
+        return xs
+
+    def _layout(self, font, data, line):
+        """Позиции глифов строки и её размер (результат кэшируется).
+
+        Строка делится на слова (с пробелами после них); следующее слово
+        начинается там, где в строке «слово + его первый символ» стоял бы
+        этот символ. Префиксы перемеряются только внутри слов, поэтому
+        раскладка линейна по длине строки.
+        """
+        layout = data.layouts.get(line)
+        if layout is not None:
+            data.layouts.move_to_end(line)
+            return layout
+        xs = []
+        x = 0
+        words = _WORD.findall(line)
+        for i, word in enumerate(words):
+            xs.extend(x + wx for wx in self._word(font, data, word))
+            if i + 1 < len(words):
+                first = words[i + 1][0]
+                x += font.size(word + first)[0] - self._width(font, data, first)
+        w, h = font.size(line) if line else (0, data.height)
+        layout = (xs, w, h)
+        data.layouts[line] = layout
+        if len(data.layouts) > MAX_LAYOUTS:
+            data.layouts.popitem(last=False)
+        return layout
+
+    def size(self, font, text):
+        """Размер строки (как font.size), многострочный текст разделяется '\\n'."""
+        data = self._data(font)
+        lines = text.split('\n')
+        w = 0
+        for line in lines:
+            w = max(w, self._layout(font, data, line)[1])
+        h = self._layout(font, data, lines[-1])[2] + data.linesize * (len(lines) - 1)
+        return w, h
+
+    # --- отрисовка --------------------------------------------------------
+
+    def draw(self, dest, font, text, color, pos):
+        """Нарисовать text на dest в позиции pos (левый верхний угол).
+
+        Возвращает Rect занятой области.
+        """
+        color = tuple(color)
+        data = self._data(font)
+        x0, y = pos
+        seq = []
+        width = 0
+        lines = text.split('\n')
+        for line in lines:
+            xs, w, h = self._layout(font, data, line)
+            for ch, x in zip(line, xs):
+                page, rect = self._glyph(font, data, ch, color)
+                if page is not None:
+                    seq.append((page, (x0 + x, y), rect))
+            width = max(width, w)
+            y += data.linesize
+        if seq:
+            dest.blits(seq, doreturn=False)
+        height = h + data.linesize * (len(lines) - 1)
+        return pygame.Rect(x0, pos[1], width, height)
+
+    def clear(self):
+        """Сбросить все страницы и кэши (например, при нехватке памяти)."""
+        self.pages = []
+        self._fonts = weakref.WeakKeyDictionary()
+        self._x = self._y = self._shelf_h = 0
+
+
+# общий атлас для всех экранов
+atlas = GlyphAtlas()
+
+
+def draw_text(dest, font, text, color, pos):
+    """Нарисовать строку через общий атлас; см. GlyphAtlas.draw."""
+    return atlas.draw(dest, font, text, color, pos)
+
+
+def text_size(font, text):
+    """Размер строки через общий атлас; см. GlyphAtlas.size."""
+    return atlas.size(font, text)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Запуск игры без окна и воспроизведение ввода по сценарию.
+
+Окно создаётся через dummy-драйвер SDL, события клавиатуры берутся из
+сценария (JSON) и подаются по виртуальным часам: кадр длится ровно 1000/fps
+мс, а ожидание на статичных экранах мгновенно перематывается к следующему
+событию. Прогон не зависит от скорости машины и не ограничен 60 FPS.
+
+Формат сценария:
+    {
+      "fps": 60,
+      "resolution": [800, 600],
+      "config": {"render_scale": 1.0, "difficulty": "normal"},
+      "events": [
+        {"t": 500, "key": "RETURN"},
+        {"t": 15500, "key": "2"},
+        {"t": 16000, "key": "ESCAPE"}
+      ],
+      "end": 20000
+    }
+t — виртуальное время в мс от старта; key — имя клавиши без префикса K_
+(см. pygame.K_*). По достижении "end" (по умолчанию — через секунду после
+последнего события) прогон завершается.
+
+Прогон не трогает настройки и сохранения игрока: config.store и saves.store
+на время прогона переключаются на config.json и saves.dat во временной
+папке (или в --data-dir). Настройки прогона — значения по умолчанию,
+resolution сценария и ключи из "config"; сохранений в начале нет.
+
+Примеры:
+  python headless.py replays/intro_choice.json
+  python headless.py --record my_run.json      # играть в окне и записать ввод
+  python headless.py replays/intro_choice.json --counters counters.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pygame
+
+import counters
+import scheduler
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+
+# ключи config.json, которые --record сохраняет в сценарий
+RECORDED_SETTINGS = ("render_mode", "render_scale", "difficulty")
+
+
+def setup(video=True, audio=True):
+    """Переключить SDL на dummy-драйверы (вызывать до pygame.init())."""
+    if video:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    if audio:
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+def load_script(path):
+    """Прочитать сценарий и отсортировать события по времени."""
+    with open(path, "r", encoding="utf-8") as f:
+        script = json.load(f)
+    script["events"] = sorted(script.get("events", []), key=lambda e: e["t"])
+    return script
+
+
+def make_event(spec):
+    """pygame-событие из записи сценария."""
+    if spec.get("type") == "QUIT":
+        return pygame.event.Event(pygame.QUIT)
+    key = getattr(pygame, "K_" + spec["key"])
+    etype = pygame.KEYUP if spec.get("type") == "KEYUP" else pygame.KEYDOWN
+    return pygame.event.Event(etype, key=key, mod=0, unicode=spec.get("unicode", ""), scancode=0)
+
+
+def key_name(key):
+    """Имя клавиши для сценария (обратное к make_event)."""
+    for name in dir(pygame):
+        if name.startswith("K_") and getattr(pygame, name) == key:
+            return name[2:]
+    return None
+
+
+class ReplayScheduler(scheduler.FrameScheduler):
+    """Планировщик с виртуальными часами и событиями из сценария.
+
+    Совместим с FrameScheduler: events(animating) и tick(). Реальные события
+    окна отбрасываются, чтобы прогон был воспроизводимым.
+    """
+
+    def __init__(self, script, fps=None):
+        fps = fps or script.get("fps", scheduler.FPS)
+        super().__init__(fps)
+        self.frame_ms = 1000.0 / fps
+        self.events_left = list(script.get("events", []))
+        last = self.events_left[-1]["t"] if self.events_left else 0
+        self.end_ms = script.get("end", last + 1000)
+        self.now = 0.0
+        self._last = 0.0
+        self.frames = 0
+
+    def _due(self):
+        out = []
+        while self.events_left and self.events_left[0]["t"] <= self.now:
+            out.append(make_event(self.events_left.pop(0)))
+        return out
+
+    def events(self, animating=True):
+        self.animating = animating
+        pygame.event.pump()
+        pygame.event.clear()
+        if animating:
+            self.active_frames += 1
+        else:
+            self.idle_wakeups += 1
+            # перемотка ожидания к следующему событию сценария
+            if self.events_left and self.events_left[0]["t"] > self.now:
+                self.now = self.events_left[0]["t"]
+            elif not self.events_left:
+                self.now = max(self.now, self.end_ms)
+        if self.now >= self.end_ms and not self.events_left:
+            return [pygame.event.Event(pygame.QUIT)]
+        return self._due()
+
+    def tick(self):
+        if self.animating:
+            self.now += self.frame_ms
+            dt = self.now - self._last
+        else:
+            # перемотанное ожидание — не время анимации: кадр не длиннее обычного
+            dt = min(self.now - self._last, self.frame_ms)
+        self._last = self.now
+        self.frames += 1
+        return dt
+
+
+class RecordingScheduler(scheduler.FrameScheduler):
+    """Обычный планировщик, который записывает нажатия клавиш с временем от старта."""
+
+    def __init__(self, fps=scheduler.FPS):
+        super().__init__(fps)
+        self.start = pygame.time.get_ticks()
+        self.recorded = []
+
+    def events(self, animating=True):
+        events = super().events(animating)
+        t = pygame.time.get_ticks() - self.start
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                name = key_name(event.key)
+                if name is not None:
+                    self.recorded.append({"t": t, "key": name})
+        return events
+
+    def save(self, path, resolution=None, settings=None):
+        script = {"fps": self.fps, "events": self.recorded}
+        if resolution:
+            script["resolution"] = list(resolution)
+        if settings:
+            script["config"] = settings
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(script, f, ensure_ascii=False, indent=2)
+
+
+def run_script(script, scene_factory=None, data_dir=None):
+    """Прогнать сценарий без окна. Возвращает статистику прогона.
+
+    scene_factory — функция, создающая первую сцену (по умолчанию главное меню).
+    data_dir — папка для config.json и saves.dat прогона (None — временная,
+    удаляется после прогона).
+    """
+    import config
+    import saves
+
+    if data_dir is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            return run_script(script, scene_factory, tmp)
+    os.makedirs(data_dir, exist_ok=True)
+    settings = dict(script.get("config", {}))
+    settings["resolution"] = list(script.get("resolution", (800, 600)))
+    config_path = os.path.join(data_dir, config.FILENAME)
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(settings, f, ensure_ascii=False)
+    config_file, saves_file = config.store.path, (saves.store.path, saves.store.legacy_path)
+    config.store.reopen(config_path)
+    saves.store.reopen(os.path.join(data_dir, saves.SAVE_FILENAME))
+    try:
+        return _run(script, scene_factory)
+    finally:
+        config.store.reopen(config_file)
+        saves.store.reopen(*saves_file)
+
+
+def _run(script, scene_factory):
+    import assets
+    import savewriter
+    import scenes
+
+    setup()
+    pygame.init()
+    size = tuple(script.get("resolution", (800, 600)))
+    screen = pygame.display.set_mode(size)
+    # без фоновых потоков: кадр, в котором появляется фон, не зависит от машины
+    assets.manager.synchronous = True
+    if scene_factory is None:
+        import main
+        scene_factory = main.MenuScene
+    frames = ReplayScheduler(script)
+    app = scenes.SceneStack(screen, frames=frames)
+    app.push(scene_factory())
+    t0 = time.perf_counter()
+    app.run()
+    wall = time.perf_counter() - t0
+    # сохранения пишутся в фоне — дождаться их, чтобы прогон оставил файлы на диске
+    savewriter.writer.flush()
+    stats = {
+        "frames": frames.frames,
+        "virtual_ms": round(frames.now, 3),
+        "wall_ms": round(wall * 1000, 3),
+        "scenes_left": [type(s).__name__ for s in app.scenes],
+    }
+    if counters.enabled:
+        stats["counters"] = counters.summary()["total"]
+    pygame.quit()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Прогон игры без окна по сценарию ввода")
+    parser.add_argument("script", nargs="?", help="файл сценария (JSON)")
+    parser.add_argument("--record", metavar="PATH", help="играть в окне и записать ввод в PATH")
+    parser.add_argument("--counters", metavar="PATH",
+                        help="считать поверхности/рендеры/blit/заливки и записать итог по сценам в PATH")
+    parser.add_argument("--data-dir", metavar="PATH",
+                        help="оставить config.json и saves.dat прогона в PATH (по умолчанию — временная папка)")
+    args = parser.parse_args(argv)
+
+    os.chdir(project_dir)
+    if args.record:
+        import config
+        import main as game_main
+        import scenes
+        screen = game_main.init()
+        # частота кадров — как в обычной игре (ключ fps в config.json)
+        frames = RecordingScheduler(config.store.get("fps"))
+        app = scenes.SceneStack(screen, frames=frames)
+        app.push(game_main.MenuScene())
+        app.run()
+        # настройки, влияющие на прогон, записываются в сценарий
+        settings = {key: config.store.get(key) for key in RECORDED_SETTINGS}
+        frames.save(args.record, screen.get_size(), settings)
+        pygame.quit()
+        print("Записано событий: {}".format(len(frames.recorded)))
+        return 0
+    if not args.script:
+        parser.error("нужен файл сценария или --record")
+    if args.counters:
+        counters.enable()
+    stats = run_script(load_script(args.script), data_dir=args.data_dir)
+    if args.counters:
+        counters.dump(args.counters)
+    print(json.dumps(stats, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,21 @@
 #!/usr/bin/env python3
 #точка входа для игры, вызывает play из game.py
 
-# безопасный импорт play (чтобы импорт не ломал запуск, если game.py отсутствует)
-try:
-    from game import play
-except Exception:
-    play = None
+import time
+# момент старта процесса — для метрики времени до первого кадра (см. startup)
+_started = time.perf_counter()
 
 import pygame
 import sys #интерфейс к интерпретатору
 import os #API для взаимодействия с ОС
-import json #импортируем модуль для работы с JSON
 
-FPS = 60
+import config
+import counters
+import fonts
+import scenes
+import startup
+import widgets
+from glyphatlas import draw_text, text_size
 
 # Убедиться, что рабочая директория — папка проекта.
 # Это важно при запуске через ярлык (который может задавать другой cwd).
@@ -24,148 +27,143 @@ except Exception:
 
 def init():
     """Инициализация pygame и создание игрового окна.
-    Читает d:/.../config.json, если там указан параметр resolution — использует его.
+    Разрешение берётся из настроек (config.store, ключ resolution в config.json).
     Если конфигурации нет, создаётся config.json с разрешением по умолчанию (800 x 600).
     """
     global WIDTH, HEIGHT
-    pygame.init()
-
-    project_dir = os.path.dirname(os.path.abspath(__file__))
-    cfg_path = os.path.join(project_dir, 'config.json')
-
-    # значения по умолчанию, если глобальные не заданы
-    default_w, default_h = 800, 600
-    res = [globals().get('WIDTH', default_w), globals().get('HEIGHT', default_h)]
-    try:
-        if os.path.exists(cfg_path):
-            with open(cfg_path, 'r', encoding='utf-8') as f:
-                cfg = json.load(f)
-            r = cfg.get('resolution')
-            if isinstance(r, list) and len(r) == 2:
-                res = r
-        else:
-            # создаём конфиг с дефолтным разрешением
-            with open(cfg_path, 'w', encoding='utf-8') as f:
-                json.dump({'resolution': res}, f)
-    except Exception:
-        res = [default_w, default_h]
-
-    WIDTH, HEIGHT = int(res[0]), int(res[1])
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    # только окно и шрифты: звук и джойстики игре не нужны (см. startup)
+    startup.init_pygame()
+
+    config.store.load()
+    if not config.store.exists:
+        # создаём конфиг с дефолтным разрешением (запись в фоне)
+        config.store.persist("resolution")
+
+    WIDTH, HEIGHT = config.store.get("resolution")
     pygame.display.set_caption("First game RPG")
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
     return screen
 
-def draw_menu(screen, menu_font, hint_font, items, selected_index):
-    """Отрисовать вертикальное меню, выровненное по центру экрана.
-    menu_font — шрифт для пунктов меню.
-    hint_font — шрифт для подсказки внизу экрана.
+MENU_BG = (20, 24, 30)
+
+MENU_HINT = "Use UP/DOWN to navigate, ENTER to select, ESC to quit"
+
+def make_menu_background(size, hint_font):
+    """Фон меню (заливка и подсказка внизу экрана); пункты дорисовывает widgets.ItemList."""
+    sw, sh = size
+    background = pygame.Surface(size)
+    background.fill(MENU_BG)
+    hint_w = text_size(hint_font, MENU_HINT)[0]
+    draw_text(background, hint_font, MENU_HINT, (140,140,140), ((sw - hint_w) // 2, sh - 40))
+    return background
+
+def make_menu_list(items, menu_font):
+    """Пункты меню: виджет с готовыми обычным и выделенным вариантами каждого пункта."""
+    return widgets.ItemList(items, menu_font, MENU_BG)
+
+def make_fonts_for(size):
+    """Шрифты меню и подсказки, масштабированные под размер окна."""
+    w, h = size
+    # масштабируем размер шрифта пропорционально высоте окна
+    menu_size = max(16, int(h * 0.06))  # примерно 6% высоты
+    hint_size = max(12, int(h * 0.025))  # примерно 2.5% высоты
+    # шрифты берутся из общего реестра: при возврате к уже встречавшемуся
+    # разрешению файлы шрифтов не загружаются повторно
+    menu_font = fonts.get_font("Arial", menu_size)
+    hint_font = fonts.get_font("Times New Roman", hint_size)
+    return menu_font, hint_font
+
+class MenuScene(scenes.Scene):
+    """Стартовое меню: выбор пункта стрелками, ENTER — открыть соответствующую сцену.
+
+    Меню статично: между нажатиями клавиш цикл спит в ожидании событий.
+    Фон с подсказкой и оба варианта каждого пункта собираются один раз на
+    размер окна (widgets.ItemList), полная перерисовка — несколько blit'ов,
+    а навигация в режиме dirty — два blit'а пунктов.
     """
-    sw, sh = screen.get_size()
-    screen.fill((20, 24, 30))
-    total_h = 0
-    spacing = 10
-    texts = []
-    for it in items:
-        surf = menu_font.render(it, True, (200, 200, 200))
-        texts.append(surf)
-        total_h += surf.get_height() + spacing
-    if texts:
-        total_h -= spacing
-
-    start_y = (sh - total_h) // 2
-    for idx, surf in enumerate(texts):
-        x = (sw - surf.get_width()) // 2
-        y = start_y + idx * (surf.get_height() + spacing)
-        # выделение выбранного пункта
-        if idx == selected_index:
-            # рисуем фон выделения с отступом
-            rect = pygame.Rect(x - 20, y - 5, surf.get_width() + 40, surf.get_height() + 10)
-            pygame.draw.rect(screen, (60, 100, 140), rect, border_radius=6)
-            text_surf = menu_font.render(items[idx], True, (255, 255, 255))
-            screen.blit(text_surf, (x, y))
-        else:
-            screen.blit(surf, (x, y))
-
-    hint = hint_font.render("Use UP/DOWN to navigate, ENTER to select, ESC to quit", True, (140,140,140))
-    screen.blit(hint, ((sw - hint.get_width()) // 2, sh - 40))
+
+    menu_items = ["Стартуем", "Настройки", "Об игре", "Выход"]
+
+    def __init__(self):
+        super().__init__()
+        self.selected = 0
+        self.drawn_selected = None
+        # шрифты, фон и пункты пересоздаются под текущее разрешение
+        self.prev_size = None
+        self.menu_font = self.hint_font = None
+        self.items = None
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        menu_items = self.menu_items
+        if event.key == pygame.K_ESCAPE:
+            self.app.quit()
+        elif event.key == pygame.K_UP:
+            self.selected = (self.selected - 1) % len(menu_items)
+        elif event.key == pygame.K_DOWN:
+            self.selected = (self.selected + 1) % len(menu_items)
+        elif event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
+            choice = menu_items[self.selected]
+            if choice == "Выход":
+                self.app.quit()
+            elif choice == "Стартуем":
+                # импортируем модуль при выборе, чтобы избежать ненужных зависимостей
+                import start as start_mod
+                self.app.push(start_mod.IntroScene())
+            elif choice == "Настройки":
+                import settings as settings_mod
+                self.app.push(settings_mod.SettingsScene())
+            elif choice == "Об игре":
+                import about as about_mod
+                self.app.push(about_mod.AboutScene())
+
+    def draw(self, screen, full):
+        # если размер окна изменился (например, после настроек) — пересобрать шрифты, фон и пункты
+        if screen.get_size() != self.prev_size:
+            self.prev_size = screen.get_size()
+            self.menu_font, self.hint_font = make_fonts_for(self.prev_size)
+            self.items = make_menu_list(self.menu_items, self.menu_font)
+            self.items.layout_centered(self.prev_size)
+            # фон меню на весь экран: подсказка и обычные пункты уже нарисованы на нём
+            self.items.compose(make_menu_background(self.prev_size, self.hint_font))
+        selected = self.selected
+        rects = None
+        if full:
+            self.items.draw(screen, selected)
+        elif selected != self.drawn_selected:
+            # пункт, с которого ушло выделение, и новый выбранный — готовые поверхности
+            rects = self.items.move_selection(screen, self.drawn_selected, selected)
+        self.drawn_selected = selected
+        return rects
 
 def main():
     """Главный игровой цикл приложения.
 
     Основные обязанности:
-    - инициализировать экран, шрифт и таймер (clock)
-    - отображать стартовое меню и вызывать соответствующие модули
+    - инициализировать экран и стек сцен (единый цикл событий, обновления и вывода)
+    - отображать стартовое меню; остальные экраны открываются поверх него
+      и подготавливаются в фоне, пока игрок в меню (startup.warm_up)
     - корректно завершать работу (pygame.quit() и sys.exit())
     """
+    startup.begin(_started)
     screen = init()
-    clock = pygame.time.Clock()
-    # шрифты будут создаваться динамически в зависимости от текущего разрешения
-    prev_size = screen.get_size()
-    def make_fonts_for(size):
-        w, h = size
-        # масштабируем размер шрифта пропорционально высоте окна
-        menu_size = max(16, int(h * 0.06))  # примерно 6% высоты
-        hint_size = max(12, int(h * 0.025))  # примерно 2.5% высоты
-        try:
-            menu_font = pygame.font.SysFont("Arial", menu_size)
-        except Exception:
-            menu_font = pygame.font.SysFont(None, menu_size)
-        try:
-            hint_font = pygame.font.SysFont("Times New Roman", hint_size)
-        except Exception:
-            hint_font = pygame.font.SysFont(None, hint_size)
-        return menu_font, hint_font
-    menu_font, hint_font = make_fonts_for(prev_size)
-
-    # меню
-    menu_items = ["Стартуем", "Настройки", "Об игре", "Выход"]
-    selected = 0
-    in_menu = True
-
-    while in_menu:
-        # если размер окна изменился (например, после настроек) — пересоздать шрифты
-        if screen.get_size() != prev_size:
-            prev_size = screen.get_size()
-            menu_font, hint_font = make_fonts_for(prev_size)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
-                elif event.key == pygame.K_UP:
-                    selected = (selected - 1) % len(menu_items)
-                elif event.key == pygame.K_DOWN:
-                    selected = (selected + 1) % len(menu_items)
-                elif event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                    choice = menu_items[selected]
-                    if choice == "Выход":
-                        pygame.quit()
-                        sys.exit()
-                    elif choice == "Стартуем":
-                        # импортируем модуль при выборе, чтобы избежать ненужных зависимостей
-                        import start as start_mod
-                        start_mod.run(screen)
-                    elif choice == "Настройки":
-                        import settings as settings_mod
-                        screen = settings_mod.run(screen)
-                        # после возврата из настроек экран мог измениться — обновить шрифты
-                        if screen.get_size() != prev_size:
-                            prev_size = screen.get_size()
-                            menu_font, hint_font = make_fonts_for(prev_size)
-                    elif choice == "Об игре":
-                        import about as about_mod
-                        about_mod.run(screen)
-
-        draw_menu(screen, menu_font, hint_font, menu_items, selected)
-        pygame.display.flip()
-        clock.tick(FPS)
+    # счётчики отрисовки включаются ключом "counters" в config.json
+    # и записываются в указанный файл при выходе
+    counters_path = counters.load_path()
+    if counters_path:
+        counters.enable(counters_path)
+    app = scenes.SceneStack(screen, config.store.get("fps"))
+    app.push(MenuScene())
+    startup.warm_up(app)
+    app.run()
+    pygame.quit()
+    sys.exit()
 
 if __name__ == "__main__":
     print("Простая игра: меню запуска")
-    # play() оставлен, но не требуется для показа меню
+    # play() оставлен, но не требуется для показа меню; game импортируется
+    # только при вызове, чтобы не замедлять запуск
+    # from game import play
     # play()
     main()
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""Профилировщик фаз кадра и оверлей производительности.
+
+SceneStack размечает каждый кадр фазами: events (обработка событий),
+update, draw и present. Пока профилировщик выключен, цикл не делает ни
+одного лишнего замера — проверяется только флаг active.
+
+Клавиши (в любой сцене):
+- F3 — показать/скрыть оверлей: FPS, время кадра, график последних кадров
+  и разбивка по фазам;
+- F4 — записать трассу следующих кадров (их число — ключ trace_frames в
+  config.json, по умолчанию 300) в формате Chrome trace (открывается в
+  chrome://tracing или https://ui.perfetto.dev).
+"""
+import json
+import os
+import time
+from collections import deque
+
+import pygame
+
+import config
+import fonts
+from glyphatlas import draw_text
+
+PHASES = ("events", "update", "draw", "present")
+HISTORY = 120
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+
+_BG = (0, 0, 0)
+_FG = (230, 230, 230)
+_PHASE_COLORS = {
+    "events": (220, 180, 60),
+    "update": (80, 200, 120),
+    "draw": (80, 150, 230),
+    "present": (200, 90, 200),
+}
+
+
+class Profiler:
+    def __init__(self):
+        self.overlay = False
+        self.trace_left = 0
+        self.trace_path = None
+        self._trace = []
+        # длительности кадров (мс, с учётом ожидания в tick) и фаз последних кадров
+        self.frame_ms = deque(maxlen=HISTORY)
+        self.phase_ms = {p: deque(maxlen=HISTORY) for p in PHASES}
+        self._marks = []
+        self._t0 = 0.0
+        self._frame_index = 0
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    @property
+    def active(self):
+        """Нужно ли размечать кадры (оверлей показан или пишется трасса)."""
+        return self.overlay or self.trace_left > 0
+
+    # --- разметка кадра ---------------------------------------------------
+
+    def begin_frame(self):
+        self._marks = []
+        self._t0 = time.perf_counter()
+
+    def mark(self, phase):
+        """Фаза phase закончилась сейчас (началась в конце предыдущей)."""
+        self._marks.append((phase, time.perf_counter()))
+
+    def end_frame(self, dt_ms):
+        """Кадр закончен; dt_ms — полная длительность кадра из планировщика."""
+        self.frame_ms.append(dt_ms)
+        start = self._t0
+        for phase, t in self._marks:
+            self.phase_ms[phase].append((t - start) * 1000.0)
+            if self.trace_left > 0:
+                self._trace.append({
+                    "name": phase, "cat": "frame", "ph": "X", "pid": 0, "tid": 0,
+                    "ts": round(start * 1e6, 3), "dur": round((t - start) * 1e6, 3),
+                    "args": {"frame": self._frame_index},
+                })
+            start = t
+        if self.trace_left > 0:
+            self._trace.append({
+                "name": "frame", "cat": "frame", "ph": "X", "pid": 0, "tid": 0,
+                "ts": round(self._t0 * 1e6, 3), "dur": round((start - self._t0) * 1e6, 3),
+                "args": {"frame": self._frame_index, "dt_ms": round(dt_ms, 3)},
+            })
+            self.trace_left -= 1
+            if self.trace_left == 0:
+                self._write_trace()
+        self._frame_index += 1
+
+    # --- трасса -----------------------------------------------------------
+
+    def start_trace(self, frames=None, path=None):
+        """Записать следующие frames кадров (None — из настроек) в Chrome trace JSON."""
+        if frames is None:
+            frames = config.store.get("trace_frames")
+        if path is None:
+            path = os.path.join(project_dir, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        self.trace_path = path
+        self.trace_left = frames
+        self._trace = []
+
+    def _write_trace(self):
+        try:
+            with open(self.trace_path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": self._trace, "displayTimeUnit": "ms"}, f)
+            print("Трасса записана: {}".format(self.trace_path))
+        except OSError as e:
+            print("Не удалось записать трассу {}: {}".format(self.trace_path, e))
+        self._trace = []
+
+    # --- клавиши ----------------------------------------------------------
+
+    def handle_event(self, event):
+        """True — событие обработано профилировщиком (сцене не передаётся)."""
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_F3:
+            self.overlay = not self.overlay
+            return True
+        if event.key == pygame.K_F4:
+            self.start_trace()
+            return True
+        return False
+
+    # --- оверлей ----------------------------------------------------------
+
+    def draw_overlay(self, screen):
+        """Нарисовать оверлей в левом верхнем углу; возвращает его Rect."""
+        font = fonts.get_font(None, 18)
+        line_h = font.get_linesize()
+        w, graph_h = 260, 50
+        rect = pygame.Rect(4, 4, w, line_h * 3 + graph_h + 14)
+        screen.fill(_BG, rect)
+
+        frames = self.frame_ms
+        avg = sum(frames) / len(frames) if frames else 0.0
+        fps = 1000.0 / avg if avg > 0 else 0.0
+        worst = max(frames) if frames else 0.0
+        x, y = rect.x + 6, rect.y + 4
+        draw_text(screen, font, "FPS {:5.1f}  кадр {:5.2f} мс  макс {:5.2f}".format(fps, avg, worst), _FG, (x, y))
+        y += line_h
+        parts = []
+        for p in PHASES:
+            values = self.phase_ms[p]
+            parts.append("{} {:.2f}".format(p[0], sum(values) / len(values) if values else 0.0))
+        draw_text(screen, font, "мс: " + "  ".join(parts), _FG, (x, y))
+        y += line_h
+
+        # график: столбик на кадр, цветные сегменты — фазы, серый — ожидание
+        graph_top = y + 4
+        base = graph_top + graph_h
+        scale = graph_h / max(33.3, worst)
+        n = len(frames)
+        for i in range(n):
+            bx = x + i * 2
+            top = base
+            for p in PHASES:
+                values = self.phase_ms[p]
+                j = len(values) - n + i
+                if 0 <= j < len(values):
+                    hgt = values[j] * scale
+                    pygame.draw.line(screen, _PHASE_COLORS[p], (bx, top), (bx, top - hgt))
+                    top -= hgt
+            pygame.draw.line(screen, (90, 90, 90), (bx, top), (bx, base - frames[i] * scale))
+        # линия 16.7 мс (60 FPS)
+        y60 = base - 16.7 * scale
+        pygame.draw.line(screen, (200, 60, 60), (x, y60), (x + HISTORY * 2, y60))
+        y = base + 2
+        if self.trace_left:
+            draw_text(screen, font, "трасса: осталось {} кадров".format(self.trace_left), (255, 120, 120), (x, y))
+        self.rect = rect
+        return rect
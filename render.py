@@ -0,0 +1,85 @@
+"""Вывод кадра на экран: полный flip или обновление изменённых областей.
+
+Режим задаётся ключом "render_mode" в config.json:
+- "dirty" (по умолчанию) — экран перерисовывается целиком только при входе
+  в сцену и при смене размера окна; в остальное время сцена перерисовывает
+  изменившиеся области и сообщает их через add(), а present() вызывает
+  pygame.display.update(rects). Если ничего не изменилось — на экран
+  ничего не выводится;
+- "flip" — прежнее поведение: полная перерисовка и flip() на каждом кадре.
+"""
+import pygame
+
+import config
+
+
+def load_mode():
+    """render_mode из настроек (config.store; неверное значение — режим по умолчанию)."""
+    return config.store.get("render_mode")
+
+
+class Presenter:
+    """Накопитель «грязных» прямоугольников одной сцены.
+
+    Типичный кадр:
+        if presenter.begin(screen):
+            ... полная перерисовка ...
+        elif состояние изменилось:
+            ... перерисовать часть ...
+            presenter.add(rect)
+        presenter.present()
+    """
+
+    def __init__(self, mode=None):
+        self.mode = mode or load_mode()
+        self.dirty = self.mode == "dirty"
+        self._rects = []
+        self._full = True
+        self._size = None
+
+    def invalidate(self):
+        """Запросить полную перерисовку (вход в сцену, возврат из другой сцены)."""
+        self._full = True
+
+    def pending(self):
+        """Есть ли отложенная полная перерисовка (сцене нельзя засыпать до её вывода)."""
+        return self._full
+
+    def handle_event(self, event):
+        """Окно было перекрыто и показано снова — содержимое нужно вывести заново."""
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self._full = True
+
+    def begin(self, screen):
+        """Начать кадр; True — сцена должна перерисовать экран целиком."""
+        size = screen.get_size()
+        if size != self._size:
+            self._size = size
+            self._full = True
+        return self._full or not self.dirty
+
+    def add(self, rect):
+        """Отметить область как изменённую в этом кадре."""
+        self._rects.append(pygame.Rect(rect))
+
+    def has_output(self):
+        """Будет ли present() что-то выводить в этом кадре."""
+        return self._full or not self.dirty or bool(self._rects)
+
+    def present(self, scale=None):
+        """Вывести кадр: flip при полной перерисовке, иначе update(rects).
+
+        scale=(sx, sy) — кадр рисовался на уменьшенном холсте и растянут на
+        окно: прямоугольники переводятся в координаты окна (с запасом в пиксель).
+        """
+        if self._full or not self.dirty:
+            pygame.display.flip()
+        elif self._rects:
+            rects = self._rects
+            if scale is not None:
+                sx, sy = scale
+                rects = [pygame.Rect(int(r.x * sx) - 1, int(r.y * sy) - 1,
+                                     int(r.w * sx) + 3, int(r.h * sy) + 3) for r in rects]
+            pygame.display.update(rects)
+        self._full = False
+        self._rects = []
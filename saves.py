@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+"""Сохранения по слотам в компактном двоичном файле (saves.dat).
+
+Состояние слота — словарь секций (например "player", "inventory", "map",
+"quests"); каждая секция кодируется отдельно компактным двоичным кодом
+(encode/decode) и при необходимости сжимается zlib.
+
+Файл:
+    заголовок  HEADER: magic, версия, смещение/длина/crc32 индекса
+    записи     блоки секций; одинаковое содержимое хранится один раз
+    индекс     слоты (сводка, время, секция -> хэш) и записи (хэш -> смещение, длина)
+
+Сохранение слота дописывает в конец файла только изменившиеся секции и
+новый индекс, затем переписывает заголовок — прерванная запись оставляет
+прежний индекс действующим. Чтение сводок (slots()) читает только
+заголовок и индекс, load(slot) — только записи этого слота. Когда мёртвых
+байт (старые версии секций и индексов) становится больше живых, файл
+переписывается целиком (compact(), атомарно через savewriter.write_atomic).
+
+Запись выполняется в потоке savewriter.writer: кодирование — в главном
+потоке, дописывание — в фоне; несколько сохранений одного слота подряд
+объединяются. Прежний save.json один раз переносится в слот DEFAULT_SLOT,
+если saves.dat ещё нет.
+
+Пример:
+    saves.store.save(1, {"player": {"color": "Красный"}}, summary={"color": "Красный"})
+    saves.store.slots()   # {1: {"summary": {...}, "time": ..., "sections": [...]}}
+    saves.store.load(1)   # {"player": {"color": "Красный"}}
+
+Командная строка: python saves.py [--compact]
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import savewriter
+
+MAGIC = b"PGSAVE\x00\x01"
+VERSION = 1
+# magic, версия, смещение индекса, длина индекса, crc32 индекса
+HEADER = struct.Struct("<8sIQII")
+
+SAVE_FILENAME = "saves.dat"
+LEGACY_FILENAME = "save.json"
+DEFAULT_SLOT = 1
+# секция, в которую переносится содержимое save.json
+LEGACY_SECTION = "player"
+
+# блоки короче этого не сжимаются
+COMPRESS_MIN = 128
+# компактировать, когда мёртвых байт больше живых и не меньше этого
+COMPACT_MIN_BYTES = 64 * 1024
+
+_RAW, _ZLIB = 0, 1
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class SaveError(Exception):
+    """Файл сохранений повреждён или имеет неизвестный формат."""
+
+
+# --- компактный двоичный код -------------------------------------------------
+# N/T/F — None/True/False, i — целое (zigzag varint), d — float64,
+# s — строка utf-8, b — байты, l — список, m — словарь (ключ, значение)...
+
+def _put_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _encode(value, out):
+    if value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        out += b"i"
+        _put_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        out += b"d"
+        out += struct.pack("<d", value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out += b"s"
+        _put_varint(out, len(data))
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        out += b"b"
+        _put_varint(out, len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out += b"l"
+        _put_varint(out, len(value))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out += b"m"
+        _put_varint(out, len(value))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    else:
+        raise TypeError("нельзя сохранить значение типа {}".format(type(value).__name__))
+
+
+def encode(value):
+    """Значение (None, bool, int, float, str, bytes, list, tuple, dict) -> bytes."""
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def _get_varint(data, pos):
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _decode(data, pos):
+    tag = data[pos]
+    pos += 1
+    if tag == 0x4E:  # N
+        return None, pos
+    if tag == 0x54:  # T
+        return True, pos
+    if tag == 0x46:  # F
+        return False, pos
+    if tag == 0x69:  # i
+        n, pos = _get_varint(data, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == 0x64:  # d
+        return struct.unpack_from("<d", data, pos)[0], pos + 8
+    if tag in (0x73, 0x62):  # s, b
+        n, pos = _get_varint(data, pos)
+        raw = bytes(data[pos:pos + n])
+        return (raw.decode("utf-8") if tag == 0x73 else raw), pos + n
+    if tag == 0x6C:  # l
+        n, pos = _get_varint(data, pos)
+        items = []
+        for _ in range(n):
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == 0x6D:  # m
+        n, pos = _get_varint(data, pos)
+        result = {}
+        for _ in range(n):
+            key, pos = _decode(data, pos)
+            result[key], pos = _decode(data, pos)
+        return result, pos
+    raise SaveError("неизвестный тег 0x{:02x}".format(tag))
+
+
+def decode(data):
+    """bytes -> значение (обратное к encode)."""
+    try:
+        value, pos = _decode(data, 0)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise SaveError("повреждённые данные: {}".format(e))
+    if pos != len(data):
+        raise SaveError("лишние байты после значения")
+    return value
+
+
+def _pack_block(value):
+    """Секция -> (хэш, блок): флаг сжатия + закодированные данные."""
+    raw = encode(value)
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+    if len(raw) >= COMPRESS_MIN:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return digest, bytes((_ZLIB,)) + packed
+    return digest, bytes((_RAW,)) + raw
+
+
+def _unpack_block(block):
+    if not block:
+        raise SaveError("пустой блок")
+    raw = block[1:]
+    if block[0] == _ZLIB:
+        try:
+            raw = zlib.decompress(raw)
+        except zlib.error as e:
+            raise SaveError("повреждённый блок: {}".format(e))
+    return decode(raw)
+
+
+# --- файл слотов -------------------------------------------------------------
+
+class SaveStore:
+    """Файл сохранений со слотами; индекс загружается лениво, один раз.
+
+    _lock защищает состояние в памяти и берётся ненадолго (save() из
+    главного потока не ждёт диска); _io_lock — операции с файлом. Порядок
+    захвата: _io_lock, затем _lock.
+    """
+
+    def __init__(self, path, legacy_path=None, writer=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.writer = writer or savewriter.writer
+        self._lock = threading.Lock()
+        self._io_lock = threading.RLock()
+        # индекс: {"slots": {slot: {...}}, "records": {хэш: [смещение, длина]}}
+        self._index = None
+        self._end = HEADER.size
+        # слот -> (секции в блоках, сводка, время), ещё не дописанные потоком записи
+        self._pending = {}
+
+    # --- чтение ---
+
+    def _load_index(self):
+        if self._index is not None:
+            return self._index
+        with self._io_lock:
+            if self._index is not None:
+                return self._index
+            if not os.path.exists(self.path):
+                with self._lock:
+                    self._index = {"slots": {}, "records": {}}
+                    self._end = HEADER.size
+                if self.legacy_path and os.path.exists(self.legacy_path):
+                    self._migrate_legacy()
+                return self._index
+            with open(self.path, "rb") as f:
+                head = f.read(HEADER.size)
+                if len(head) < HEADER.size:
+                    raise SaveError("{}: обрезанный заголовок".format(self.path))
+                magic, version, offset, length, crc = HEADER.unpack(head)
+                if magic != MAGIC:
+                    raise SaveError("{}: не файл сохранений".format(self.path))
+                if version != VERSION:
+                    raise SaveError("{}: неизвестная версия {}".format(self.path, version))
+                f.seek(offset)
+                data = f.read(length)
+                if len(data) != length or zlib.crc32(data) != crc:
+                    raise SaveError("{}: повреждённый индекс".format(self.path))
+                index = _unpack_block(data)
+                end = f.seek(0, os.SEEK_END)
+            with self._lock:
+                self._index = index
+                self._end = end
+            return index
+
+    def slots(self):
+        """Сводки слотов без чтения секций: {слот: {"summary", "time", "sections"}}."""
+        self._load_index()
+        with self._lock:
+            result = {}
+            for slot, entry in self._index["slots"].items():
+                result[slot] = {
+                    "summary": entry["summary"],
+                    "time": entry["time"],
+                    "sections": sorted(entry["sections"]),
+                }
+            for slot, job in self._pending.items():
+                if job["deleted"]:
+                    result.pop(slot, None)
+                    continue
+                old = result.get(slot) if not job["replace"] else None
+                sections = set(job["blocks"])
+                if old:
+                    sections.update(old["sections"])
+                summary = job["summary"]
+                if summary is None:
+                    summary = old["summary"] if old else {}
+                result[slot] = {"summary": summary, "time": job["time"], "sections": sorted(sections)}
+            return result
+
+    def load(self, slot, sections=None):
+        """Секции слота (все или только перечисленные в sections); None — слота нет."""
+        self._load_index()
+        with self._lock:
+            job = self._pending.get(slot)
+        result = {}
+        if job is not None:
+            if job["deleted"]:
+                return None
+            # ещё не записанные секции берутся из очереди
+            for name, (digest, block) in job["blocks"].items():
+                if sections is None or name in sections:
+                    result[name] = _unpack_block(block)
+            if job["replace"]:
+                return result
+        # чтение под _io_lock: компактирование не сдвинет записи посреди чтения
+        with self._io_lock:
+            with self._lock:
+                entry = self._index["slots"].get(slot)
+                records = self._index["records"]
+            if entry is None:
+                return result if job is not None else None
+            names = sections if sections is not None else list(entry["sections"])
+            with open(self.path, "rb") as f:
+                for name in names:
+                    digest = entry["sections"].get(name)
+                    if digest is None or name in result:
+                        continue
+                    offset, length = records[digest]
+                    f.seek(offset)
+                    block = f.read(length)
+                    if len(block) != length:
+                        raise SaveError("{}: обрезанная запись секции {}".format(self.path, name))
+                    result[name] = _unpack_block(block)
+            return result
+
+    # --- запись ---
+
+    def save(self, slot, state, summary=None, replace=False):
+        """Сохранить секции слота: state — {секция: данные}.
+
+        Передавать достаточно изменившиеся секции: остальные секции слота
+        остаются прежними (replace=True — слот состоит только из state).
+        summary — короткая сводка для списка слотов (None — оставить прежнюю).
+        Секции кодируются сразу (в вызывающем потоке), в файл дописываются в
+        потоке записи, причём только те, что отличаются от уже записанных.
+        """
+        blocks = {name: _pack_block(value) for name, value in state.items()}
+        with self._lock:
+            job = self._pending.get(slot)
+            if job is not None and not replace:
+                # предыдущее сохранение слота ещё в очереди — объединить с ним
+                merged = dict(job["blocks"])
+                merged.update(blocks)
+                blocks = merged
+                replace = job["replace"]
+                if summary is None:
+                    summary = job["summary"]
+            self._pending[slot] = {"blocks": blocks, "summary": summary, "time": time.time(),
+                                   "replace": replace, "deleted": False}
+        self.writer.call((self.path, slot), lambda: self._commit(slot))
+
+    def delete(self, slot):
+        """Удалить слот (место освободится при компактировании)."""
+        with self._lock:
+            self._pending[slot] = {"blocks": {}, "summary": None, "time": time.time(),
+                                   "replace": True, "deleted": True}
+        self.writer.call((self.path, slot), lambda: self._commit(slot))
+
+    def flush(self):
+        """Дождаться записи всех сохранений."""
+        self.writer.flush()
+
+    def reopen(self, path, legacy_path=None):
+        """Дописать сохранения и перейти на другой файл (индекс читается заново)."""
+        self.flush()
+        with self._io_lock, self._lock:
+            self.path = path
+            self.legacy_path = legacy_path
+            self._index = None
+            self._end = HEADER.size
+
+    def _copy_index(self):
+        return {
+            "slots": {slot: dict(entry, sections=dict(entry["sections"]))
+                      for slot, entry in self._index["slots"].items()},
+            "records": dict(self._index["records"]),
+        }
+
+    def _commit(self, slot):
+        self._load_index()
+        with self._io_lock:
+            with self._lock:
+                job = self._pending.get(slot)
+                if job is None:
+                    return
+                index = self._copy_index()
+            appended = []
+            old = index["slots"].get(slot)
+            changed = True
+            if job["deleted"]:
+                changed = index["slots"].pop(slot, None) is not None
+            else:
+                sections = {} if job["replace"] or old is None else old["sections"]
+                for name, (digest, block) in job["blocks"].items():
+                    sections[name] = digest
+                    if digest not in index["records"]:
+                        appended.append((digest, block))
+                        # одинаковые секции в одном сохранении пишутся один раз
+                        index["records"][digest] = None
+                summary = job["summary"]
+                if summary is None:
+                    summary = old["summary"] if old else {}
+                index["slots"][slot] = {"summary": summary, "time": job["time"], "sections": sections}
+            # записи, на которые не ссылается ни один слот, не переписываются с каждым
+            # индексом: их байты остаются мёртвыми до компактирования
+            live = {digest for entry in index["slots"].values() for digest in entry["sections"].values()}
+            for digest in [d for d in index["records"] if d not in live]:
+                del index["records"][digest]
+            if changed:
+                self._write_index(index, appended)
+            with self._lock:
+                # пока шла запись, слот могли сохранить снова — тогда он остаётся в очереди
+                if self._pending.get(slot) is job:
+                    del self._pending[slot]
+            if self._dead_bytes() > max(COMPACT_MIN_BYTES, self._live_bytes()):
+                self.compact()
+
+    def _write_index(self, index, appended):
+        """Дописать блоки appended и индекс index, затем переключить заголовок на него."""
+        with self._io_lock:
+            new = not os.path.exists(self.path)
+            end = HEADER.size if new else self._end
+            with open(self.path, "w+b" if new else "r+b") as f:
+                if new:
+                    f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+                f.seek(end)
+                offset = end
+                for digest, block in appended:
+                    f.write(block)
+                    index["records"][digest] = [offset, len(block)]
+                    offset += len(block)
+                _, index_block = _pack_block(index)
+                f.write(index_block)
+                f.flush()
+                os.fsync(f.fileno())
+                # заголовок переписывается только после того, как индекс на диске
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, VERSION, offset, len(index_block), zlib.crc32(index_block)))
+                f.flush()
+                os.fsync(f.fileno())
+            with self._lock:
+                self._index = index
+                self._end = offset + len(index_block)
+
+    def _live_refs(self):
+        return {digest for entry in self._index["slots"].values()
+                for digest in entry["sections"].values()}
+
+    def _live_bytes(self):
+        records = self._index["records"]
+        return sum(records[digest][1] for digest in self._live_refs())
+
+    def _dead_bytes(self):
+        return self._end - HEADER.size - self._live_bytes()
+
+    def compact(self):
+        """Переписать файл, оставив только записи живых слотов (атомарно)."""
+        self._load_index()
+        with self._io_lock:
+            if not os.path.exists(self.path):
+                return
+            with self._lock:
+                old = self._copy_index()
+            live = {digest for entry in old["slots"].values() for digest in entry["sections"].values()}
+            index = {"slots": old["slots"], "records": {}}
+            out = bytearray(HEADER.size)
+            with open(self.path, "rb") as f:
+                for digest in live:
+                    offset, length = old["records"][digest]
+                    f.seek(offset)
+                    index["records"][digest] = [len(out), length]
+                    out += f.read(length)
+            _, index_block = _pack_block(index)
+            index_offset = len(out)
+            out += index_block
+            out[:HEADER.size] = HEADER.pack(MAGIC, VERSION, index_offset, len(index_block),
+                                            zlib.crc32(index_block))
+            savewriter.write_atomic(self.path, bytes(out))
+            with self._lock:
+                self._index = index
+                self._end = len(out)
+
+    def _migrate_legacy(self):
+        """Однократно перенести save.json в слот DEFAULT_SLOT."""
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print("Не удалось перенести {}: {}".format(self.legacy_path, e))
+            return
+        if not isinstance(data, dict):
+            return
+        digest, block = _pack_block(data)
+        index = {
+            "slots": {DEFAULT_SLOT: {
+                "summary": data, "time": os.path.getmtime(self.legacy_path),
+                "sections": {LEGACY_SECTION: digest},
+            }},
+            "records": {},
+        }
+        self._write_index(index, [(digest, block)])
+
+    def stats(self):
+        """Размер файла, живые и мёртвые байты, число слотов и записей."""
+        self._load_index()
+        with self._lock:
+            return {
+                "file_bytes": self._end if os.path.exists(self.path) else 0,
+                "live_bytes": self._live_bytes(),
+                "dead_bytes": max(0, self._dead_bytes()),
+                "slots": len(self._index["slots"]),
+                "records": len(self._index["records"]),
+            }
+
+
+store = SaveStore(os.path.join(project_dir, SAVE_FILENAME),
+                  legacy_path=os.path.join(project_dir, LEGACY_FILENAME))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Слоты сохранений saves.dat")
+    parser.add_argument("--compact", action="store_true", help="переписать файл без мёртвых записей")
+    args = parser.parse_args(argv)
+    try:
+        if args.compact:
+            store.compact()
+        for slot, info in sorted(store.slots().items()):
+            print("слот {}: {} ({})".format(
+                slot, json.dumps(info["summary"], ensure_ascii=False),
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(info["time"]))))
+        print(json.dumps(store.stats()))
+    except SaveError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Фоновая атомарная запись сохранений.
+
+Состояние сериализуется в главном потоке (save() получает снимок данных и
+сразу превращает его в байты), а на диск пишет фоновый поток:
+временный файл рядом с целевым -> fsync -> os.replace. Прерванная запись
+оставляет прежний файл целым, а медленный диск не задерживает кадр.
+
+Несколько сохранений одного файла подряд объединяются: если поток ещё не
+успел записать предыдущую версию, она заменяется новой и на диск попадает
+только последняя. При выходе из программы (atexit) очередь дописывается —
+flush() можно вызвать и явно.
+
+    savewriter.writer.save("save.json", {"color": "Красный"})
+
+Кроме целых файлов, поток выполняет произвольные задачи записи с ключом
+(call): более поздняя задача с тем же ключом заменяет ещё не выполненную
+(так saves.SaveStore дописывает слоты в общий файл).
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+
+
+def write_atomic(path, payload):
+    """Записать байты payload в path атомарно (temp-файл, fsync, rename)."""
+    tmp = "{}.tmp{}".format(path, os.getpid())
+    try:
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    # rename становится надёжным после fsync каталога (на Windows недоступно)
+    if hasattr(os, "O_DIRECTORY"):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def dumps(data):
+    """Сериализация сохранения в байты (формат прежнего save.json)."""
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+class SaveWriter:
+    def __init__(self):
+        self._cond = threading.Condition()
+        # ключ -> последняя ещё не выполненная задача (порядок — порядок первого запроса)
+        self._pending = {}
+        self._busy = False
+        self._thread = None
+        # счётчики: записано файлов, объединено (заменено до записи) и ошибок
+        self.writes = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.last_error = None
+
+    def save(self, path, data):
+        """Сериализовать data сейчас и записать в path в фоне."""
+        self.submit(path, dumps(data))
+
+    def submit(self, path, payload):
+        """Поставить готовые байты на запись; более ранняя версия path отбрасывается."""
+        path = os.path.abspath(path)
+        self.call(path, functools.partial(write_atomic, path, payload))
+
+    def call(self, key, task):
+        """Выполнить task() в потоке записи; ещё не выполненная задача с key отбрасывается."""
+        with self._cond:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = task
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="save-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def pending(self):
+        """Есть ли незаписанные данные."""
+        with self._cond:
+            return bool(self._pending) or self._busy
+
+    def flush(self, timeout=None):
+        """Дождаться записи всего, что поставлено в очередь. False — не успели за timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                key = next(iter(self._pending))
+                task = self._pending.pop(key)
+                self._busy = True
+            try:
+                task()
+                self.writes += 1
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                print("Не удалось записать сохранение {}: {}".format(key, e))
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+
+writer = SaveWriter()
+atexit.register(writer.flush)
@@ -0,0 +1,264 @@
+"""Стек сцен и единый главный цикл.
+
+Каждый экран игры — объект Scene с методами handle_event, update(dt) и draw.
+SceneStack владеет окном, планировщиком кадров (scheduler) и выводом кадра
+(render.Presenter): события, обновление, отрисовка и вывод на экран проходят
+через один цикл, поэтому частоту кадров, профилирование и оптимизации
+достаточно менять в одном месте.
+
+Масштаб отрисовки (ключ render_scale настроек, 0.25..1): при значении меньше
+1 сцены рисуют на холст внутреннего разрешения (доля размера окна), который
+раз за кадр растягивается на окно; координаты мыши переводятся обратно в
+координаты холста. Шрифты и фоны сцены выбирают по размеру screen, поэтому
+они кэшируются уже в внутреннем разрешении.
+"""
+from collections import deque
+
+import pygame
+
+import config
+import counters
+import profiler
+import render
+import scheduler
+
+_MOUSE_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+
+class Scene:
+    """Базовый экран.
+
+    animating — True, пока сцена анимируется и её нужно перерисовывать каждый
+    кадр; иначе цикл ждёт событий (см. scheduler.FrameScheduler).
+    """
+
+    animating = False
+
+    def __init__(self):
+        self.app = None
+
+    def enter(self):
+        """Сцена стала верхней: после push или после ухода сцены над ней."""
+
+    def exit(self):
+        """Сцена уходит: снята со стека (pop, replace) или окно закрывают."""
+
+    def handle_event(self, event):
+        pass
+
+    def update(self, dt):
+        """Продвинуть состояние на dt миллисекунд."""
+
+    def draw(self, screen, full):
+        """Отрисовать кадр.
+
+        full=True — перерисовать экран целиком. Иначе сцена перерисовывает
+        только изменившееся и возвращает список изменённых прямоугольников
+        (пустой список или None — ничего не изменилось).
+        """
+        return None
+
+
+class SceneStack:
+    """Стек сцен: верхняя сцена получает события и рисуется."""
+
+    def __init__(self, screen, fps=scheduler.FPS, frames=None, render_scale=None):
+        # display — окно; screen — поверхность, на которой рисуют сцены:
+        # то же окно или холст (уменьшенное внутреннее разрешение, счётчики)
+        self.display = screen
+        self.screen = screen
+        # render_scale=None — брать масштаб из настроек (его можно менять на лету)
+        self.render_scale = render_scale
+        self.scenes = []
+        # frames — источник событий и времени; по умолчанию реальные часы,
+        # headless.ReplayScheduler подставляет записанный ввод и виртуальное время
+        self.frames = frames or scheduler.FrameScheduler(fps)
+        self.presenter = render.Presenter()
+        # оверлей производительности (F3) и запись трассы (F4)
+        self.profiler = profiler.Profiler()
+        self.running = False
+        # было ли закрыто окно (pygame.QUIT), а не просто опустошён стек
+        self.quit_requested = False
+        # отложенные задачи главного потока (см. defer)
+        self.tasks = deque()
+        self._dt = 0
+        # стек сменился в этом кадре: время кадра (с ожиданием событий) новой
+        # сцене не передаётся
+        self._entered = False
+        self._sync_canvas()
+
+    @property
+    def top(self):
+        return self.scenes[-1] if self.scenes else None
+
+    def push(self, scene):
+        scene.app = self
+        self.scenes.append(scene)
+        # анимация новой сцены начинается с момента входа
+        self._dt = 0
+        self._entered = True
+        scene.enter()
+        self.presenter.invalidate()
+
+    def pop(self):
+        scene = self.scenes.pop()
+        scene.exit()
+        self._dt = 0
+        self._entered = True
+        if self.scenes:
+            self.scenes[-1].enter()
+            self.presenter.invalidate()
+        else:
+            self.running = False
+        return scene
+
+    def replace(self, scene):
+        """Заменить верхнюю сцену другой."""
+        if self.scenes:
+            self.scenes.pop().exit()
+        self.push(scene)
+
+    def set_mode(self, size):
+        """Сменить разрешение окна; возвращает новое окно."""
+        self.display = pygame.display.set_mode(size)
+        self.screen = self.display
+        self._sync_canvas()
+        self.presenter.invalidate()
+        return self.display
+
+    def _sync_canvas(self):
+        """Выбрать поверхность для сцен: окно или холст внутреннего разрешения."""
+        scale = self.render_scale if self.render_scale is not None else config.store.get("render_scale")
+        dw, dh = self.display.get_size()
+        size = (max(1, int(dw * scale)), max(1, int(dh * scale)))
+        # со счётчиками холст нужен всегда: операции с окном иначе не посчитать
+        if size == (dw, dh) and not counters.enabled:
+            if self.screen is not self.display:
+                self.screen = self.display
+                self.presenter.invalidate()
+        elif self.screen is self.display or self.screen.get_size() != size:
+            # формат холста — как у окна, чтобы вывод не требовал преобразования
+            self.screen = pygame.Surface(size, 0, self.display)
+            self.presenter.invalidate()
+
+    def _map_event(self, event):
+        """Перевести координаты мыши из окна в координаты холста."""
+        dw, dh = self.display.get_size()
+        cw, ch = self.screen.get_size()
+        attrs = dict(event.dict)
+        x, y = event.pos
+        attrs["pos"] = (x * cw // dw, y * ch // dh)
+        if "rel" in attrs:
+            rx, ry = event.rel
+            attrs["rel"] = (rx * cw // dw, ry * ch // dh)
+        return pygame.event.Event(event.type, attrs)
+
+    def _present(self):
+        """Вывести холст в окно (растянуть, если он меньше) и показать кадр."""
+        scale = None
+        if self.screen is not self.display and self.presenter.has_output():
+            if self.screen.get_size() == self.display.get_size():
+                self.display.blit(self.screen, (0, 0))
+            else:
+                # исходная функция: обёртка счётчиков (counters) не должна считать
+                # вывод холста; ищется при вызове — счётчики включаются на лету
+                stretch = counters.original(pygame.transform, "scale")
+                stretch(self.screen, self.display.get_size(), self.display)
+                scale = (self.display.get_width() / self.screen.get_width(),
+                         self.display.get_height() / self.screen.get_height())
+        self.presenter.present(scale)
+
+    def defer(self, task):
+        """Выполнить task() в главном потоке после вывода кадра.
+
+        За кадр выполняется одна задача; пока очередь не пуста, цикл не
+        засыпает на статичных экранах.
+        """
+        self.tasks.append(task)
+
+    def quit(self):
+        # сцены остаются в стеке (их видно после run), но ресурсы освобождают
+        if not self.quit_requested:
+            for scene in reversed(self.scenes):
+                scene.exit()
+        self.quit_requested = True
+        self.running = False
+
+    def frame(self):
+        """Один кадр: события, обновление, отрисовка и вывод."""
+        # пока профилировщик выключен, лишних замеров времени нет
+        prof = self.profiler if self.profiler.active else None
+        if prof:
+            prof.begin_frame()
+        self._sync_canvas()
+        scene = self.top
+        animating = (scene.animating or self.presenter.pending() or self.profiler.overlay
+                     or bool(self.tasks))
+        scaled = self.screen is not self.display
+        for event in self.frames.events(animating):
+            if scaled and event.type in _MOUSE_EVENTS:
+                event = self._map_event(event)
+            self.presenter.handle_event(event)
+            if event.type == pygame.QUIT:
+                self.quit()
+                return
+            if self.profiler.handle_event(event):
+                # оверлей включили или выключили — экран сцены нужно восстановить
+                self.presenter.invalidate()
+                continue
+            self.top.handle_event(event)
+            if not self.running or not self.scenes:
+                return
+        if prof:
+            prof.mark("events")
+        scene = self.top
+        if counters.enabled:
+            # кадр засчитывается сцене, которая его рисует
+            counters.begin_frame(type(scene).__name__)
+        scene.update(self._dt)
+        if prof:
+            prof.mark("update")
+        full = self.presenter.begin(self.screen)
+        rects = scene.draw(self.screen, full)
+        if not full and rects:
+            for rect in rects:
+                self.presenter.add(rect)
+        if self.profiler.overlay:
+            self.presenter.add(self.profiler.draw_overlay(self.screen))
+        if prof:
+            prof.mark("draw")
+        self._present()
+        if prof:
+            prof.mark("present")
+        if self.tasks:
+            self.tasks.popleft()()
+        elapsed = self.frames.tick()
+        # ожидание событий на статичном экране — не время анимации: иначе сцена,
+        # которая начинает анимироваться по нажатию, получит секунды простоя
+        self._dt = 0 if self._entered or not animating else elapsed
+        self._entered = False
+        if prof:
+            prof.end_frame(elapsed)
+        if counters.enabled:
+            counters.end_frame()
+
+    def run(self):
+        """Крутить цикл, пока стек не опустеет или окно не закроют. Возвращает окно."""
+        self.running = True
+        while self.running and self.scenes:
+            self.frame()
+        return self.display
+
+
+def run_scene(screen, scene):
+    """Показать одну сцену в собственном цикле (до её закрытия).
+
+    Возвращает screen (мог измениться, если сцена меняла разрешение).
+    При закрытии окна вызывает pygame.quit(), как прежние функции run().
+    """
+    app = SceneStack(screen)
+    app.push(scene)
+    screen = app.run()
+    if app.quit_requested:
+        pygame.quit()
+    return screen
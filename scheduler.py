@@ -0,0 +1,57 @@
+"""Планировщик кадров с переходом в режим ожидания на статичных экранах.
+
+Пока сцена анимируется (animating=True), цикл работает с фиксированной
+частотой кадров, как прежний clock.tick(FPS). Когда экран статичен, events()
+блокируется в pygame.event.wait до прихода события (ввод, таймер
+pygame.time.set_timer) или до истечения idle_timeout_ms — процесс при этом
+почти не тратит процессорное время.
+
+Типичный цикл:
+    for event in scheduler.events(animating):
+        ...
+    ... отрисовка ...
+    scheduler.tick()
+"""
+import pygame
+
+FPS = 60
+# как часто просыпаться в режиме ожидания, даже если событий нет
+IDLE_TIMEOUT_MS = 500
+
+
+class FrameScheduler:
+    def __init__(self, fps=FPS, idle_timeout_ms=IDLE_TIMEOUT_MS):
+        self.fps = fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.clock = pygame.time.Clock()
+        self.animating = True
+        # кадров, отрисованных в каждом режиме (для отладки и бенчмарков)
+        self.active_frames = 0
+        self.idle_wakeups = 0
+
+    def events(self, animating=True):
+        """События текущего кадра.
+
+        animating=False — дождаться первого события (не дольше idle_timeout_ms)
+        и вернуть его вместе со всеми накопившимися.
+        """
+        self.animating = animating
+        if animating:
+            self.active_frames += 1
+            return pygame.event.get()
+        self.idle_wakeups += 1
+        first = pygame.event.wait(self.idle_timeout_ms)
+        if first.type == pygame.NOEVENT:
+            return pygame.event.get()
+        return [first] + pygame.event.get()
+
+    def tick(self):
+        """Завершить кадр: ограничить частоту в активном режиме.
+
+        В режиме ожидания задержка уже случилась в events(), здесь только
+        обновляется отметка времени, чтобы следующий активный кадр не «догонял».
+        Возвращает длительность кадра в миллисекундах.
+        """
+        if self.animating:
+            return self.clock.tick(self.fps)
+        return self.clock.tick()
@@ -1,79 +1,111 @@
 import pygame
-import os
 
-def run(screen):
+import config
+import fonts
+import scenes
+import widgets
+from glyphatlas import draw_text, text_size
+
+resolutions = [(640,480),(720,576),(800,600),(1024,768),(1280,960)]
+res_labels = [f"{w} x {h}" for (w,h) in resolutions]
+
+SETTINGS_BG = (30, 10, 30)
+
+
+def preload(size):
+    """Создать шрифты экрана настроек заранее (см. startup.warm_up)."""
+    fonts.get_font("Times New Roman", 28)
+    fonts.get_font(None, 20)
+
+
+class SettingsScene(scenes.Scene):
     """Заглушка для настроек с выбором разрешения.
 
     Отображает строку с левой стороны "Разрешение" и правее поле с текущим
     выбором. По нажатию Enter на поле открывается выпадающий список, в
     котором можно выбрать разрешение стрелками UP/DOWN и подтвердить Enter.
-
-    Возвращает обновлённый surface (screen) после возможной смены режима.
     """
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("Times New Roman", 28)
-    hint_font = pygame.font.SysFont(None, 20)
-    project_dir = os.path.dirname(os.path.abspath(__file__))
-
-    resolutions = [(640,480),(720,576),(800,600),(1024,768),(1280,960)]
-    res_labels = [f"{w} x {h}" for (w,h) in resolutions]
-
-    # определяем текущий индекс по текущему размеру экрана
-    cur_size = screen.get_size()
-    try:
-        current_index = resolutions.index(cur_size)
-    except ValueError:
-        # если текущее разрешение не в списке — выбрать ближайшее (или 2-й элемент)
-        current_index = 2  # 800x600 по умолчанию
-
-    dropdown_open = False
-    selected_index = 0
-    running = True
-
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                return screen
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    # закрываем настройки и возвращаем текущий screen
-                    running = False
-                elif event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                    if not dropdown_open:
-                        # открыть выпадающий список
-                        dropdown_open = True
-                        selected_index = current_index
-                    else:
-                        # выбрать разрешение
-                        current_index = selected_index
-                        new_size = resolutions[current_index]
-                        screen = pygame.display.set_mode(new_size)
-                        # сохраняем выбор в config.json
-                        try:
-                            cfg_path = os.path.join(project_dir, 'config.json')
-                            with open(cfg_path, 'w', encoding='utf-8') as f:
-                                import json
-                                json.dump({'resolution': [new_size[0], new_size[1]]}, f)
-                        except Exception:
-                            pass
-                        dropdown_open = False
-                elif event.key == pygame.K_UP:
-                    if dropdown_open:
-                        selected_index = (selected_index - 1) % len(resolutions)
-                elif event.key == pygame.K_DOWN:
-                    if dropdown_open:
-                        selected_index = (selected_index + 1) % len(resolutions)
-
-        screen.fill((30, 10, 30))
+
+    def __init__(self):
+        super().__init__()
+        self.font = fonts.get_font("Times New Roman", 28)
+        self.hint_font = fonts.get_font(None, 20)
+        self.current_index = 2
+        self.dropdown_open = False
+        self.selected_index = 0
+        # выпадающий список: готовые варианты пунктов (см. widgets.ItemList)
+        self.options = widgets.ItemList(res_labels, self.font, SETTINGS_BG, text_color=(255,255,255),
+                                        fill=(80,80,80), selected_fill=(100,140,180),
+                                        item_size=(300, 40), padding=(12, 0))
+        # состояние на экране: (current_index, dropdown_open, selected_index)
+        self.drawn = None
+        # экран меняется только от нажатий — после перерисовки сцена ждёт событий
+        self.changed = True
+
+    def enter(self):
+        # определяем текущий индекс по размеру окна (screen может быть уменьшенным холстом)
+        cur_size = self.app.display.get_size()
+        try:
+            self.current_index = resolutions.index(cur_size)
+        except ValueError:
+            # если текущее разрешение не в списке — выбрать ближайшее (или 2-й элемент)
+            self.current_index = 2  # 800x600 по умолчанию
+        self.changed = True
+
+    @property
+    def animating(self):
+        return self.changed
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        self.changed = True
+        if event.key == pygame.K_ESCAPE:
+            # закрываем настройки и возвращаемся в меню
+            self.app.pop()
+        elif event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
+            if not self.dropdown_open:
+                # открыть выпадающий список
+                self.dropdown_open = True
+                self.selected_index = self.current_index
+            else:
+                # выбрать разрешение
+                self.current_index = self.selected_index
+                new_size = resolutions[self.current_index]
+                self.app.set_mode(new_size)
+                # сохраняем выбор в настройках: остальные ключи config.json
+                # не теряются, файл пишется в фоне (см. config)
+                config.store.set("resolution", new_size)
+                self.dropdown_open = False
+        elif event.key == pygame.K_UP:
+            if self.dropdown_open:
+                self.selected_index = (self.selected_index - 1) % len(resolutions)
+        elif event.key == pygame.K_DOWN:
+            if self.dropdown_open:
+                self.selected_index = (self.selected_index + 1) % len(resolutions)
+
+    def draw(self, screen, full):
+        if not (full or self.changed):
+            return None
+        self.changed = False
+        state = (self.current_index, self.dropdown_open, self.selected_index)
+        drawn, self.drawn = self.drawn, state
+        if not full and drawn is not None and drawn[:2] == state[:2]:
+            # изменилось только выделение в открытом списке — два готовых пункта
+            if not self.dropdown_open or drawn[2] == state[2]:
+                return None
+            return self.options.move_selection(screen, drawn[2], state[2])
+        font = self.font
+        hint_font = self.hint_font
+
+        screen.fill(SETTINGS_BG)
 
         # отрисовка элементов: центрируем группу [label | поле] по центру экрана
         spacing = 20
         field_w = 300
         field_h = 40
 
-        label_surf = font.render("Разрешение", True, (255,255,255))
-        label_w = label_surf.get_width()
+        label_w, label_h = text_size(font, "Разрешение")
 
         group_width = label_w + spacing + field_w
         center_x = screen.get_width() // 2
@@ -85,35 +117,37 @@ def run(screen):
         field_y = label_y
 
         # отрисовка метки
-        screen.blit(label_surf, (label_x, label_y + (field_h - label_surf.get_height())//2))
+        draw_text(screen, font, "Разрешение", (255,255,255), (label_x, label_y + (field_h - label_h)//2))
 
         # поле текущего разрешения
         field_rect = pygame.Rect(field_x, field_y, field_w, field_h)
         pygame.draw.rect(screen, (60,60,60), field_rect, border_radius=6)
 
         # текущий текст
-        cur_text = font.render(res_labels[current_index], True, (255,255,255))
-        screen.blit(cur_text, (field_x + 12, field_y + (field_h - cur_text.get_height())//2))
+        cur_h = text_size(font, res_labels[self.current_index])[1]
+        draw_text(screen, font, res_labels[self.current_index], (255,255,255), (field_x + 12, field_y + (field_h - cur_h)//2))
 
         # стрелка раскрытия
-        arrow = hint_font.render("v", True, (200,200,200))
-        screen.blit(arrow, (field_x + field_w - 20, field_y + (field_h - arrow.get_height())//2))
+        arrow_h = text_size(hint_font, "v")[1]
+        draw_text(screen, hint_font, "v", (200,200,200), (field_x + field_w - 20, field_y + (field_h - arrow_h)//2))
 
         # если выпадающий список открыт — отрисовать варианты под полем
-        if dropdown_open:
-            opt_h = field_h
-            for i, label_text in enumerate(res_labels):
-                rect = pygame.Rect(field_x, field_y + (i+1)*opt_h, field_w, opt_h)
-                color = (80,80,80) if i != selected_index else (100,140,180)
-                pygame.draw.rect(screen, color, rect, border_radius=6)
-                txt = font.render(label_text, True, (255,255,255))
-                screen.blit(txt, (rect.x + 12, rect.y + (opt_h - txt.get_height())//2))
+        if self.dropdown_open:
+            self.options.layout_column(field_x, field_y + field_h)
+            self.options.draw(screen, self.selected_index)
 
         # подсказка внизу
-        hint = hint_font.render("Enter — открыть/выбрать, UP/DOWN — навигация, ESC — назад", True, (180,180,180))
-        screen.blit(hint, ((screen.get_width() - hint.get_width())//2, screen.get_height() - 40))
+        hint_text = "Enter — открыть/выбрать, UP/DOWN — навигация, ESC — назад"
+        hint_w = text_size(hint_font, hint_text)[0]
+        draw_text(screen, hint_font, hint_text, (180,180,180), ((screen.get_width() - hint_w)//2, screen.get_height() - 40))
 
-        pygame.display.flip()
-        clock.tick(60)
+        # изменяются только поле и выпадающий список под ним
+        return [pygame.Rect(field_x, field_y, field_w, field_h * (len(resolutions) + 1))]
 
-    return screen
+
+def run(screen):
+    """Показать настройки в отдельном цикле (см. SettingsScene).
+
+    Возвращает обновлённый surface (screen) после возможной смены режима.
+    """
+    return scenes.run_scene(screen, SettingsScene())
@@ -0,0 +1,74 @@
+"""Быстрый запуск: сначала меню, остальное — пока игрок в меню.
+
+pygame.init() поднимает все подсистемы SDL, включая звук и джойстики, хотя
+игре нужны только окно (с событиями и таймером) и шрифты. init_pygame()
+инициализирует только их.
+
+После первого кадра меню warm_up() ставит в очередь SceneStack.defer
+подготовку остальных экранов — по одной задаче за кадр, пока меню
+статично: импорт модулей сцен (start, settings, about) и их preload(size),
+то есть шрифты и запрос фоновых изображений (они декодируются в потоке
+assets.manager). Первое нажатие «Стартуем» уже не ждёт ни импорта, ни
+загрузки картинки.
+
+Метрики запуска (мс от старта процесса) собираются в metrics и печатаются:
+- first_frame — первый кадр меню выведен на экран (time-to-first-frame);
+- warm — все экраны подготовлены.
+"""
+import importlib
+import time
+
+import pygame
+
+# модули сцен, которые подготавливаются в фоне, в порядке вероятности выбора
+PRELOAD_MODULES = ("start", "settings", "about")
+
+metrics = {}
+_t0 = time.perf_counter()
+
+
+def begin(t0):
+    """Задать момент старта процесса (time.perf_counter() до тяжёлых импортов)."""
+    global _t0
+    _t0 = t0
+
+
+def mark(name):
+    """Запомнить, через сколько мс от старта наступил этап name."""
+    metrics[name] = round((time.perf_counter() - _t0) * 1000.0, 1)
+    return metrics[name]
+
+
+def init_pygame():
+    """Инициализировать только окно/события и шрифты (без звука и джойстиков)."""
+    pygame.display.init()
+    pygame.font.init()
+
+
+def warm_up(app, modules=PRELOAD_MODULES):
+    """Поставить подготовку экранов в очередь кадров app (см. SceneStack.defer)."""
+    app.defer(_first_frame)
+    for name in modules:
+        app.defer(lambda name=name: _warm_module(app, name))
+    app.defer(_warm_done)
+
+
+def _first_frame():
+    # отложенные задачи выполняются после вывода кадра — первая из них
+    # отмечает момент, когда меню уже на экране
+    print("Первый кадр через {} мс".format(mark("first_frame")))
+
+
+def _warm_module(app, name):
+    try:
+        module = importlib.import_module(name)
+        preload = getattr(module, "preload", None)
+        if preload is not None:
+            preload(app.screen.get_size())
+    except Exception as e:
+        # ошибка подготовки не мешает меню; при выборе пункта она повторится явно
+        print("Не удалось подготовить {}: {}".format(name, e))
+
+
+def _warm_done():
+    print("Экраны подготовлены через {} мс".format(mark("warm")))
@@ -0,0 +1,9 @@
+"""Общая настройка тестов: модули игры импортируются из корня репозитория,
+pygame работает через dummy-драйверы SDL (окно не открывается)."""
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
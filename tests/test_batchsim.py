@@ -0,0 +1,35 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import batchsim  # noqa: E402
+import combat  # noqa: E402
+
+
+def scalar_results(affinity, enemies, seeds, **kwargs):
+    results = []
+    for seed in seeds:
+        battle = combat.encounter(affinity, enemies, seed=int(seed), **kwargs)
+        battle.run()
+        results.append(battle.result())
+    return results
+
+
+@pytest.mark.parametrize("enemies", sorted(combat.ENCOUNTERS))
+@pytest.mark.parametrize("affinity", combat.AFFINITIES)
+def test_batch_matches_scalar_engine(affinity, enemies):
+    batch = batchsim.simulate(affinity, enemies, n=40, seed=1000)
+    expected = scalar_results(affinity, enemies, range(1000, 1040))
+    assert [batch.result(i) for i in range(40)] == expected
+
+
+def test_explicit_seeds_and_turn_limit():
+    seeds = np.array([0, 7, 2 ** 63, 2 ** 64 - 1], dtype=np.uint64)
+    batch = batchsim.simulate(combat.AFFINITIES[0], "horde", seeds=seeds, max_turns=5)
+    expected = scalar_results(combat.AFFINITIES[0], "horde", seeds, max_turns=5)
+    assert [batch.result(i) for i in range(len(seeds))] == expected
+    assert all(r.winner == combat.DRAW and r.turns == 5 for r in expected)
+
+
+def test_check_reports_no_mismatches():
+    assert batchsim.check(n=10, seed=3) == 0
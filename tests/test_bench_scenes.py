@@ -0,0 +1,32 @@
+import bench_scenes
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert bench_scenes.percentile(values, 50) == 50
+    assert bench_scenes.percentile(values, 95) == 95
+    assert bench_scenes.percentile(values, 99) == 99
+    assert bench_scenes.percentile(values, 100) == 100
+    assert bench_scenes.percentile(values, 0) == 1
+    # ранг округляется вверх: из 10 значений p95 — десятое
+    assert bench_scenes.percentile(list(range(10)), 95) == 9
+    assert bench_scenes.percentile(list(range(10)), 50) == 4
+    assert bench_scenes.percentile([], 95) == 0.0
+
+
+def test_compare_reports_time_and_allocation_regressions():
+    baseline = {
+        "menu 800x600": {"p95_ms": 2.0, "surfaces_per_frame": 0.0, "renders_per_frame": 4.0},
+        "about 800x600": {"p95_ms": 2.0, "surfaces_per_frame": 1.0, "renders_per_frame": 0.0},
+        "intro 800x600": {"p95_ms": 0.0},
+    }
+    results = {
+        # время в пределах порога, но появились выделения поверхностей
+        "menu 800x600": {"p95_ms": 2.1, "surfaces_per_frame": 1.0, "renders_per_frame": 4.2},
+        # время выросло; рост выделений меньше ALLOC_MIN_DELTA не считается
+        "about 800x600": {"p95_ms": 3.0, "surfaces_per_frame": 1.0, "renders_per_frame": 0.2},
+        "intro 800x600": {"p95_ms": 5.0},
+        "new 800x600": {"p95_ms": 9.0, "surfaces_per_frame": 9.0},
+    }
+    found = {(key, metric) for key, metric, *_ in bench_scenes.compare(results, baseline, 0.1)}
+    assert found == {("menu 800x600", "surfaces_per_frame"), ("about 800x600", "p95_ms")}
@@ -0,0 +1,72 @@
+import json
+import time
+
+import config
+import savewriter
+
+
+def make_config(path, debounce_ms=60000):
+    return config.Config(str(path), writer=savewriter.SaveWriter(), debounce_ms=debounce_ms)
+
+
+def read(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_values_are_validated_on_load(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"fps": "30", "render_mode": "fast", "resolution": [640, 480]}),
+                    encoding="utf-8")
+    store = make_config(path)
+    assert store.get("fps") == 30
+    # неверное значение заменяется значением по умолчанию
+    assert store.get("render_mode") == "dirty"
+    assert store.get("resolution") == (640, 480)
+    assert store.exists
+
+
+def test_series_of_changes_is_written_once(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    writes = []
+    write_atomic = savewriter.write_atomic
+    monkeypatch.setattr(savewriter, "write_atomic",
+                        lambda p, payload: (writes.append(p), write_atomic(p, payload)))
+    store = make_config(path)
+    seen = []
+    store.subscribe("resolution", lambda key, value: seen.append(value))
+    for size in ((640, 480), (1024, 768), (1280, 720)):
+        store.set("resolution", size)
+    # подписчики узнают сразу, файл ещё не записан
+    assert seen == [(640, 480), (1024, 768), (1280, 720)]
+    assert writes == [] and not path.exists()
+
+    store.flush()
+    assert writes == [str(path)]
+    assert read(path) == {"resolution": [1280, 720]}
+
+
+def test_merge_keeps_foreign_and_concurrent_keys(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"fps": 30, "mod_option": {"x": 1}, "difficulty": "hard"}),
+                    encoding="utf-8")
+    store = make_config(path)
+    store.set("fps", 120)
+    # файл изменили снаружи, пока запись откладывалась
+    data = read(path)
+    data["difficulty"] = "easy"
+    data["window_title"] = "RPG"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    store.flush()
+    assert read(path) == {"fps": 120, "mod_option": {"x": 1}, "difficulty": "easy",
+                          "window_title": "RPG"}
+
+
+def test_debounced_write_happens_without_flush(tmp_path):
+    path = tmp_path / "config.json"
+    store = make_config(path, debounce_ms=10)
+    store.set("difficulty", "hard")
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert read(path) == {"difficulty": "hard"}
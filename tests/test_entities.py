@@ -0,0 +1,56 @@
+import pytest
+
+import entities
+
+
+def test_destroyed_ids_are_reused():
+    world = entities.World(capacity=4)
+    ids = [world.create() for _ in range(4)]
+    assert ids == [0, 1, 2, 3]
+    world.destroy(1)
+    world.destroy(3)
+    world.destroy(3)
+    assert len(world) == 2
+    # свободные номера выдаются раньше новых, последний освобождённый — первым
+    assert world.create() == 3
+    assert world.create() == 1
+    assert world.create() == 4
+    assert world.capacity >= 5 and len(world) == 5
+
+
+def test_reused_id_starts_without_old_components():
+    world = entities.World()
+    old = world.create(position=(5, 6), velocity=(1, 2), shape=(3, 4, 0xffcc00))
+    world.destroy(old)
+    assert world.query("position").tolist() == []
+
+    new = world.create(position={"x": 7})
+    assert new == old
+    assert not world.has(new, "velocity") and not world.has(new, "shape")
+    # незаданные поля нового компонента — нули, а не значения прежней сущности
+    assert world.get(new, "position") == {"x": 7.0, "y": 0.0}
+    world.add(new, "shape", {"color": 0x123456})
+    assert world.get(new, "shape") == {"w": 0, "h": 0, "color": 0x123456}
+
+
+def test_add_to_dead_id_is_rejected():
+    world = entities.World()
+    eid = world.create()
+    world.destroy(eid)
+    with pytest.raises(KeyError):
+        world.add(eid, "position", (1, 2))
+    # ещё не выданный номер тоже не живой
+    with pytest.raises(KeyError):
+        world.add(eid + 1, "position", (1, 2))
+    assert world.create(position=(3, 4)) == eid
+    assert world.get(eid, "position") == {"x": 3.0, "y": 4.0}
+
+
+def test_remove_keeps_dense_lists_consistent():
+    world = entities.World()
+    ids = [world.create(position=(i, 0), lifetime=(i,)) for i in range(6)]
+    world.remove(ids[0], "lifetime")
+    world.destroy(ids[2])
+    assert sorted(world.query("position", "lifetime")) == [1, 3, 4, 5]
+    assert entities.expire(world, 3.5) == 2
+    assert sorted(world.query("position")) == [0, 4, 5]
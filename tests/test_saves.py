@@ -0,0 +1,94 @@
+import json
+import os
+
+import saves
+import savewriter
+
+
+def make_store(tmp_path, legacy_path=None):
+    return saves.SaveStore(str(tmp_path / "saves.dat"), legacy_path=legacy_path,
+                           writer=savewriter.SaveWriter())
+
+
+def test_encode_round_trip():
+    value = {"player": {"color": "Красный", "rgb": [200, 40, 40]}, "hp": -7,
+             "ratio": 0.5, "flags": [True, False, None], "big": 1 << 70, "raw": b"\x00\xff"}
+    assert saves.decode(saves.encode(value)) == value
+
+
+def test_save_and_load_from_fresh_store(tmp_path):
+    store = make_store(tmp_path)
+    store.save(1, {"player": {"color": "Синий"}, "map": list(range(100))}, summary={"color": "Синий"})
+    store.save(2, {"player": {"color": "Зелёный"}})
+    store.flush()
+
+    reopened = make_store(tmp_path)
+    assert reopened.load(1) == {"player": {"color": "Синий"}, "map": list(range(100))}
+    assert reopened.load(1, sections=["player"]) == {"player": {"color": "Синий"}}
+    assert reopened.load(3) is None
+    slots = reopened.slots()
+    assert sorted(slots) == [1, 2]
+    assert slots[1]["summary"] == {"color": "Синий"}
+    assert slots[1]["sections"] == ["map", "player"]
+
+
+def test_save_appends_only_changed_sections(tmp_path):
+    store = make_store(tmp_path)
+    # map сжимается и занимает заметно больше места, чем player
+    big_map = [[x * y for x in range(40)] for y in range(40)]
+    store.save(1, {"player": {"hp": 10}, "map": big_map})
+    store.flush()
+    records = store.stats()["records"]
+    size = os.path.getsize(store.path)
+
+    store.save(1, {"player": {"hp": 9}})
+    store.flush()
+    grown = os.path.getsize(store.path) - size
+    assert grown < len(saves.encode(big_map))
+    # прежняя версия player больше не нужна и из индекса уходит
+    assert store.stats()["records"] == records
+    assert store.load(1) == {"player": {"hp": 9}, "map": big_map}
+
+
+def test_replace_drops_missing_sections(tmp_path):
+    store = make_store(tmp_path)
+    store.save(1, {"player": {"hp": 10}, "quests": ["a"]})
+    store.save(1, {"player": {"hp": 5}}, replace=True)
+    store.flush()
+    assert make_store(tmp_path).load(1) == {"player": {"hp": 5}}
+
+
+def test_compact_keeps_live_slots_and_removes_dead_bytes(tmp_path):
+    store = make_store(tmp_path)
+    for hp in range(20):
+        store.save(1, {"player": {"hp": hp}, "log": ["ход %d" % i for i in range(hp)]})
+        store.flush()
+    store.save(2, {"player": {"hp": 1}})
+    store.delete(2)
+    store.flush()
+    before = store.stats()
+    assert before["dead_bytes"] > before["live_bytes"]
+
+    store.compact()
+    stats = store.stats()
+    # после компактирования мёртвым остаётся только сам индекс
+    assert stats["live_bytes"] == before["live_bytes"]
+    assert stats["dead_bytes"] < before["dead_bytes"] // 4
+    assert stats["file_bytes"] == os.path.getsize(store.path) < before["file_bytes"]
+    reopened = make_store(tmp_path)
+    assert reopened.slots().keys() == {1}
+    assert reopened.load(1) == {"player": {"hp": 19}, "log": ["ход %d" % i for i in range(19)]}
+
+
+def test_legacy_save_json_is_migrated_once(tmp_path):
+    legacy = tmp_path / "save.json"
+    legacy.write_text(json.dumps({"color": "Красный"}), encoding="utf-8")
+    store = make_store(tmp_path, legacy_path=str(legacy))
+    assert store.load(saves.DEFAULT_SLOT) == {saves.LEGACY_SECTION: {"color": "Красный"}}
+    assert store.slots()[saves.DEFAULT_SLOT]["summary"] == {"color": "Красный"}
+    assert os.path.exists(store.path)
+
+    # saves.dat уже есть — изменённый save.json больше не переносится
+    legacy.write_text(json.dumps({"color": "Синий"}), encoding="utf-8")
+    again = make_store(tmp_path, legacy_path=str(legacy))
+    assert again.load(saves.DEFAULT_SLOT) == {saves.LEGACY_SECTION: {"color": "Красный"}}
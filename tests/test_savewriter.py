@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+
+import pytest
+
+import savewriter
+
+
+def test_write_atomic_replaces_file(tmp_path):
+    path = tmp_path / "save.json"
+    path.write_bytes(b"old")
+    savewriter.write_atomic(str(path), b"new")
+    assert path.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["save.json"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path, monkeypatch):
+    path = tmp_path / "save.json"
+    path.write_bytes(b"old")
+
+    def broken_replace(src, dst):
+        raise OSError("диск отключён")
+
+    monkeypatch.setattr(os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        savewriter.write_atomic(str(path), b"new")
+    assert path.read_bytes() == b"old"
+    # временный файл убран
+    assert os.listdir(tmp_path) == ["save.json"]
+
+
+def test_saves_of_one_file_are_coalesced(tmp_path):
+    writer = savewriter.SaveWriter()
+    release = threading.Event()
+    # поток записи занят, пока сохранения копятся в очереди
+    writer.call("block", release.wait)
+    path = tmp_path / "save.json"
+    for color in ("Красный", "Зелёный", "Синий"):
+        writer.save(str(path), {"color": color})
+    assert writer.pending()
+    release.set()
+    assert writer.flush(5)
+    assert json.loads(path.read_text(encoding="utf-8")) == {"color": "Синий"}
+    assert writer.coalesced == 2
+    assert writer.writes == 2
+
+
+def test_errors_are_counted_and_do_not_stop_the_thread(tmp_path, capsys):
+    writer = savewriter.SaveWriter()
+    writer.save(str(tmp_path / "missing" / "save.json"), {"a": 1})
+    writer.save(str(tmp_path / "save.json"), {"a": 2})
+    assert writer.flush(5)
+    assert writer.errors == 1 and isinstance(writer.last_error, OSError)
+    assert json.loads((tmp_path / "save.json").read_text(encoding="utf-8")) == {"a": 2}
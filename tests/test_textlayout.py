@@ -0,0 +1,46 @@
+import pygame
+import pytest
+
+import bench_wrap
+import fonts
+import textlayout
+
+
+@pytest.fixture(scope="module", autouse=True)
+def font_module():
+    pygame.font.init()
+    yield
+    fonts.clear()
+
+
+@pytest.mark.parametrize("bold,italic", bench_wrap.STYLES)
+@pytest.mark.parametrize("size", [16, 22, 32])
+def test_wrap_matches_legacy(size, bold, italic):
+    font = fonts.get_font(None, size, bold, italic)
+    textlayout._word_widths.clear()
+    for seed in range(15):
+        text = bench_wrap.make_text(5 + seed * 7, seed=seed)
+        for width in range(40, 800, 17):
+            assert textlayout.wrap_text(text, font, width) == \
+                bench_wrap.wrap_text_legacy(text, font, width), (seed, width)
+
+
+def test_wrap_edge_cases():
+    font = fonts.get_font(None, 22)
+    assert textlayout.wrap_text("", font, 100) == []
+    assert textlayout.wrap_text("   \n ", font, 100) == []
+    # лишние пробелы и переводы строк схлопываются, как у прежнего переноса
+    text = "  Мир   полон\nоттенков  и выборов "
+    assert textlayout.wrap_text(text, font, 120) == bench_wrap.wrap_text_legacy(text, font, 120)
+    # слово шире строки занимает строку целиком
+    long_word = "Приготовьтесь" * 4
+    assert textlayout.wrap_text("а " + long_word + " б", font, 50) == ["а", long_word, "б"]
+
+
+def test_break_long_words_fits_width():
+    font = fonts.get_font(None, 22)
+    width = 60
+    lines = textlayout.wrap_text("а " + "Приготовьтесь" * 4, font, width, break_long_words=True)
+    assert len(lines) > 2
+    assert all(font.size(line)[0] <= width for line in lines)
+    assert "".join(lines[1:]) == "Приготовьтесь" * 4
@@ -0,0 +1,70 @@
+import pytest
+
+import timeline
+
+
+def test_alpha_table_matches_curve():
+    table = timeline.build_alpha_table(100, 50, 200, "ease_in")
+    assert len(table) == 350
+    for t in range(100):
+        assert table[t] == int(255 * ((t / 100) * (t / 100)))
+    assert set(table[100:150]) == {255}
+    for t in range(200):
+        assert table[150 + t] == int(255 * ((1 - t / 200) * (1 - t / 200)))
+
+
+@pytest.mark.parametrize("easing", sorted(timeline.EASINGS))
+def test_alpha_table_rises_then_falls(easing):
+    table = timeline.build_alpha_table(300, 100, 300, easing)
+    assert table[0] == 0 and table[300] == 255
+    appear, fade = table[:300], table[400:]
+    assert all(a <= b for a, b in zip(appear, appear[1:]))
+    assert all(a >= b for a, b in zip(fade, fade[1:]))
+
+
+def test_step_alpha_clamps_time():
+    step = timeline.Step({"type": "text", "appear_ms": 10, "hold_ms": 5, "fade_ms": 10})
+    assert step.duration == 25
+    assert step.alpha(-100) == 0
+    assert step.alpha(12.7) == 255
+    assert step.alpha(10 ** 6) == step.alpha_table[-1]
+    assert timeline.Step({"type": "image", "duration_ms": 600}).alpha(0) == 255
+
+
+CUTSCENE = timeline.Cutscene({"steps": [
+    {"type": "text", "appear_ms": 100, "hold_ms": 100, "fade_ms": 100},
+    {"type": "image", "duration_ms": 50},
+    {"type": "text", "appear_ms": 10, "hold_ms": 0, "fade_ms": 10},
+    {"type": "choice", "options": [{"name": "Красный", "rgb": [200, 40, 40]}]},
+    {"type": "image", "duration_ms": 0},
+]})
+
+
+def test_advance_skips_finished_steps_in_one_call():
+    line = timeline.Timeline(CUTSCENE)
+    line.advance(299)
+    assert (line.index, line.time) == (0, 299)
+    # 300 + 50 + 20 мс: текст, картинка и второй текст пройдены разом
+    line.advance(75)
+    assert (line.index, line.time) == (3, 4)
+    assert line.step.kind == "choice"
+
+
+def test_choice_waits_for_next():
+    line = timeline.Timeline(CUTSCENE)
+    line.advance(10 ** 6)
+    assert line.step.kind == "choice"
+    assert line.step.options == [("Красный", (200, 40, 40))]
+    line.next()
+    assert line.time == 0 and line.step.kind == "image"
+    line.advance(0)
+    assert line.finished and line.step is None
+    line.next()
+    assert line.finished
+
+
+def test_intro_cutscene_loads():
+    intro = timeline.load("intro.json")
+    assert intro is timeline.load("intro.json")
+    assert intro.find("choice") is not None
+    assert intro.find("missing") is None
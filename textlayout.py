@@ -0,0 +1,225 @@
+"""Кэширующая раскладка текстовых блоков.
+
+Текстовый блок (перенос строк, рендер каждой строки, рамка и сборка в одну
+поверхность) строится один раз для ключа (текст, шрифт, ширина, цвета) и
+затем переиспользуется. Для эффекта появления/затухания меняется только
+alpha уже готовой поверхности, поэтому кадр стоит пару blit'ов.
+"""
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+
+class TextBlock:
+    """Готовый к отрисовке текстовый блок в рамке.
+
+    frame — поверхность рамки (или None), text — поверхность текста.
+    Размеры блока и смещение текста внутри рамки вычисляются при сборке.
+    """
+
+    def __init__(self, frame, text, padding):
+        self.frame = frame
+        self.text = text
+        self.padding = padding
+        if frame is not None:
+            self.size = frame.get_size()
+        else:
+            self.size = text.get_size()
+
+    def draw(self, screen, alpha=255, pos=None):
+        """Нарисовать блок; по умолчанию — по центру screen.
+
+        Рамка рисуется с постоянной прозрачностью, у текста меняется только alpha.
+        """
+        if pos is None:
+            box_x = (screen.get_width() - self.size[0]) // 2
+            box_y = (screen.get_height() - self.size[1]) // 2
+        else:
+            box_x, box_y = pos
+        if self.frame is not None:
+            screen.blit(self.frame, (box_x, box_y))
+        self.text.set_alpha(alpha)
+        screen.blit(self.text, (box_x + self.padding, box_y + self.padding))
+
+
+def build_block(text, font, max_width, color=(255, 255, 255), frame_color=None,
+                spacing=6, padding=20, radius=12, wrap=None):
+    """Разложить и собрать текстовый блок (без кэша).
+
+    wrap — функция переноса (text, font, max_width) -> список строк;
+    по умолчанию используется start.wrap_text-совместимый перенос.
+    """
+    if wrap is None:
+        wrap = wrap_text
+    lines = wrap(text, font, max_width) or [""]
+    line_surfs = [font.render(line, True, color) for line in lines]
+    text_block_w = max(1, max(s.get_width() for s in line_surfs))
+    text_block_h = sum(s.get_height() for s in line_surfs) + spacing * (len(line_surfs) - 1)
+    text_surf = pygame.Surface((text_block_w, max(1, text_block_h)), pygame.SRCALPHA)
+    y_off = 0
+    for s in line_surfs:
+        x_off = (text_block_w - s.get_width()) // 2
+        text_surf.blit(s, (x_off, y_off))
+        y_off += s.get_height() + spacing
+
+    frame_surf = None
+    if frame_color is not None:
+        box_w = text_block_w + 2 * padding
+        box_h = text_block_h + 2 * padding
+        frame_surf = pygame.Surface((box_w, box_h), pygame.SRCALPHA)
+        pygame.draw.rect(frame_surf, frame_color, frame_surf.get_rect(), border_radius=radius)
+    else:
+        padding = 0
+    if pygame.display.get_surface() is not None:
+        # привести к формату экрана один раз, а не на каждом кадре
+        text_surf = text_surf.convert_alpha()
+        if frame_surf is not None:
+            frame_surf = frame_surf.convert_alpha()
+    return TextBlock(frame_surf, text_surf, padding)
+
+
+class TextLayoutCache:
+    """Кэш собранных текстовых блоков.
+
+    Ключ — (текст, id шрифта, максимальная ширина, цвет текста, цвет рамки,
+    параметры сборки).
+    При смене разрешения (check_size с новым размером) кэш сбрасывается,
+    так как ширина переноса и размеры шрифтов зависят от размера окна.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._blocks = {}
+        self._size = None
+
+    def check_size(self, size):
+        """Сбросить кэш, если размер экрана изменился."""
+        size = tuple(size)
+        if size != self._size:
+            self._size = size
+            self._blocks.clear()
+
+    def get(self, text, font, max_width, color=(255, 255, 255), frame_color=None, **kwargs):
+        key = (text, id(font), max_width, tuple(color),
+               tuple(frame_color) if frame_color is not None else None,
+               tuple(sorted(kwargs.items())))
+        block = self._blocks.get(key)
+        if block is None:
+            if len(self._blocks) >= self.max_entries:
+                # простое вытеснение самого старого элемента
+                self._blocks.pop(next(iter(self._blocks)))
+            block = build_block(text, font, max_width, color, frame_color, **kwargs)
+            self._blocks[key] = (block, font)
+            return block
+        return block[0]
+
+    def clear(self):
+        self._blocks.clear()
+
+
+# кэш ширин слов: для каждого шрифта — словарь слово -> ширина (LRU; ключи —
+# слова и слова с пробелом после них, см. wrap_text);
+# шрифты хранятся по слабой ссылке, чтобы кэш не удерживал их в памяти
+WORD_CACHE_SIZE = 4096
+# максимальная погрешность суммы ширин на один стык слов (кернинг, округление);
+# строки, попавшие в этот «пограничный» диапазон, перемеряются целиком
+_JOIN_SLACK = 1
+
+_word_widths = weakref.WeakKeyDictionary()
+
+
+def _widths_for(font):
+    cache = _word_widths.get(font)
+    if cache is None:
+        cache = OrderedDict()
+        _word_widths[font] = cache
+    return cache
+
+
+def word_width(font, word):
+    """Ширина слова в пикселях с кэшированием (по одному измерению на слово и шрифт)."""
+    cache = _widths_for(font)
+    w = cache.get(word)
+    if w is None:
+        w = font.size(word)[0]
+        cache[word] = w
+        if len(cache) > WORD_CACHE_SIZE:
+            # вытеснить самое старое слово
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(word)
+    return w
+
+
+def _break_word(word, font, max_width):
+    """Жёстко разбить слово шире max_width на куски, каждый не шире max_width."""
+    parts = []
+    while word:
+        # бинарный поиск самого длинного префикса, который помещается (минимум 1 символ)
+        lo, hi = 1, len(word)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if font.size(word[:mid])[0] <= max_width:
+                lo = mid
+            else:
+                hi = mid - 1
+        parts.append(word[:lo])
+        word = word[lo:]
+    return parts
+
+
+def wrap_text(text, font, max_width, break_long_words=False):
+    """Разбивает текст на строки, чтобы каждая строка не превышала max_width.
+
+    Ширина каждого слова измеряется один раз (см. word_width) — отдельно и
+    вместе с последующим пробелом, поэтому перенос линейный по длине текста.
+    Ширина строки — сумма ширин «слово + пробел» для всех слов, кроме
+    последнего, плюс ширина последнего слова: так учитывается выступ
+    последнего символа, который добавляют начертания set_bold/set_italic
+    (он есть у каждой отдельно измеренной строки, но не у стыков внутри
+    строки). Только строки, чья сумма попала в узкую окрестность max_width,
+    перемеряются целиком — так переносы совпадают с прежним поведением.
+
+    break_long_words — разбивать слова шире max_width на части (по умолчанию
+    такие слова, как и раньше, занимают отдельную строку целиком).
+    """
+    words = text.split()
+    lines = []
+    if not words:
+        return lines
+    if break_long_words:
+        split_words = []
+        for w in words:
+            if word_width(font, w) > max_width:
+                split_words.extend(_break_word(w, font, max_width))
+            else:
+                split_words.append(w)
+        words = split_words
+    cur = [words[0]]
+    # ширина строки без последнего слова (слова вместе с пробелами после них)
+    head_w = 0
+    for w in words[1:]:
+        joined_w = head_w + word_width(font, cur[-1] + ' ')
+        test_w = joined_w + word_width(font, w)
+        slack = _JOIN_SLACK * (len(cur) + 1)
+        if test_w + slack <= max_width:
+            fits = True
+        elif test_w - slack > max_width:
+            fits = False
+        else:
+            # пограничный случай — точное измерение всей строки
+            fits = font.size(' '.join(cur) + ' ' + w)[0] <= max_width
+        if fits:
+            cur.append(w)
+            head_w = joined_w
+        else:
+            lines.append(' '.join(cur))
+            cur = [w]
+            head_w = 0
+    lines.append(' '.join(cur))
+    return lines
+
+
+# общий кэш для экранов игры
+layout_cache = TextLayoutCache()
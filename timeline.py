@@ -0,0 +1,167 @@
+"""Катсцены, описанные данными: последовательность шагов с кривыми появления.
+
+Файл катсцены (JSON, см. cutscenes/intro.json):
+    {
+      "background": "images/start.jpeg",
+      "steps": [
+        {"type": "text", "text": "...", "appear_ms": 2500, "hold_ms": 2000,
+         "fade_ms": 2500, "easing": "linear"},
+        {"type": "image", "duration_ms": 600},
+        {"type": "choice", "prompt": "...", "save_key": "color",
+         "options": [{"name": "Красный", "rgb": [200, 40, 40]}, ...]}
+      ]
+    }
+
+Шаги:
+- text — текст в рамке поверх фона с появлением, удержанием и затуханием;
+- image — показ изображения ("image", по умолчанию фон катсцены) в течение duration_ms;
+- choice — выбор варианта; длится, пока игрок не подтвердит выбор.
+
+Прозрачность текстового шага заранее сведена в таблицу (байт на миллисекунду),
+поэтому кадр стоит одного обращения по индексу. Timeline.advance сразу
+переходит к активному шагу, не перебирая остальные.
+"""
+import json
+import os
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+CUTSCENES_DIR = os.path.join(project_dir, "cutscenes")
+
+
+def _linear(x):
+    return x
+
+
+def _ease_in(x):
+    return x * x
+
+
+def _ease_out(x):
+    return 1 - (1 - x) * (1 - x)
+
+
+def _ease_in_out(x):
+    return 3 * x * x - 2 * x * x * x
+
+
+EASINGS = {
+    "linear": _linear,
+    "ease_in": _ease_in,
+    "ease_out": _ease_out,
+    "ease_in_out": _ease_in_out,
+}
+
+
+def build_alpha_table(appear_ms, hold_ms, fade_ms, easing="linear"):
+    """Таблица прозрачности (0..255) для каждой миллисекунды шага."""
+    ease = EASINGS.get(easing, _linear)
+    table = bytearray(appear_ms + hold_ms + fade_ms)
+    for t in range(appear_ms):
+        table[t] = int(255 * ease(t / appear_ms))
+    for t in range(appear_ms, appear_ms + hold_ms):
+        table[t] = 255
+    for t in range(fade_ms):
+        table[appear_ms + hold_ms + t] = int(255 * ease(1 - t / fade_ms))
+    return bytes(table)
+
+
+class Step:
+    """Один шаг катсцены. duration — длительность в мс (None — до действия игрока)."""
+
+    def __init__(self, data):
+        self.kind = data.get("type", "image")
+        self.data = data
+        self.text = data.get("text", "")
+        self.image = data.get("image")
+        self.alpha_table = None
+        if self.kind == "text":
+            self.alpha_table = build_alpha_table(
+                int(data.get("appear_ms", 0)), int(data.get("hold_ms", 0)),
+                int(data.get("fade_ms", 0)), data.get("easing", "linear"))
+            self.duration = len(self.alpha_table)
+        elif self.kind == "choice":
+            self.duration = None
+        else:
+            self.duration = int(data.get("duration_ms", 0))
+
+    def alpha(self, t):
+        """Прозрачность текста через t мс после начала шага."""
+        table = self.alpha_table
+        if not table:
+            return 255
+        t = int(t)
+        if t < 0:
+            t = 0
+        elif t >= len(table):
+            t = len(table) - 1
+        return table[t]
+
+    @property
+    def options(self):
+        """Варианты выбора [(имя, rgb), ...] для шага choice."""
+        return [(o["name"], tuple(o.get("rgb", (255, 255, 255)))) for o in self.data.get("options", [])]
+
+
+class Cutscene:
+    """Загруженное описание катсцены (неизменяемое, можно делить между сценами)."""
+
+    def __init__(self, data):
+        self.background = data.get("background")
+        self.steps = [Step(s) for s in data.get("steps", [])]
+
+    def find(self, kind):
+        """Первый шаг заданного типа или None."""
+        for step in self.steps:
+            if step.kind == kind:
+                return step
+        return None
+
+
+class Timeline:
+    """Положение проигрывания катсцены: активный шаг и время внутри него."""
+
+    def __init__(self, cutscene):
+        self.cutscene = cutscene
+        self.index = 0
+        self.time = 0
+
+    @property
+    def step(self):
+        """Активный шаг или None, если катсцена закончилась."""
+        if self.index < len(self.cutscene.steps):
+            return self.cutscene.steps[self.index]
+        return None
+
+    @property
+    def finished(self):
+        return self.index >= len(self.cutscene.steps)
+
+    def advance(self, dt):
+        """Продвинуть время на dt мс; шаги, которые уже прошли, пропускаются сразу."""
+        self.time += dt
+        while True:
+            step = self.step
+            if step is None or step.duration is None or self.time < step.duration:
+                return
+            self.time -= step.duration
+            self.index += 1
+
+    def next(self):
+        """Завершить активный шаг (например, после выбора игрока)."""
+        if not self.finished:
+            self.index += 1
+            self.time = 0
+
+
+_loaded = {}
+
+
+def load(name):
+    """Загрузить катсцену по имени файла в cutscenes/ (результат кэшируется)."""
+    path = name if os.path.isabs(name) else os.path.join(CUTSCENES_DIR, name)
+    cutscene = _loaded.get(path)
+    if cutscene is None:
+        with open(path, "r", encoding="utf-8") as f:
+            cutscene = Cutscene(json.load(f))
+        _loaded[path] = cutscene
+    return cutscene
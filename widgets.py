@@ -0,0 +1,149 @@
+"""Готовые к выводу элементы интерфейса.
+
+ItemList — вертикальный список пунктов (главное меню, выпадающий список
+настроек). Список собирается один раз на шрифт и раскладку:
+- фон (base) — поверхность с уже нарисованными обычными пунктами;
+- для каждого пункта — готовый выделенный вариант вместе с фоном под ним.
+Полная отрисовка списка — blit фона и выделенного пункта, а смена
+выделения — два blit'а: старый пункт восстанавливается из фона, новый
+выводится готовым.
+"""
+import pygame
+
+from glyphatlas import draw_text, text_size
+
+
+def _convert(surf):
+    return surf.convert() if pygame.display.get_surface() is not None else surf
+
+
+class ItemList:
+    """Список пунктов с заранее собранными обычным и выделенным видом.
+
+    bg — цвет под пунктами (если фон не передан в compose); text_color и
+    selected_color — цвет текста; fill/selected_fill — подложка пункта
+    (None — без подложки), radius — её скругление. item_size=None — размер
+    пункта по тексту плюс padding с каждой стороны, текст по центру; иначе
+    фиксированный (w, h), текст слева с отступом padding[0] и по центру по
+    высоте.
+    """
+
+    def __init__(self, items, font, bg, text_color=(200, 200, 200), selected_color=(255, 255, 255),
+                 fill=None, selected_fill=(60, 100, 140), radius=6, item_size=None, padding=(20, 5)):
+        self.items = list(items)
+        self.font = font
+        self.bg = bg
+        self.text_color = text_color
+        self.selected_color = selected_color
+        self.fill = fill
+        self.selected_fill = selected_fill
+        self.radius = radius
+        self.item_size = item_size
+        self.padding = padding
+        self.rects = []
+        # фон с обычными пунктами и область экрана, которую он покрывает
+        self.base = None
+        self.base_rect = None
+        # выделенные варианты пунктов (по индексу)
+        self._selected = None
+
+    # --- раскладка ---------------------------------------------------------
+
+    def layout_centered(self, area_size, spacing=10):
+        """Расположить пункты столбцом по центру области area_size."""
+        sw, sh = area_size
+        px, py = self.padding
+        text_sizes = [text_size(self.font, item) for item in self.items]
+        total_h = sum(th for _, th in text_sizes) + spacing * (len(text_sizes) - 1) if text_sizes else 0
+        start_y = (sh - total_h) // 2
+        rects = []
+        for idx, (tw, th) in enumerate(text_sizes):
+            x = (sw - tw) // 2
+            y = start_y + idx * (th + spacing)
+            rects.append(pygame.Rect(x - px, y - py, tw + 2 * px, th + 2 * py))
+        return self._set_rects(rects)
+
+    def layout_column(self, x, y):
+        """Расположить пункты фиксированного размера (item_size) столбцом вплотную от (x, y)."""
+        w, h = self.item_size
+        return self._set_rects([pygame.Rect(x, y + i * h, w, h) for i in range(len(self.items))])
+
+    def _set_rects(self, rects):
+        if rects != self.rects:
+            self.rects = rects
+            self.base = self._selected = None
+        return rects
+
+    # --- сборка ------------------------------------------------------------
+
+    def _text_pos(self, item, rect):
+        if self.item_size is None:
+            return (rect.x + self.padding[0], rect.y + self.padding[1])
+        th = text_size(self.font, item)[1]
+        return (rect.x + self.padding[0], rect.y + (rect.h - th) // 2)
+
+    def _draw_variant(self, surf, item, rect, selected):
+        fill = self.selected_fill if selected else self.fill
+        if fill is not None:
+            pygame.draw.rect(surf, fill, rect, border_radius=self.radius)
+        color = self.selected_color if selected else self.text_color
+        draw_text(surf, self.font, item, color, self._text_pos(item, rect))
+
+    def compose(self, base=None, base_rect=None):
+        """Собрать фон и выделенные варианты.
+
+        base — поверхность, на которой уже нарисовано всё, что лежит под
+        пунктами (например, фон меню с подсказкой); base_rect — область
+        экрана, которую она покрывает (по умолчанию от (0, 0)). Без base
+        берётся область пунктов, залитая цветом bg. Обычные пункты
+        дорисовываются на base.
+        """
+        if base is None:
+            base_rect = self.rects[0].unionall(self.rects) if self.rects else pygame.Rect(0, 0, 0, 0)
+            base = pygame.Surface(base_rect.size)
+            base.fill(self.bg)
+        elif base_rect is None:
+            base_rect = base.get_rect()
+        offset = (-base_rect.x, -base_rect.y)
+        for item, rect in zip(self.items, self.rects):
+            self._draw_variant(base, item, rect.move(offset), False)
+        selected = []
+        for item, rect in zip(self.items, self.rects):
+            surf = base.subsurface(rect.move(offset)).copy()
+            self._draw_variant(surf, item, surf.get_rect(), True)
+            selected.append(_convert(surf))
+        self.base = _convert(base)
+        self.base_rect = pygame.Rect(base_rect)
+        self._selected = selected
+
+    # --- отрисовка -----------------------------------------------------------
+
+    def _restore(self, screen, index):
+        rect = self.rects[index]
+        screen.blit(self.base, rect.topleft, rect.move(-self.base_rect.x, -self.base_rect.y))
+        return rect
+
+    def _highlight(self, screen, index):
+        rect = self.rects[index]
+        screen.blit(self._selected[index], rect.topleft)
+        return rect
+
+    def draw(self, screen, selected):
+        """Нарисовать список целиком (selected — выделенный индекс или None)."""
+        if self.base is None:
+            self.compose()
+        screen.blit(self.base, self.base_rect.topleft)
+        if selected is not None:
+            self._highlight(screen, selected)
+        return self.base_rect
+
+    def move_selection(self, screen, old, new):
+        """Перенести выделение: два blit'а, возвращает изменённые прямоугольники."""
+        if self.base is None:
+            self.compose()
+        rects = []
+        if old is not None and old != new:
+            rects.append(self._restore(screen, old))
+        if new is not None:
+            rects.append(self._highlight(screen, new))
+        return rects